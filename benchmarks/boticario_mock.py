@@ -0,0 +1,36 @@
+"""
+Local stand-in for the Boticario cashback API, for load tests:
+
+    python -m benchmarks.boticario_mock --port 8081
+
+and run the API with BOTICARIO_BASE_URL=http://localhost:8081.
+"""
+import argparse
+import asyncio
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+
+app = Starlette()
+app.state.latency = 0.01
+
+
+@app.route("/v1/cashback")
+async def cashback(request):
+    await asyncio.sleep(app.state.latency)
+    return JSONResponse({"statusCode": 200, "body": {"credit": 1578}})
+
+
+def main():
+    import uvicorn  # pylint: disable=import-outside-toplevel
+
+    parser = argparse.ArgumentParser(description="Boticario API mock")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.01)
+    args = parser.parse_args()
+    app.state.latency = args.latency
+    uvicorn.run(app, host="0.0.0.0", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import asyncio
+import time
+from collections import defaultdict
+from typing import List, Tuple
+
+import httpx
+
+from benchmarks import boticario_mock
+from benchmarks.stats import summarize
+from cashback.core import config
+from cashback.db.session import database
+from cashback.extensions.boticario.backends import AsyncBoticarioBackend
+from cashback.main import app
+
+
+class Scenario:
+    """
+    Virtual users that log in, create an order, list their orders and
+    get their cashback, in a loop.
+    """
+
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def timed(self, name: str, method: str, url: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[name] += 1
+            return None
+        self.latencies[name].append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            self.errors[name] += 1
+        return response
+
+    async def user(self, email: str, password: str, cpf: str, requests: int):
+        for _ in range(requests):
+            response = await self.timed(
+                "login",
+                "POST",
+                "/login/access-token/",
+                data={"username": email, "password": password},
+            )
+            if response is None or response.status_code != 200:
+                continue
+            token = response.json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+
+            order = {
+                "code": f"load-{time.perf_counter_ns()}",
+                "value": "1250",
+                "date": "2020-04-18",
+                "cpf": cpf,
+            }
+            await self.timed(
+                "create_order", "POST", "/orders/", headers=headers, json=order
+            )
+            await self.timed("list_orders", "GET", "/orders/", headers=headers)
+            await self.timed(
+                "cashback", "GET", f"/cashback/{cpf}/", headers=headers
+            )
+
+
+async def run_scenario(
+    users: List[Tuple], concurrency: int, requests: int, url: str = None
+) -> dict:
+    """
+    Run ``concurrency`` virtual users, cycling through the seeded
+    (user, password) pairs, for ``requests`` iterations each. Without
+    ``url`` the app runs in process with the Boticario mock.
+    """
+    if url:
+        client = httpx.AsyncClient(base_url=url)
+    else:
+        client = httpx.AsyncClient(app=app, base_url="http://testserver")
+        AsyncBoticarioBackend._client = httpx.AsyncClient(
+            app=boticario_mock.app, headers=AsyncBoticarioBackend.headers
+        )
+        if config.ASYNC_ENDPOINTS:
+            await database.connect()
+
+    scenario = Scenario(client)
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(
+            *(
+                scenario.user(
+                    user.email, password, user.cpf, requests=requests
+                )
+                for user, password in (
+                    users[number % len(users)] for number in range(concurrency)
+                )
+            )
+        )
+    finally:
+        elapsed = time.perf_counter() - start
+        await client.aclose()
+        if not url:
+            await AsyncBoticarioBackend.close()
+            if database.is_connected:
+                await database.disconnect()
+
+    return {
+        name: summarize(latencies, elapsed, errors=scenario.errors[name])
+        for name, latencies in scenario.latencies.items()
+    }
+
+
+def run(users: List[Tuple], concurrency=10, requests=20, url=None) -> dict:
+    return asyncio.get_event_loop().run_until_complete(
+        run_scenario(users, concurrency, requests, url)
+    )
@@ -0,0 +1,82 @@
+import datetime
+import time
+from decimal import Decimal
+from typing import Callable, List
+
+import jwt
+from fastapi.encoders import jsonable_encoder
+from pydantic import parse_obj_as
+
+from benchmarks.stats import summarize
+from cashback.core import config
+from cashback.core.jwt import ALGORITHM, create_access_token
+from cashback.crud.utils import normalize_cpf
+from cashback.db.base import Order
+from cashback.models.order import OrderStatus
+from cashback.schemas.order import Order as OrderSchema
+
+BATCH = 100
+
+
+def measure(func: Callable, iterations: int) -> dict:
+    """
+    Run func in batches of ``BATCH`` calls. Latencies are the mean call
+    time of each batch, so timer overhead stays out of fast functions.
+    """
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(max(iterations // BATCH, 1)):
+        batch_start = time.perf_counter()
+        for _ in range(BATCH):
+            func()
+        latencies.append((time.perf_counter() - batch_start) / BATCH)
+    elapsed = time.perf_counter() - start
+    summary = summarize(latencies, elapsed)
+    summary["count"] = len(latencies) * BATCH
+    summary["throughput"] = summary["count"] / elapsed
+    return summary
+
+
+def make_orders(count: int) -> List[Order]:
+    return [
+        Order(
+            id=number,
+            code=f"code-{number}",
+            value=Decimal("1250.00"),
+            cashback_percentage=15,
+            cashback_value=Decimal("187.50"),
+            status=OrderStatus.IN_VALIDATION,
+            date=datetime.datetime(2020, 4, 18),
+            reseller_cpf="15350946056",
+        )
+        for number in range(count)
+    ]
+
+
+def serialize_orders(orders: List[Order]):
+    "What a response_model=List[Order] endpoint does with ORM rows"
+    return jsonable_encoder(parse_obj_as(List[OrderSchema], orders))
+
+
+def run(iterations=10000) -> dict:
+    order = Order(value=Decimal("1250.00"))
+    token = create_access_token(data={"user_id": 1})
+    orders = make_orders(100)
+
+    return {
+        "calculate_cashback_value": measure(
+            order.calculate_cashback_value, iterations
+        ),
+        "normalize_cpf": measure(
+            lambda: normalize_cpf("153.509.460-56"), iterations
+        ),
+        "jwt_decode": measure(
+            lambda: jwt.decode(
+                token, config.SECRET_KEY, algorithms=[ALGORITHM]
+            ),
+            iterations,
+        ),
+        "serialize_100_orders": measure(
+            lambda: serialize_orders(orders), max(iterations // 100, BATCH)
+        ),
+    }
@@ -0,0 +1,127 @@
+"""
+Time the reseller order queries against growing ``order`` tables.
+
+Each size is seeded twice in a scratch schema, once with the reseller
+indexes from the Order model and once without them, so the output shows
+how the keyset listing, the date range filter and the code lookup scale
+with table size:
+
+    python -m benchmarks.order_queries --sizes 10000 100000 1000000
+"""
+import argparse
+import statistics
+import time
+
+from sqlalchemy import text
+
+from cashback.db.base import Base, Order
+from cashback.db.session import engine
+
+SCHEMA = "benchmark_orders"
+ORDERS_PER_RESELLER = 100
+
+QUERIES = {
+    "keyset": (
+        'SELECT * FROM "order" WHERE reseller_cpf = :cpf AND id > :after '
+        "ORDER BY id LIMIT 100"
+    ),
+    "by_date": (
+        'SELECT * FROM "order" WHERE reseller_cpf = :cpf '
+        "AND date >= :start AND date < :end ORDER BY date"
+    ),
+    "by_code": (
+        'SELECT * FROM "order" WHERE reseller_cpf = :cpf AND code = :code'
+    ),
+}
+
+SEED_USERS = """
+INSERT INTO "user" (id, email, cpf, is_active, is_superuser)
+SELECT n, 'reseller' || n || '@example.com', lpad(n::text, 11, '0'),
+       true, false
+FROM generate_series(1, :resellers) AS n
+"""
+SEED_ORDERS = """
+INSERT INTO "order"
+    (id, code, value, cashback_percentage, cashback_value, status, date,
+     reseller_cpf)
+SELECT n, 'code-' || n, 100, 10, 10, 'IN_VALIDATION',
+       date '2020-01-01' + (n % 365),
+       lpad((n % :resellers + 1)::text, 11, '0')
+FROM generate_series(1, :size) AS n
+"""
+
+
+def create_tables(conn, indexed):
+    conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    conn.execute(f"CREATE SCHEMA {SCHEMA}")
+    conn.execute(f"SET search_path TO {SCHEMA}")
+    Base.metadata.create_all(conn)
+    if not indexed:
+        for index in Order.__table__.indexes:
+            if index.name.startswith("ix_order_reseller_cpf"):
+                conn.execute(f"DROP INDEX {index.name}")
+        conn.execute(
+            'ALTER TABLE "order" DROP CONSTRAINT uq_order_reseller_cpf_code'
+        )
+
+
+def seed(conn, size):
+    resellers = max(size // ORDERS_PER_RESELLER, 1)
+    conn.execute(text(SEED_USERS), resellers=resellers)
+    conn.execute(text(SEED_ORDERS), resellers=resellers, size=size)
+    conn.execute('ANALYZE "order"')
+    return resellers
+
+
+def time_query(conn, query, params, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(text(query), **params).fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def run(sizes, repeat):
+    print(
+        f"{'size':>10} {'indexes':>8} " + " ".join(f"{q:>10}" for q in QUERIES)
+    )
+    with engine.connect() as conn:
+        try:
+            for size in sizes:
+                for indexed in (True, False):
+                    with conn.begin():
+                        create_tables(conn, indexed)
+                        resellers = seed(conn, size)
+                    cpf = str(resellers // 2 + 1).zfill(11)
+                    params = {
+                        "cpf": cpf,
+                        "after": 0,
+                        "start": "2020-03-01",
+                        "end": "2020-04-01",
+                        "code": f"code-{resellers // 2}",
+                    }
+                    timings = [
+                        time_query(conn, query, params, repeat)
+                        for query in QUERIES.values()
+                    ]
+                    print(
+                        f"{size:>10} {'yes' if indexed else 'no':>8} "
+                        + " ".join(f"{ms:>8.2f}ms" for ms in timings)
+                    )
+        finally:
+            conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10000, 100000, 1000000]
+    )
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
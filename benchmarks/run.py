@@ -0,0 +1,101 @@
+"""
+Benchmark suite: micro-benchmarks of the hot paths and an HTTP load
+scenario, written to JSON and compared with a stored baseline:
+
+    python -m benchmarks.run --orders 100000 --output results.json
+
+Exits with status 1 when a benchmark regressed more than --tolerance.
+"""
+import argparse
+import datetime
+import json
+import logging
+import os
+import sys
+
+from benchmarks import micro, seed
+from benchmarks.stats import compare
+
+logger = logging.getLogger(__name__)
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orders", type=int, default=10000)
+    parser.add_argument("--resellers", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument(
+        "--url", help="Load test a running server instead of in process"
+    )
+    parser.add_argument(
+        "--skip-load", action="store_true", help="Only run micro-benchmarks"
+    )
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store these results as the new baseline",
+    )
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    results = {
+        "meta": {
+            "date": datetime.datetime.now().isoformat(),
+            "orders": args.orders,
+            "resellers": args.resellers,
+            "concurrency": args.concurrency,
+        },
+        "micro": micro.run(args.iterations),
+    }
+
+    if not args.skip_load:
+        from benchmarks import load  # pylint: disable=import-outside-toplevel
+
+        users = seed.seed(args.orders, args.resellers)
+        results["load"] = load.run(
+            users,
+            concurrency=args.concurrency,
+            requests=args.requests,
+            url=args.url,
+        )
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+    results["regressions"] = compare(
+        {
+            suite: results[suite]
+            for suite in ("micro", "load")
+            if suite in results
+        },
+        baseline,
+        args.tolerance,
+    )
+
+    with open(args.output, "w") as output:
+        json.dump(results, output, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as baseline_file:
+            json.dump(results, baseline_file, indent=2)
+
+    for regression in results["regressions"]:
+        logger.warning(
+            f"Regression in {regression['benchmark']} {regression['metric']}: "
+            f"{regression['baseline']:.3f} -> {regression['current']:.3f}"
+        )
+    print(json.dumps(results, indent=2))
+    return 1 if results["regressions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
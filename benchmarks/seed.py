@@ -0,0 +1,50 @@
+import datetime
+import logging
+import random
+import time
+from typing import List, Tuple
+
+from cashback import crud
+from cashback.core import config
+from cashback.db.session import db_session
+from cashback.schemas.order import OrderCreate
+from cashback.tests.factories import create_random_user, random_lower_string
+
+logger = logging.getLogger(__name__)
+
+
+def seed(orders: int, resellers: int, chunk_size=10000) -> List[Tuple]:
+    """
+    Create ``resellers`` users with the test factories and spread
+    ``orders`` random orders between them with the bulk insert path.
+    Returns the (user, password) pairs, to log in with.
+
+    Refuses to run unless ``TESTING`` or ``BENCHMARK_SCRATCH_DB`` is set,
+    so random data never lands in a real database.
+    """
+    if not (config.TESTING or config.BENCHMARK_SCRATCH_DB):
+        raise RuntimeError(
+            f"Refusing to seed {config.DB_NAME}: set TESTING to use the "
+            "test database or BENCHMARK_SCRATCH_DB for a scratch one"
+        )
+    users = [create_random_user() for _ in range(resellers)]
+    cpfs = [user.cpf for user, _ in users]
+    start_date = datetime.date(2020, 1, 1)
+
+    started = time.perf_counter()
+    for start in range(0, orders, chunk_size):
+        objs_in = [
+            OrderCreate(
+                code=random_lower_string(),
+                value=round(random.uniform(10, 3000), 2),
+                date=start_date + datetime.timedelta(days=number % 365),
+                cpf=random.choice(cpfs),
+            )
+            for number in range(start, min(start + chunk_size, orders))
+        ]
+        crud.order.create_multi_with_reseller(db_session, objs_in=objs_in)
+        logger.info(
+            f"Seeded {start + len(objs_in)} of {orders} orders "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+    return users
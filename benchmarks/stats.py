@@ -0,0 +1,65 @@
+import math
+from typing import Dict, List, Sequence
+
+# Metrics where a higher value is a regression; for the others
+# (throughput) a lower value is.
+LOWER_IS_BETTER = ("p50", "p95", "p99")
+
+
+def percentile(samples: Sequence[float], percent: float) -> float:
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    index = math.ceil(percent / 100 * len(samples)) - 1
+    return samples[max(index, 0)]
+
+
+def summarize(latencies: Sequence[float], elapsed: float, errors=0) -> dict:
+    """
+    Throughput in operations per second and latency percentiles in
+    milliseconds of a list of latencies in seconds.
+    """
+    return {
+        "count": len(latencies),
+        "errors": errors,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 50) * 1000,
+        "p95": percentile(latencies, 95) * 1000,
+        "p99": percentile(latencies, 99) * 1000,
+    }
+
+
+def compare(
+    results: Dict[str, Dict[str, dict]],
+    baseline: Dict[str, Dict[str, dict]],
+    tolerance: float,
+) -> List[dict]:
+    """
+    Compare ``{suite: {benchmark: summary}}`` results with a baseline of
+    the same shape. A metric regresses when it is more than ``tolerance``
+    (0.2 for 20%) worse than the baseline value.
+    """
+    regressions = []
+    for suite, benchmarks in results.items():
+        for name, summary in benchmarks.items():
+            base = baseline.get(suite, {}).get(name)
+            if not base:
+                continue
+            for metric in LOWER_IS_BETTER + ("throughput",):
+                current, previous = summary.get(metric), base.get(metric)
+                if not current or not previous:
+                    continue
+                change = (current - previous) / previous
+                if metric == "throughput":
+                    change = -change
+                if change > tolerance:
+                    regressions.append(
+                        {
+                            "benchmark": f"{suite}.{name}",
+                            "metric": metric,
+                            "baseline": previous,
+                            "current": current,
+                            "change": round(change, 4),
+                        }
+                    )
+    return regressions
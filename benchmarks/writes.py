@@ -0,0 +1,143 @@
+"""
+Writes per second of the CRUD create and update paths.
+
+Orders are written one per transaction in a scratch schema, first the
+way the CRUD used to do it (ORM add, commit and refresh) and then with
+the single ``INSERT/UPDATE ... RETURNING`` the CRUD runs now. The output
+shows writes per second and the SQL statements each write needs:
+
+    python -m benchmarks.writes --writes 2000
+"""
+import argparse
+import datetime
+import time
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from cashback import crud
+from cashback.db.base import Base, Order
+from cashback.db.session import engine
+from cashback.schemas.order import OrderCreate, OrderUpdate
+
+SCHEMA = "benchmark_writes"
+CPF = "00000000001"
+
+
+class StatementCounter:
+    def __init__(self, conn):
+        self.count = 0
+        event.listen(conn, "before_cursor_execute", self.observe)
+
+    def observe(self, *args):
+        self.count += 1
+
+
+def create_tables(conn):
+    conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    conn.execute(f"CREATE SCHEMA {SCHEMA}")
+    conn.execute(f"SET search_path TO {SCHEMA}")
+    Base.metadata.create_all(conn)
+    conn.execute(
+        'INSERT INTO "user" (id, email, cpf, is_active, is_superuser) '
+        f"VALUES (1, 'reseller@example.com', '{CPF}', true, false)"
+    )
+
+
+def order_in(n):
+    return OrderCreate(
+        code=f"code-{n}",
+        value=100 + n % 100,
+        date=datetime.date.today(),
+        cpf=CPF,
+    )
+
+
+def legacy_create(db_session, obj_in):
+    db_obj = Order(
+        code=obj_in.code,
+        value=Decimal(obj_in.value),
+        date=obj_in.date,
+        reseller_cpf=obj_in.reseller_cpf,
+    )
+    db_session.add(db_obj)
+    db_session.commit()
+    db_session.refresh(db_obj)
+    return db_obj
+
+
+def legacy_update(db_session, db_obj, obj_in):
+    obj_data = jsonable_encoder(db_obj)
+    update_data = obj_in.dict(skip_defaults=True)
+    for field in obj_data:
+        if field in update_data:
+            setattr(db_obj, field, update_data[field])
+    db_session.add(db_obj)
+    db_session.commit()
+    db_session.refresh(db_obj)
+    return db_obj
+
+
+def returning_create(db_session, obj_in):
+    return crud.order.create_with_reseller(db_session, obj_in=obj_in)
+
+
+def returning_update(db_session, db_obj, obj_in):
+    return crud.order.update(db_session, db_obj=db_obj, obj_in=obj_in)
+
+
+def time_writes(counter, writes, write):
+    counter.count = 0
+    start = time.perf_counter()
+    for n in range(writes):
+        write(n)
+    elapsed = time.perf_counter() - start
+    return writes / elapsed, counter.count / writes
+
+
+def run(writes):
+    paths = {
+        "legacy": (legacy_create, legacy_update),
+        "returning": (returning_create, returning_update),
+    }
+    print(f"{'path':>10} {'write':>7} {'writes/s':>10} {'statements':>11}")
+    with engine.connect() as conn:
+        try:
+            for name, (create, update) in paths.items():
+                create_tables(conn)
+                counter = StatementCounter(conn)
+                db_session = Session(bind=conn)
+                orders = []
+
+                def create_one(n):
+                    orders.append(create(db_session, order_in(n)))
+
+                def update_one(n):
+                    obj_in = OrderUpdate(**order_in(writes + n).dict())
+                    update(db_session, orders[n], obj_in)
+
+                for write, func in (
+                    ("create", create_one),
+                    ("update", update_one),
+                ):
+                    per_second, statements = time_writes(counter, writes, func)
+                    print(
+                        f"{name:>10} {write:>7} {per_second:>10.1f} "
+                        f"{statements:>11.1f}"
+                    )
+                db_session.close()
+        finally:
+            conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--writes", type=int, default=2000)
+    args = parser.parse_args()
+    run(args.writes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import logging
+
+from databases import Database
+from fastapi import APIRouter, Depends, HTTPException
+
+from cashback import crud
+from cashback.api.utils.db import get_async_db
+from cashback.api.utils.security import get_current_active_user_async
+from cashback.extensions.boticario.backends import AsyncBoticarioBackend
+from cashback.models.user import User as DBUser
+from cashback.schemas.cashback import Cashback, CashbackSummary
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+# pylint: disable=too-many-arguments
+@router.get("/cashback/{cpf}/", response_model=Cashback)
+async def get_total_cashback(
+    *,
+    db: Database = Depends(get_async_db),
+    cpf: str,
+    current_user: DBUser = Depends(get_current_active_user_async),
+):
+    """
+    Total Cashback.
+    """
+    if (current_user.cpf != cpf) and not current_user.is_superuser:
+        msg = f"The user doesn't have enough privileges"
+        logger.debug(msg)
+        raise HTTPException(status_code=403, detail=msg)
+
+    user = await crud.async_user.get_by_cpf(db, cpf=cpf)
+    if not user:
+        msg = f"CPF: {cpf} not found"
+        logger.debug(msg)
+        raise HTTPException(
+            status_code=404, detail=msg,
+        )
+
+    backend = AsyncBoticarioBackend()
+    credit = await backend.get_total_cashback(cpf=cpf)
+    body = {"cpf": cpf, "credit": credit}
+
+    logger.info(f"Get Total Cashback with success, {cpf} - {credit}")
+    return body
+
+
+@router.get("/cashback/{cpf}/summary/", response_model=CashbackSummary)
+async def get_cashback_summary(
+    *,
+    db: Database = Depends(get_async_db),
+    cpf: str,
+    current_user: DBUser = Depends(get_current_active_user_async),
+):
+    """
+    Local order and cashback totals, by status and by month.
+    """
+    if (current_user.cpf != cpf) and not current_user.is_superuser:
+        msg = f"The user doesn't have enough privileges"
+        logger.debug(msg)
+        raise HTTPException(status_code=403, detail=msg)
+
+    user = await crud.async_user.get_by_cpf(db, cpf=cpf)
+    if not user:
+        msg = f"CPF: {cpf} not found"
+        logger.debug(msg)
+        raise HTTPException(
+            status_code=404, detail=msg,
+        )
+
+    summary = await crud.async_order.get_summary_by_reseller(db, cpf=user.cpf)
+    logger.info(f"Get Cashback Summary with success, {cpf}")
+    return summary
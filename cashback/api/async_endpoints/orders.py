@@ -0,0 +1,88 @@
+import logging
+from typing import List
+
+from databases import Database
+from fastapi import APIRouter, Depends, HTTPException
+
+from cashback import crud
+from cashback.api.endpoints.orders import export_row
+from cashback.api.utils.db import get_async_db
+from cashback.api.utils.pagination import decode_cursor, set_next_cursor
+from cashback.api.utils.responses import ORJSONResponse
+from cashback.api.utils.security import get_current_active_user_async
+from cashback.models.user import User as DBUser
+from cashback.schemas.order import Order, OrderCreate
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+@router.post("/orders/", response_model=Order, status_code=201)
+async def create_order(
+    *,
+    db: Database = Depends(get_async_db),
+    order_in: OrderCreate,
+    current_user: DBUser = Depends(get_current_active_user_async),
+):
+    """
+    Create new order.
+
+    Unknown resellers and repeated codes are reported by the constraints
+    on order during the INSERT, without looking the reseller up first.
+    """
+    order = await crud.async_order.create_or_conflict(db, obj_in=order_in)
+    if isinstance(order, str):
+        logger.debug(order)
+        raise HTTPException(
+            status_code=409, detail=order,
+        )
+    logger.info(f"Create order with success! Order: {order.id}")
+    return order
+
+
+# pylint: disable=too-many-arguments
+@router.get("/orders/", response_model=List[Order])
+async def list_orders(
+    db: Database = Depends(get_async_db),
+    cpf: str = None,
+    skip: int = 0,
+    after: str = None,
+    limit: int = 100,
+    current_user: DBUser = Depends(get_current_active_user_async),
+):
+    """
+    List orders, paginated like the sync endpoint: pass the
+    ``X-Next-Cursor`` response header as ``after`` to get the next page.
+    ``skip`` is kept for compatibility and uses OFFSET.
+    """
+    after_id = decode_cursor(after)
+    if current_user.is_superuser:
+        if cpf:
+            user = await crud.async_user.get_by_cpf(db, cpf=cpf)
+            if not user:
+                logger.debug(f"Not found in list_orders - cpf: {cpf}")
+                raise HTTPException(
+                    status_code=404,
+                    detail="The user with this cpf does not exist.",
+                )
+
+            orders = await crud.async_order.get_multi_by_reseller_after(
+                db, cpf=user.cpf, after=after_id, limit=limit
+            )
+        elif skip:
+            orders = await crud.async_order.get_multi(
+                db, skip=skip, limit=limit
+            )
+        else:
+            orders = await crud.async_order.get_multi_after(
+                db, after=after_id, limit=limit
+            )
+    else:
+        orders = await crud.async_order.get_multi_by_reseller_after(
+            db, cpf=current_user.cpf, after=after_id, limit=limit
+        )
+
+    response = ORJSONResponse([export_row(order) for order in orders])
+    set_next_cursor(response, orders, limit)
+    logger.info(f"Get orders with success!")
+    return response
@@ -0,0 +1,156 @@
+import logging
+from typing import List
+
+from databases import Database
+from fastapi import APIRouter, Body, Depends, HTTPException
+
+from cashback import crud
+from cashback.api.utils.db import get_async_db
+from cashback.api.utils.pagination import decode_cursor, set_next_cursor
+from cashback.api.utils.responses import ORJSONResponse
+from cashback.api.utils.security import (
+    get_current_active_superuser_async,
+    get_current_active_user_async,
+)
+from cashback.models.user import User as DBUser
+from cashback.schemas.user import User, UserCreate, UserUpdate
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+# pylint: disable=too-many-arguments
+@router.get("/users/", response_model=List[User])
+async def list_users(
+    db: Database = Depends(get_async_db),
+    skip: int = 0,
+    after: str = None,
+    limit: int = 100,
+    current_user: DBUser = Depends(get_current_active_superuser_async),
+):
+    """
+    List users, paginated like the sync endpoint: pass the
+    ``X-Next-Cursor`` response header as ``after`` to get the next page.
+    ``skip`` is kept for compatibility and uses OFFSET.
+    """
+    if skip:
+        users = await crud.async_user.get_multi(db, skip=skip, limit=limit)
+    else:
+        users = await crud.async_user.get_multi_after(
+            db, after=decode_cursor(after), limit=limit
+        )
+
+    fields = [column.key for column in crud.user.public_columns]
+    response = ORJSONResponse(
+        [{field: getattr(user, field) for field in fields} for user in users]
+    )
+    set_next_cursor(response, users, limit)
+    return response
+
+
+@router.post("/users/", response_model=User, status_code=201)
+async def create_user(
+    *,
+    db: Database = Depends(get_async_db),
+    user_in: UserCreate,
+    current_user: DBUser = Depends(get_current_active_superuser_async),
+):
+    """
+    Create new user.
+
+    Taken emails and CPFs are reported by the unique indexes during the
+    INSERT, without looking them up first.
+    """
+    user = await crud.async_user.create_or_conflict(db, obj_in=user_in)
+    if isinstance(user, str):
+        logger.debug(user)
+        raise HTTPException(
+            status_code=409, detail=user,
+        )
+
+    logger.info(f"Create user with success! User: {user_in.email}")
+    return user
+
+
+@router.get("/user/profile/", response_model=User)
+async def get_current_user(
+    current_user: DBUser = Depends(get_current_active_user_async),
+):
+    """
+    Get current user.
+    """
+    logger.info(f"Get current user with success.")
+    return current_user
+
+
+@router.put("/user/profile/", response_model=User)
+async def update_current_user(
+    *,
+    db: Database = Depends(get_async_db),
+    password: str = Body(None),
+    full_name: str = Body(None),
+    is_active: bool = Body(None),
+    current_user: DBUser = Depends(get_current_active_user_async),
+):
+    """
+    Update current user.
+    """
+    update_data = {}
+    if password is not None:
+        update_data["password"] = password
+    if full_name is not None:
+        update_data["full_name"] = full_name
+    if is_active is not None:
+        update_data["is_active"] = is_active
+    user_in = UserUpdate(**update_data)
+
+    user = await crud.async_user.update(
+        db, db_obj=current_user, obj_in=user_in
+    )
+
+    logger.info(f"Update user with success! User: {current_user.email}")
+    return user
+
+
+@router.get("/user/{user_id}/", response_model=User)
+async def get_user_by_id(
+    user_id: int,
+    current_user: DBUser = Depends(get_current_active_superuser_async),
+    db: Database = Depends(get_async_db),
+):
+    """
+    Get a specific user by id.
+    """
+    user = await crud.async_user.get(db, id=user_id)
+    if not user:
+        msg = f"The user {user_id} does not exist in the system"
+        logger.debug(msg)
+        raise HTTPException(
+            status_code=404, detail=msg,
+        )
+
+    return user
+
+
+@router.put("/user/{user_id}/", response_model=User)
+async def update_user_by_id(
+    *,
+    db: Database = Depends(get_async_db),
+    user_id: int,
+    user_in: UserUpdate,
+    current_user: DBUser = Depends(get_current_active_superuser_async),
+):
+    """
+    Update a user.
+    """
+    user = await crud.async_user.get(db, id=user_id)
+    if not user:
+        msg = f"The user {user_id} not found in the system"
+        logger.debug(msg)
+        raise HTTPException(
+            status_code=404, detail=msg,
+        )
+
+    user = await crud.async_user.update(db, db_obj=user, obj_in=user_in)
+    logger.info(f"Update user with success! User: {user_in.email}")
+    return user
@@ -1,17 +1,99 @@
+import csv
+import io
+import json
 import logging
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import StreamingResponse
 
 from cashback import crud
+from cashback.api.utils.bulk import NDJSON_CONTENT_TYPES, parse_bulk_body
 from cashback.api.utils.db import get_db
+from cashback.api.utils.pagination import decode_cursor, set_next_cursor
+from cashback.api.utils.responses import ORJSONResponse
 from cashback.api.utils.security import get_current_active_user
+from cashback.core import config
+from cashback.db.session import Session as SessionLocal
+from cashback.models.order import Order as DBOrder
 from cashback.models.user import User as DBUser
-from cashback.schemas.order import Order, OrderCreate
+from cashback.schemas.order import Order, OrderBulkResult, OrderCreate
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
+# Bulk import and export run on the synchronous session whether or not
+# ASYNC_ENDPOINTS is set, see cashback.api.routes.
+batch_router = APIRouter()
+
+MAX_ORDER_VALUE = 10 ** (
+    DBOrder.value.type.precision - DBOrder.value.type.scale
+)
+
+
+def to_float(value):
+    return float(value) if value is not None else None
+
+
+def export_row(row) -> dict:
+    return {
+        "id": row.id,
+        "code": row.code,
+        "value": to_float(row.value),
+        "cashback_percentage": row.cashback_percentage,
+        "cashback_value": to_float(row.cashback_value),
+        "order_status": row.status.name,
+        "date": row.date.date().isoformat() if row.date else None,
+        "reseller_cpf": row.reseller_cpf,
+    }
+
+
+EXPORT_FIELDS = [
+    "id",
+    "code",
+    "value",
+    "cashback_percentage",
+    "cashback_value",
+    "order_status",
+    "date",
+    "reseller_cpf",
+]
+
+
+def export_orders(
+    cpf: str = None, export_format: str = "ndjson", after: int = 0
+):
+    """
+    Stream orders chunk by chunk with its own session, which outlives the
+    endpoint call.
+    """
+    db = SessionLocal()
+    try:
+        if export_format == "csv":
+            # The header is sent even when no order matches
+            output = io.StringIO()
+            csv.DictWriter(output, fieldnames=EXPORT_FIELDS).writeheader()
+            yield output.getvalue()
+        for rows in crud.order.iter_chunks(
+            db,
+            cpf=cpf,
+            after=after,
+            chunk_size=config.ORDERS_EXPORT_CHUNK_SIZE,
+            page_size=config.ORDERS_EXPORT_PAGE_SIZE,
+        ):
+            rows = [export_row(row) for row in rows]
+            if export_format == "csv":
+                output = io.StringIO()
+                writer = csv.DictWriter(output, fieldnames=EXPORT_FIELDS)
+                writer.writerows(rows)
+                yield output.getvalue()
+            else:
+                yield "".join(json.dumps(row) + "\n" for row in rows)
+    finally:
+        db.close()
 
 
 @router.post("/orders/", response_model=Order, status_code=201)
@@ -23,33 +105,152 @@ def create_order(
 ):
     """
     Create new order.
+
+    Unknown resellers and repeated codes are reported by the constraints
+    on order during the INSERT, without looking the reseller up first.
     """
-    cpf_user = crud.user.get_by_cpf(db, cpf=order_in.reseller_cpf)
-    if not cpf_user:
-        msg = (
-            f"The user with this cpf {cpf_user} already exists in the system."
-        )
+    order = crud.order.create_or_conflict(db_session=db, obj_in=order_in)
+    if isinstance(order, str):
+        logger.debug(order)
         raise HTTPException(
-            status_code=409, detail=msg,
+            status_code=409, detail=order,
         )
-
-    order = crud.order.create_with_reseller(db_session=db, obj_in=order_in)
     logger.info(f"Create order with success! Order: {order.id}")
     return order
 
 
+def import_orders(db: Session, body: bytes, content_type: str) -> List[dict]:
+    """
+    Parse, validate and store a bulk orders body, returning the result of
+    every row. It blocks, so the endpoint runs it in the threadpool.
+    """
+    try:
+        items = parse_bulk_body(body, content_type)
+    except ValueError as err:
+        msg = f"Invalid bulk orders payload: {err}"
+        logger.debug(msg)
+        raise HTTPException(status_code=400, detail=msg)
+
+    if len(items) > config.ORDERS_BULK_MAX_SIZE:
+        msg = f"Send at most {config.ORDERS_BULK_MAX_SIZE} orders per request"
+        logger.debug(msg)
+        raise HTTPException(status_code=413, detail=msg)
+
+    results = [None] * len(items)
+    indexes, orders_in = [], []
+    for index, item in enumerate(items):
+        try:
+            if isinstance(item, Exception):
+                raise item
+            order_in = OrderCreate.parse_obj(item)
+            if order_in.value >= MAX_ORDER_VALUE:
+                raise ValueError(
+                    f"Order value must be below {MAX_ORDER_VALUE}"
+                )
+        except (ValidationError, ValueError) as err:
+            results[index] = {
+                "index": index,
+                "created": False,
+                "detail": str(err),
+            }
+            continue
+        indexes.append(index)
+        orders_in.append(order_in)
+
+    orders = crud.order.create_multi_with_reseller(db, objs_in=orders_in)
+    for index, order in zip(indexes, orders):
+        if isinstance(order, str):
+            results[index] = {
+                "index": index,
+                "created": False,
+                "detail": order,
+            }
+        else:
+            results[index] = {"index": index, "created": True, "order": order}
+
+    created = sum(1 for result in results if result["created"])
+    logger.info(f"Create orders in bulk: {created} of {len(items)} created")
+    return results
+
+
+@batch_router.post("/orders/bulk/", response_model=List[OrderBulkResult])
+async def create_orders_bulk(
+    *,
+    db: Session = Depends(get_db),
+    request: Request,
+    current_user: DBUser = Depends(get_current_active_user),
+):
+    """
+    Create many orders from a JSON array or NDJSON body.
+
+    Only the body is read on the event loop; parsing, validation
+    and the INSERTs run in the threadpool.
+    """
+    body = await request.body()
+    return await run_in_threadpool(
+        import_orders, db, body, request.headers.get("content-type", "")
+    )
+
+
+# pylint: disable=too-many-arguments
+@batch_router.get("/orders/export/")
+def export_orders_stream(
+    db: Session = Depends(get_db),
+    cpf: str = None,
+    export_format: str = Query(
+        "ndjson", alias="format", regex="^(ndjson|csv)$"
+    ),
+    after: int = 0,
+    current_user: DBUser = Depends(get_current_active_user),
+):
+    """
+    Export orders as NDJSON or CSV, streamed as they are read.
+
+    Orders come ordered by id; pass the last exported id as ``after`` to
+    resume an interrupted export.
+    """
+    if current_user.is_superuser:
+        if cpf:
+            user = crud.user.get_by_cpf(db, cpf=cpf)
+            if not user:
+                logger.debug(f"Not found in export_orders - cpf: {cpf}")
+                raise HTTPException(
+                    status_code=404,
+                    detail="The user with this cpf does not exist.",
+                )
+            cpf = user.cpf
+    else:
+        cpf = current_user.cpf
+
+    media_type = (
+        "text/csv" if export_format == "csv" else NDJSON_CONTENT_TYPES[0]
+    )
+    logger.info(f"Export orders as {export_format}")
+    return StreamingResponse(
+        export_orders(cpf=cpf, export_format=export_format, after=after),
+        media_type=media_type,
+    )
+
+
 # pylint: disable=too-many-arguments
 @router.get("/orders/", response_model=List[Order])
 def list_orders(
     db: Session = Depends(get_db),
     cpf: str = None,
     skip: int = 0,
+    after: str = None,
     limit: int = 100,
     current_user: DBUser = Depends(get_current_active_user),
 ):
     """
     List orders.
+
+    Rows are read as column tuples and encoded straight to JSON, skipping
+    the response model validation. Pass the ``X-Next-Cursor`` response
+    header as ``after`` to get the next page. ``skip`` is kept for
+    compatibility and uses OFFSET.
     """
+    after_id = decode_cursor(after)
     if current_user.is_superuser:
         if cpf:
             user = crud.user.get_by_cpf(db, cpf=cpf)
@@ -60,11 +261,34 @@ def list_orders(
                     detail="The user with this cpf does not exist.",
                 )
 
-            orders = crud.order.get_multi_by_reseller(db, cpf=cpf)
+            orders = crud.order.get_multi_by_reseller_after(
+                db,
+                cpf=user.cpf,
+                after=after_id,
+                limit=limit,
+                columns=crud.order.export_columns,
+            )
+        elif skip:
+            orders = crud.order.get_multi(
+                db, skip=skip, limit=limit, columns=crud.order.export_columns,
+            )
         else:
-            orders = crud.order.get_multi(db, skip=skip, limit=limit)
+            orders = crud.order.get_multi_after(
+                db,
+                after=after_id,
+                limit=limit,
+                columns=crud.order.export_columns,
+            )
     else:
-        orders = crud.order.get_multi_by_reseller(db, cpf=current_user.cpf)
+        orders = crud.order.get_multi_by_reseller_after(
+            db,
+            cpf=current_user.cpf,
+            after=after_id,
+            limit=limit,
+            columns=crud.order.export_columns,
+        )
 
+    response = ORJSONResponse([export_row(order) for order in orders])
+    set_next_cursor(response, orders, limit)
     logger.info(f"Get orders with success!")
-    return orders
+    return response
@@ -0,0 +1,59 @@
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from cashback import crud
+from cashback.api.utils.db import get_db
+from cashback.api.utils.security import get_current_active_superuser
+from cashback.core.rules import InvalidCashbackRules
+from cashback.models.user import User as DBUser
+from cashback.schemas.rules import CashbackRuleSet, CashbackRuleSetCreate
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+@router.get("/rules/", response_model=CashbackRuleSet)
+def get_cashback_rules(
+    db: Session = Depends(get_db),
+    current_user: DBUser = Depends(get_current_active_superuser),
+):
+    """
+    Latest cashback rules version.
+    """
+    rule_set = crud.rules.get_latest(db)
+    if not rule_set:
+        msg = "No cashback rules stored, the configured defaults apply"
+        logger.debug(msg)
+        raise HTTPException(status_code=404, detail=msg)
+    return rule_set
+
+
+@router.post("/rules/", response_model=CashbackRuleSet, status_code=201)
+def create_cashback_rules(
+    *,
+    db: Session = Depends(get_db),
+    rules_in: CashbackRuleSetCreate,
+    current_user: DBUser = Depends(get_current_active_superuser),
+):
+    """
+    Store a new cashback rules version.
+
+    Every worker picks it up on its next rules version check, within
+    ``CASHBACK_RULES_REFRESH_INTERVAL`` seconds.
+    """
+    try:
+        rule_set = crud.rules.create_version(db, obj_in=rules_in)
+    except InvalidCashbackRules as err:
+        logger.debug(str(err))
+        raise HTTPException(status_code=400, detail=str(err))
+    except IntegrityError:
+        msg = "Another cashback rules version was created, try again"
+        logger.debug(msg)
+        raise HTTPException(status_code=409, detail=msg)
+
+    crud.rules.refresh(db)
+    logger.info(f"Create cashback rules version {rule_set.version}")
+    return rule_set
@@ -2,34 +2,61 @@ import logging
 from typing import List
 
 from fastapi import APIRouter, Body, Depends, HTTPException
-from fastapi.encoders import jsonable_encoder
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
 
 from cashback import crud
+from cashback.api.utils.bulk import parse_bulk_body
 from cashback.api.utils.db import get_db
+from cashback.api.utils.pagination import decode_cursor, set_next_cursor
+from cashback.api.utils.responses import ORJSONResponse
 from cashback.api.utils.security import (
     get_current_active_superuser,
     get_current_active_user,
 )
+from cashback.core import config
 from cashback.models.user import User as DBUser
-from cashback.schemas.user import User, UserCreate, UserUpdate
+from cashback.schemas.user import User, UserBulkResult, UserCreate, UserUpdate
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
+# Bulk provisioning runs on the synchronous session whether or not
+# ASYNC_ENDPOINTS is set, see cashback.api.routes.
+batch_router = APIRouter()
 
 
+# pylint: disable=too-many-arguments
 @router.get("/users/", response_model=List[User])
 def list_users(
     db: Session = Depends(get_db),
     skip: int = 0,
+    after: str = None,
     limit: int = 100,
     current_user: DBUser = Depends(get_current_active_superuser),
 ):
     """
     List users.
+
+    Rows are read as column tuples and encoded straight to JSON, skipping
+    the response model validation. Pass the ``X-Next-Cursor`` response
+    header as ``after`` to get the next page. ``skip`` is kept for
+    compatibility and uses OFFSET.
     """
-    users = crud.user.get_multi(db, skip=skip, limit=limit)
-    return users
+    columns = crud.user.public_columns
+    if skip:
+        users = crud.user.get_multi(
+            db, skip=skip, limit=limit, columns=columns
+        )
+    else:
+        users = crud.user.get_multi_after(
+            db, after=decode_cursor(after), limit=limit, columns=columns
+        )
+
+    response = ORJSONResponse([dict(zip(user.keys(), user)) for user in users])
+    set_next_cursor(response, users, limit)
+    return response
 
 
 @router.post("/users/", response_model=User, status_code=201)
@@ -41,25 +68,87 @@ def create_user(
 ):
     """
     Create new user.
-    """
-    email_user = crud.user.get_by_email(db, email=user_in.email)
-    cpf_user = crud.user.get_by_cpf(db, cpf=user_in.cpf)
-    if email_user or cpf_user:
-        msg = (
-            f"The user with this email {email_user} or "
-            f"cpf {cpf_user}, already exists in the system."
-        )
 
-        logger.debug(msg)
+    Taken emails and CPFs are reported by the unique indexes during the
+    INSERT, without looking them up first.
+    """
+    user = crud.user.create_or_conflict(db, obj_in=user_in)
+    if isinstance(user, str):
+        logger.debug(user)
         raise HTTPException(
-            status_code=409, detail=msg,
+            status_code=409, detail=user,
         )
 
-    user = crud.user.create(db, obj_in=user_in)
     logger.info(f"Create user with success! User: {user_in.email}")
     return user
 
 
+def import_users(db: Session, body: bytes, content_type: str) -> List[dict]:
+    """
+    Parse, validate and store a bulk users body, returning the result of
+    every row. It blocks, so the endpoint runs it in the threadpool.
+    """
+    try:
+        items = parse_bulk_body(body, content_type)
+    except ValueError as err:
+        msg = f"Invalid bulk users payload: {err}"
+        logger.debug(msg)
+        raise HTTPException(status_code=400, detail=msg)
+
+    if len(items) > config.USERS_BULK_MAX_SIZE:
+        msg = f"Send at most {config.USERS_BULK_MAX_SIZE} users per request"
+        logger.debug(msg)
+        raise HTTPException(status_code=413, detail=msg)
+
+    results = [None] * len(items)
+    indexes, users_in = [], []
+    for index, item in enumerate(items):
+        try:
+            if isinstance(item, Exception):
+                raise item
+            user_in = UserCreate.parse_obj(item)
+        except (ValidationError, ValueError) as err:
+            results[index] = {
+                "index": index,
+                "created": False,
+                "detail": str(err),
+            }
+            continue
+        indexes.append(index)
+        users_in.append(user_in)
+
+    users = crud.user.create_multi(db, objs_in=users_in)
+    for index, user in zip(indexes, users):
+        if isinstance(user, str):
+            results[index] = {"index": index, "created": False, "detail": user}
+        else:
+            results[index] = {"index": index, "created": True, "user": user}
+
+    created = sum(1 for result in results if result["created"])
+    logger.info(f"Create users in bulk: {created} of {len(items)} created")
+    return results
+
+
+@batch_router.post("/users/bulk/", response_model=List[UserBulkResult])
+async def create_users_bulk(
+    *,
+    db: Session = Depends(get_db),
+    request: Request,
+    current_user: DBUser = Depends(get_current_active_superuser),
+):
+    """
+    Create many users from a JSON array or NDJSON body, reporting the
+    result of every row.
+
+    Only the body is read on the event loop; parsing, validation and the
+    INSERTs run in the threadpool.
+    """
+    body = await request.body()
+    return await run_in_threadpool(
+        import_users, db, body, request.headers.get("content-type", "")
+    )
+
+
 @router.get("/user/profile/", response_model=User)
 def get_current_user(
     db: Session = Depends(get_db),
@@ -84,18 +173,18 @@ def update_current_user(
     """
     Update current user.
     """
-    current_user_data = jsonable_encoder(current_user)
-    user_in = UserUpdate(**current_user_data)
+    update_data = {}
     if password is not None:
-        user_in.password = password
+        update_data["password"] = password
     if full_name is not None:
-        user_in.full_name = full_name
+        update_data["full_name"] = full_name
     if is_active is not None:
-        user_in.is_active = is_active
+        update_data["is_active"] = is_active
+    user_in = UserUpdate(**update_data)
 
     user = crud.user.update(db, db_obj=current_user, obj_in=user_in)
 
-    logger.info(f"Update user with success! User: {user_in.email}")
+    logger.info(f"Update user with success! User: {current_user.email}")
     return user
 
 
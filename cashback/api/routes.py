@@ -1,12 +1,39 @@
 from fastapi import APIRouter
 
+from cashback.api.async_endpoints import cashback as async_cashback
+from cashback.api.async_endpoints import login as async_login
+from cashback.api.async_endpoints import orders as async_orders
+from cashback.api.async_endpoints import users as async_users
+from cashback.api.endpoints import orders, users
 from cashback.api.endpoints.cashback import router as cashback_route
 from cashback.api.endpoints.login import router as login_router
-from cashback.api.endpoints.orders import router as order_route
-from cashback.api.endpoints.users import router as user_router
-
-router = APIRouter()
-router.include_router(login_router, tags=["login"])
-router.include_router(user_router, tags=["user"])
-router.include_router(order_route, tags=["order"])
-router.include_router(cashback_route, tags=["cashback"])
+from cashback.api.endpoints.rules import router as rules_router
+from cashback.core import config
+
+
+def build_router(async_endpoints: bool) -> APIRouter:
+    """
+    The API routes, with the async or the sync version of the CRUD
+    endpoints. Both serve the same routes.
+    """
+    router = APIRouter()
+    if async_endpoints:
+        router.include_router(async_login.router, tags=["login"])
+        router.include_router(async_users.router, tags=["user"])
+        router.include_router(async_orders.router, tags=["order"])
+        router.include_router(async_cashback.router, tags=["cashback"])
+    else:
+        router.include_router(login_router, tags=["login"])
+        router.include_router(users.router, tags=["user"])
+        router.include_router(orders.router, tags=["order"])
+        router.include_router(cashback_route, tags=["cashback"])
+
+    # Batch endpoints already move their work to the threadpool and rules
+    # change rarely, both modes share the synchronous endpoints
+    router.include_router(users.batch_router, tags=["user"])
+    router.include_router(orders.batch_router, tags=["order"])
+    router.include_router(rules_router, tags=["rules"])
+    return router
+
+
+router = build_router(config.ASYNC_ENDPOINTS)
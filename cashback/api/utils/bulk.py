@@ -0,0 +1,26 @@
+import json
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson")
+
+
+def parse_bulk_body(body: bytes, content_type: str) -> list:
+    """
+    Parse a JSON array or NDJSON body. Lines of NDJSON that aren't valid
+    JSON are returned as ValueError instances, so they can be reported
+    per row.
+    """
+    if content_type.split(";")[0].strip() in NDJSON_CONTENT_TYPES:
+        items = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError as err:
+                items.append(err)
+        return items
+
+    items = json.loads(body)
+    if not isinstance(items, list):
+        raise ValueError("Expected a JSON array")
+    return items
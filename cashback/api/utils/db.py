@@ -1,5 +1,21 @@
-from starlette.requests import Request
+from databases import Database
 
+from cashback.db.session import Session, database
 
-def get_db(request: Request):
-    return request.state.db
+
+def get_db():
+    """
+    Session scoped to the request that depends on it.
+
+    A connection is only checked out of the pool on the first query and
+    is always given back, even when the endpoint raises.
+    """
+    db = Session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_async_db() -> Database:
+    return database
@@ -0,0 +1,14 @@
+from typing import Any
+
+import orjson
+from starlette.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response encoded with orjson. Content is encoded as is, so it
+    must already be made of JSON types.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
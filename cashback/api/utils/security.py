@@ -1,14 +1,16 @@
 import logging
 
 import jwt
+from databases import Database
 from fastapi import Depends, HTTPException, Security
 from fastapi.security import OAuth2PasswordBearer
 from jwt import PyJWTError
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, make_transient_to_detached
 
 from cashback import crud
-from cashback.api.utils.db import get_db
+from cashback.api.utils.db import get_async_db, get_db
 from cashback.core import config
+from cashback.core.auth_cache import auth_cache
 from cashback.core.jwt import ALGORITHM
 from cashback.models.user import User
 from cashback.schemas.token import TokenPayload
@@ -17,9 +19,11 @@ logger = logging.getLogger(__name__)
 reusable_oauth2 = OAuth2PasswordBearer(tokenUrl="/login/access-token/")
 
 
-def get_current_user(
-    db: Session = Depends(get_db), token: str = Security(reusable_oauth2)
-):
+def decode_token(token: str) -> TokenPayload:
+    user_id = auth_cache.get_user_id(token)
+    if user_id is not None:
+        return TokenPayload(user_id=user_id)
+
     try:
         payload = jwt.decode(token, config.SECRET_KEY, algorithms=[ALGORITHM])
         token_data = TokenPayload(**payload)
@@ -29,7 +33,11 @@ def get_current_user(
         raise HTTPException(
             status_code=403, detail=error_msg,
         )
-    user = crud.user.get(db, id=token_data.user_id)
+    auth_cache.set_token(token, token_data.user_id, payload.get("exp"))
+    return token_data
+
+
+def check_user_found(user):
     if not user:
         error_msg = "User not found"
         logger.error(error_msg)
@@ -37,7 +45,7 @@ def get_current_user(
     return user
 
 
-def get_current_active_user(current_user: User = Security(get_current_user)):
+def check_active_user(current_user: User):
     if not crud.user.is_active(current_user):
         error_msg = "Inactive user"
         logger.error(error_msg)
@@ -45,11 +53,63 @@ def get_current_active_user(current_user: User = Security(get_current_user)):
     return current_user
 
 
-def get_current_active_superuser(
-    current_user: User = Security(get_current_user),
-):
+def check_superuser(current_user: User):
     if not crud.user.is_superuser(current_user):
         error_msg = "The user doesn't have enough privileges"
         logger.error(error_msg)
         raise HTTPException(status_code=403, detail=error_msg)
     return current_user
+
+
+def get_current_user(
+    db: Session = Depends(get_db), token: str = Security(reusable_oauth2)
+):
+    token_data = decode_token(token)
+    user = auth_cache.get_user(token_data.user_id)
+    if user is not None:
+        # Attach the snapshot to the session without a query, so it can
+        # still be updated like a loaded user.
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+
+    user = crud.user.get(db, id=token_data.user_id)
+    if user:
+        auth_cache.set_user(user)
+    return check_user_found(user)
+
+
+def get_current_active_user(current_user: User = Security(get_current_user)):
+    return check_active_user(current_user)
+
+
+def get_current_active_superuser(
+    current_user: User = Security(get_current_user),
+):
+    return check_superuser(current_user)
+
+
+async def get_current_user_async(
+    db: Database = Depends(get_async_db),
+    token: str = Security(reusable_oauth2),
+):
+    token_data = decode_token(token)
+    user = auth_cache.get_user(token_data.user_id)
+    if user is not None:
+        return user
+
+    user = await crud.async_user.get(db, id=token_data.user_id)
+    if user:
+        auth_cache.set_user(user)
+    return check_user_found(user)
+
+
+async def get_current_active_user_async(
+    current_user: User = Security(get_current_user_async),
+):
+    return check_active_user(current_user)
+
+
+async def get_current_active_superuser_async(
+    current_user: User = Security(get_current_user_async),
+):
+    return check_superuser(current_user)
@@ -0,0 +1,66 @@
+import time
+from typing import Optional
+
+from cashback.core import config
+from cashback.core.cache import LRUCache
+from cashback.models.user import User
+
+
+class AuthCache:
+    """
+    Cache of verified tokens and of the users they authenticate.
+
+    Tokens map to the user id and expiration read from the JWT, so a
+    cached token is never accepted after it expires. Users are kept as
+    snapshots of their column values, keyed by id, and are dropped with
+    ``invalidate`` when the user changes. Both caches are per process.
+    """
+
+    def __init__(
+        self, ttl=30, maxsize=10000, timer=time.monotonic, clock=time.time
+    ):
+        self.clock = clock
+        self.tokens = LRUCache(maxsize=maxsize, max_age=ttl, timer=timer)
+        self.users = LRUCache(maxsize=maxsize, max_age=ttl, timer=timer)
+
+    def get_user_id(self, token: str) -> Optional[int]:
+        entry = self.tokens.get(token)
+        if entry is None:
+            return None
+        user_id, expires_at = entry
+        if expires_at is not None and expires_at <= self.clock():
+            self.tokens.delete(token)
+            return None
+        return user_id
+
+    def set_token(self, token: str, user_id: int, expires_at: float = None):
+        self.tokens.set(token, (user_id, expires_at))
+
+    def get_user(self, user_id: int) -> Optional[User]:
+        "Return a new transient User built from the snapshot, if cached"
+        snapshot = self.users.get(user_id)
+        if snapshot is None:
+            return None
+        return User(**snapshot)
+
+    def set_user(self, user: User):
+        snapshot = {
+            column.key: getattr(user, column.key)
+            for column in User.__table__.columns
+        }
+        self.users.set(user.id, snapshot)
+
+    def invalidate(self, user_id: int):
+        self.users.delete(user_id)
+
+    def clear(self):
+        self.tokens.clear()
+        self.users.clear()
+
+    def stats(self) -> dict:
+        return {"tokens": self.tokens.stats(), "users": self.users.stats()}
+
+
+auth_cache = AuthCache(
+    ttl=config.AUTH_CACHE_TTL, maxsize=config.AUTH_CACHE_MAXSIZE
+)
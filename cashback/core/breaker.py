@@ -0,0 +1,197 @@
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open circuit breaker.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls fail fast with ``CircuitOpenError``. Once ``recovery_timeout``
+    seconds have passed it goes half-open and lets ``half_open_max_calls``
+    trial calls through; a success closes it, a failure opens it again.
+    Only exceptions in ``failure_exceptions`` count as failures, any other
+    error means the upstream answered and counts as a success. A
+    cancelled call counts as neither and frees its half-open slot.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    # Numeric state for metrics
+    STATE_CODES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(
+        self,
+        failure_threshold=5,
+        recovery_timeout=30,
+        half_open_max_calls=1,
+        failure_exceptions=(Exception,),
+        timer=time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.failure_exceptions = failure_exceptions
+        self.timer = timer
+        self.failures = 0
+        self.rejected = 0
+        self.transitions = {}
+        self._state = self.CLOSED
+        self._opened_at = None
+        self._half_open_calls = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if (
+                state == self.HALF_OPEN
+                and self._half_open_calls < self.half_open_max_calls
+            ):
+                self._half_open_calls += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            if self._current_state() != self.CLOSED:
+                self._transition(self.CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            state = self._current_state()
+            if state == self.HALF_OPEN or (
+                state == self.CLOSED
+                and self.failures >= self.failure_threshold
+            ):
+                self._transition(self.OPEN)
+
+    async def call(self, func: Callable[[], Awaitable[Any]]) -> Any:
+        if not self.allow_request():
+            raise CircuitOpenError("Circuit breaker is open")
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            self.release()
+            raise
+        except self.failure_exceptions:
+            self.record_failure()
+            raise
+        except Exception:
+            self.record_success()
+            raise
+        self.record_success()
+        return result
+
+    def release(self):
+        "Give back a half-open slot taken by a call that never finished"
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._half_open_calls:
+                self._half_open_calls -= 1
+
+    def reset(self):
+        with self._lock:
+            self.failures = 0
+            self._state = self.CLOSED
+            self._opened_at = None
+            self._half_open_calls = 0
+
+    def stats(self) -> dict:
+        state = self.state
+        return {
+            "state": state,
+            "state_code": self.STATE_CODES[state],
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "transitions": dict(self.transitions),
+        }
+
+    def _current_state(self) -> str:
+        if (
+            self._state == self.OPEN
+            and self.timer() - self._opened_at >= self.recovery_timeout
+        ):
+            self._transition(self.HALF_OPEN)
+        return self._state
+
+    def _transition(self, state):
+        name = f"{self._state}->{state}"
+        self.transitions[name] = self.transitions.get(name, 0) + 1
+        self._state = state
+        self._half_open_calls = 0
+        if state == self.OPEN:
+            self._opened_at = self.timer()
+
+
+class LatencyTracker:
+    """
+    Rolling window of call latencies used to derive an adaptive timeout.
+
+    The timeout is the observed ``percentile`` latency times
+    ``multiplier``, kept between ``min_timeout`` and ``max_timeout``.
+    Until ``min_samples`` calls were observed ``max_timeout`` is used.
+    """
+
+    def __init__(
+        self,
+        window=100,
+        percentile=99,
+        multiplier=2.0,
+        min_timeout=0.5,
+        max_timeout=5.0,
+        min_samples=20,
+    ):
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def observe(self, seconds: float):
+        self._samples.append(seconds)
+
+    def clear(self):
+        self._samples.clear()
+
+    def latency(self) -> float:
+        if not self._samples:
+            return 0.0
+        samples = sorted(self._samples)
+        index = math.ceil(self.percentile / 100 * len(samples)) - 1
+        return samples[max(index, 0)]
+
+    def timeout(self) -> float:
+        if len(self._samples) < self.min_samples:
+            return self.max_timeout
+        timeout = self.latency() * self.multiplier
+        return min(max(timeout, self.min_timeout), self.max_timeout)
+
+    def stats(self) -> dict:
+        return {
+            "samples": len(self._samples),
+            "latency": self.latency(),
+            "timeout": self.timeout(),
+        }
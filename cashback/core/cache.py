@@ -0,0 +1,85 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from typing import Any, Hashable, Optional
+
+CacheEntry = namedtuple("CacheEntry", ["value", "stored_at"])
+
+
+class LRUCache:
+    """
+    Bounded in-process cache with least-recently-used eviction.
+
+    Entries older than ``max_age`` seconds are dropped when read. It is
+    thread safe, so it can be shared by sync endpoints running in the
+    threadpool.
+    """
+
+    def __init__(self, maxsize=1024, max_age=None, timer=time.monotonic):
+        self.maxsize = maxsize
+        self.max_age = max_age
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get_entry(self, key: Hashable) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and self._is_expired(entry):
+                del self._data[key]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self.get_entry(key)
+        if entry is None:
+            return default
+        return entry.value
+
+    def set(self, key: Hashable, value: Any, stored_at: float = None):
+        if stored_at is None:
+            stored_at = self.timer()
+        with self._lock:
+            self._data[key] = CacheEntry(value, stored_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+        }
+
+    def _is_expired(self, entry: CacheEntry) -> bool:
+        if self.max_age is None:
+            return False
+        return self.timer() - entry.stored_at >= self.max_age
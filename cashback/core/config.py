@@ -16,6 +16,35 @@ ACCESS_TOKEN_EXPIRE_MINUTES = (
     60 * 24 * 8
 )  # 60 minutes * 24 hours * 8 days = 8 days
 
+# Cache of verified tokens and authenticated users, per process.
+# Other workers see a deactivated user after at most AUTH_CACHE_TTL
+# seconds; set it to 0 to disable the cache.
+AUTH_CACHE_TTL = config("AUTH_CACHE_TTL", default=30, cast=int)
+AUTH_CACHE_MAXSIZE = config("AUTH_CACHE_MAXSIZE", default=10000, cast=int)
+
+# Password hashing. Hashes with a different cost are rehashed on login.
+PASSWORD_BCRYPT_ROUNDS = config("PASSWORD_BCRYPT_ROUNDS", default=12, cast=int)
+# "thread" or "process" executor for bcrypt, with at most
+# PASSWORD_QUEUE_SIZE calls waiting before requests get a 429
+PASSWORD_EXECUTOR = config("PASSWORD_EXECUTOR", default="thread")
+PASSWORD_WORKERS = config(
+    "PASSWORD_WORKERS", default=os.cpu_count() or 1, cast=int
+)
+PASSWORD_QUEUE_SIZE = config("PASSWORD_QUEUE_SIZE", default=100, cast=int)
+
+# Seconds between publishing the component stats of a worker as metrics
+METRICS_PUBLISH_INTERVAL = config(
+    "METRICS_PUBLISH_INTERVAL", default=5, cast=float
+)
+# SQL profiler: SQL_PROFILE profiles every request; SQL_PROFILE_HEADER
+# lets a request turn it on with "X-SQL-Profile: 1". Statement shapes
+# run at least SQL_PROFILE_REPEAT_THRESHOLD times are reported.
+SQL_PROFILE = config("SQL_PROFILE", default=False, cast=bool)
+SQL_PROFILE_HEADER = config("SQL_PROFILE_HEADER", default=False, cast=bool)
+SQL_PROFILE_REPEAT_THRESHOLD = config(
+    "SQL_PROFILE_REPEAT_THRESHOLD", default=2, cast=int
+)
+
 
 # Logging configuration, as JSON, to stdout.
 LOG_LEVEL = config("LOG_LEVEL", default="INFO")
@@ -67,13 +96,30 @@ DB_USER = config("DB_USER", cast=str)
 DB_PASSWORD = config("DB_PASSWORD", cast=str)
 DB_NAME = config("DB_NAME", cast=str)
 
-if config("TESTING", default=False, cast=bool):
+# Tests run against the test_ database. Benchmarks only seed random data
+# into that or into a database flagged as BENCHMARK_SCRATCH_DB.
+TESTING = config("TESTING", default=False, cast=bool)
+BENCHMARK_SCRATCH_DB = config("BENCHMARK_SCRATCH_DB", default=False, cast=bool)
+
+if TESTING:
     DB_NAME = "test_" + DB_NAME
 
 SQLALCHEMY_DATABASE_URI = (
     f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 )
 
+# Connection pool of the sync engine
+DB_POOL_SIZE = config("DB_POOL_SIZE", default=5, cast=int)
+DB_MAX_OVERFLOW = config("DB_MAX_OVERFLOW", default=10, cast=int)
+DB_POOL_TIMEOUT = config("DB_POOL_TIMEOUT", default=30, cast=int)
+DB_POOL_RECYCLE = config("DB_POOL_RECYCLE", default=1800, cast=int)
+DB_POOL_PRE_PING = config("DB_POOL_PRE_PING", default=True, cast=bool)
+
+# Async endpoints, served through a non-blocking asyncpg pool
+ASYNC_ENDPOINTS = config("ASYNC_ENDPOINTS", default=False, cast=bool)
+ASYNC_DB_MIN_SIZE = config("ASYNC_DB_MIN_SIZE", default=5, cast=int)
+ASYNC_DB_MAX_SIZE = config("ASYNC_DB_MAX_SIZE", default=20, cast=int)
+
 
 # User
 FIRST_SUPERUSER_EMAIL = config("FIRST_SUPERUSER_EMAIL", cast=str)
@@ -88,13 +134,86 @@ CPFS_WITH_AUTO_APPROVE = [
 ### Cashback rules
 # Configure rules to calculate cashback per Order
 # (percent, start value, end value)
+# These and CPFS_WITH_AUTO_APPROVE are the defaults, used until a rules
+# version is stored in the database (see cashback.crud.crud_rules)
 CASHBACK_RULES = (
     (10, Decimal("0"), Decimal("999.99")),
     (15, Decimal("1000"), Decimal("1499.99")),
     (20, Decimal("1500"), Decimal("100000000")),
 )
+# Seconds between checks for a new version of the stored rules
+CASHBACK_RULES_REFRESH_INTERVAL = config(
+    "CASHBACK_RULES_REFRESH_INTERVAL", default=30, cast=int
+)
+
+# Bulk order import and export
+ORDERS_BULK_MAX_SIZE = config("ORDERS_BULK_MAX_SIZE", default=10000, cast=int)
+ORDERS_BULK_CHUNK_SIZE = config(
+    "ORDERS_BULK_CHUNK_SIZE", default=1000, cast=int
+)
+ORDERS_EXPORT_CHUNK_SIZE = config(
+    "ORDERS_EXPORT_CHUNK_SIZE", default=1000, cast=int
+)
+# Orders read per export transaction
+ORDERS_EXPORT_PAGE_SIZE = config(
+    "ORDERS_EXPORT_PAGE_SIZE", default=10000, cast=int
+)
+
+# Bulk user provisioning
+USERS_BULK_MAX_SIZE = config("USERS_BULK_MAX_SIZE", default=10000, cast=int)
+USERS_BULK_CHUNK_SIZE = config("USERS_BULK_CHUNK_SIZE", default=1000, cast=int)
+
+# Order outbox worker, see cashback.db.outbox
+OUTBOX_BATCH_SIZE = config("OUTBOX_BATCH_SIZE", default=500, cast=int)
+OUTBOX_POLL_INTERVAL = config("OUTBOX_POLL_INTERVAL", default=1.0, cast=float)
 
 ### Extensions
 # Boticario
 BOTICARIO_BASE_URL = config("BOTICARIO_BASE_URL", cast=str)
 BOTICARIO_API_TOKEN = config("BOTICARIO_API_TOKEN", cast=str)
+BOTICARIO_TIMEOUT = config("BOTICARIO_TIMEOUT", default=5.0, cast=float)
+BOTICARIO_MAX_CONNECTIONS = config(
+    "BOTICARIO_MAX_CONNECTIONS", default=100, cast=int
+)
+BOTICARIO_MAX_KEEPALIVE = config(
+    "BOTICARIO_MAX_KEEPALIVE", default=20, cast=int
+)
+BOTICARIO_MAX_CONCURRENCY = config(
+    "BOTICARIO_MAX_CONCURRENCY", default=50, cast=int
+)
+# Adaptive timeout: percentile latency * multiplier, capped by
+# BOTICARIO_TIMEOUT
+BOTICARIO_MIN_TIMEOUT = config(
+    "BOTICARIO_MIN_TIMEOUT", default=0.5, cast=float
+)
+BOTICARIO_TIMEOUT_PERCENTILE = config(
+    "BOTICARIO_TIMEOUT_PERCENTILE", default=99, cast=int
+)
+BOTICARIO_TIMEOUT_MULTIPLIER = config(
+    "BOTICARIO_TIMEOUT_MULTIPLIER", default=2.0, cast=float
+)
+# Circuit breaker
+BOTICARIO_BREAKER_FAILURE_THRESHOLD = config(
+    "BOTICARIO_BREAKER_FAILURE_THRESHOLD", default=5, cast=int
+)
+BOTICARIO_BREAKER_RECOVERY_TIMEOUT = config(
+    "BOTICARIO_BREAKER_RECOVERY_TIMEOUT", default=30, cast=int
+)
+BOTICARIO_BREAKER_FALLBACK = config(
+    "BOTICARIO_BREAKER_FALLBACK", default=True, cast=bool
+)
+# Credit cache, values in seconds
+CREDIT_CACHE_TTL = config("CREDIT_CACHE_TTL", default=60, cast=int)
+CREDIT_CACHE_STALE_TTL = config(
+    "CREDIT_CACHE_STALE_TTL", default=300, cast=int
+)
+CREDIT_CACHE_MAXSIZE = config("CREDIT_CACHE_MAXSIZE", default=10000, cast=int)
+# How long an expired credit is kept as a fallback when Boticario is down
+CREDIT_CACHE_FALLBACK_TTL = config(
+    "CREDIT_CACHE_FALLBACK_TTL", default=3600, cast=int
+)
+# Share cached credits between workers through the cached_credit table.
+# Each worker still keeps a credit locally for CREDIT_CACHE_LOCAL_TTL, so
+# a credit dropped from the table may be served that much longer.
+CREDIT_CACHE_SHARED = config("CREDIT_CACHE_SHARED", default=True, cast=bool)
+CREDIT_CACHE_LOCAL_TTL = config("CREDIT_CACHE_LOCAL_TTL", default=5, cast=int)
@@ -0,0 +1,259 @@
+"""
+Prometheus metrics.
+
+Metrics are process local unless the ``prometheus_multiproc_dir``
+environment variable points to an empty directory shared by all the
+workers, as ``make runserver`` does. In that case every worker writes its
+samples there and ``/metrics`` merges them, whichever worker serves it.
+"""
+import asyncio
+import logging
+import os
+import re
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+MULTIPROCESS = bool(os.environ.get("prometheus_multiproc_dir"))
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+)
+DB_QUERIES = Counter(
+    "db_queries_total", "SQL statements executed through the engine"
+)
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds", "Latency of each SQL statement"
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request",
+    "SQL statements executed per HTTP request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "db_query_seconds_per_request",
+    "Time spent in SQL statements per HTTP request",
+    ["route"],
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time waited for a connection from the SQLAlchemy pool",
+)
+BOTICARIO_LATENCY = Histogram(
+    "boticario_request_duration_seconds", "Latency of Boticario API calls"
+)
+BOTICARIO_ERRORS = Counter(
+    "boticario_errors_total", "Failed Boticario API calls", ["reason"]
+)
+
+
+class RequestStats:
+    "SQL statements run while serving one request"
+
+    __slots__ = ("queries", "query_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.query_time = 0.0
+
+
+request_stats = ContextVar("request_stats", default=None)
+
+
+def observe_query(seconds: float):
+    DB_QUERIES.inc()
+    DB_QUERY_LATENCY.observe(seconds)
+    stats = request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.query_time += seconds
+
+
+def route_template(scope: Scope) -> str:
+    "Path template of the matched route, to keep label cardinality low"
+    for route in scope["app"].router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Records latency and SQL statements of every HTTP request.
+
+    A plain ASGI middleware, so streamed responses pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = route_template(scope)
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUEST_LATENCY.labels(scope["method"], route, status).observe(
+                time.perf_counter() - start
+            )
+            DB_QUERIES_PER_REQUEST.labels(route).observe(stats.queries)
+            DB_TIME_PER_REQUEST.labels(route).observe(stats.query_time)
+            request_stats.reset(token)
+
+
+class StatsCollector:
+    """
+    Publishes the ``stats()`` dicts of in-process components as metrics.
+
+    Every worker publishes its own stats, periodically and before serving
+    a scrape. Keys matching ``counters`` (see ``is_counter``) become
+    Counters, increased by what the value grew since the last publish, so
+    they add up over all the workers. Other numbers become Gauges summed
+    over live workers unless ``modes`` gives another ``multiprocess_mode``
+    for the key. Strings are skipped.
+    """
+
+    def __init__(self, registry: CollectorRegistry = REGISTRY):
+        self.registry = registry
+        self.sources: Dict[str, tuple] = {}
+        self.metrics: Dict[str, Any] = {}
+        self.published: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def register(
+        self,
+        name: str,
+        stats: Callable[[], dict],
+        *,
+        counters: Iterable[str] = (),
+        modes: Dict[str, str] = None,
+    ):
+        self.sources[name] = (stats, tuple(counters), modes or {})
+
+    def publish(self):
+        with self._lock:
+            for name, (stats, counters, modes) in self.sources.items():
+                for key, value in flatten(stats()).items():
+                    if isinstance(value, bool) or not isinstance(
+                        value, (int, float)
+                    ):
+                        continue
+                    metric_name = f"cashback_{name}_{key}"
+                    if is_counter(key, counters):
+                        self._publish_counter(metric_name, value)
+                    else:
+                        mode = modes.get(key, "livesum")
+                        self._gauge(metric_name, mode).set(value)
+
+    async def run(self, interval: float):
+        "Publish every ``interval`` seconds, forever"
+        while True:
+            try:
+                self.publish()
+            except Exception as err:
+                logger.error(f"Error publishing stats metrics: {err}")
+            await asyncio.sleep(interval)
+
+    def _publish_counter(self, metric_name: str, value: float):
+        last = self.published.get(metric_name, 0)
+        # A counter below its last value was reset, all of it is new
+        increase = value - last if value >= last else value
+        counter = self._counter(metric_name)
+        if increase:
+            counter.inc(increase)
+        self.published[metric_name] = value
+
+    def _counter(self, metric_name: str) -> Counter:
+        if metric_name not in self.metrics:
+            self.metrics[metric_name] = Counter(
+                metric_name, metric_name, registry=self.registry
+            )
+        return self.metrics[metric_name]
+
+    def _gauge(self, metric_name: str, mode: str) -> Gauge:
+        if metric_name not in self.metrics:
+            self.metrics[metric_name] = Gauge(
+                metric_name,
+                metric_name,
+                multiprocess_mode=mode,
+                registry=self.registry,
+            )
+        return self.metrics[metric_name]
+
+
+def is_counter(key: str, counters: Iterable[str]) -> bool:
+    """
+    A flattened key is a counter when a name in ``counters`` is the key,
+    its last part (``tokens_hits`` for ``hits``) or the dict it was
+    flattened from (``transitions_closed__open`` for ``transitions``).
+    """
+    return any(
+        key == counter
+        or key.endswith(f"_{counter}")
+        or key.startswith(f"{counter}_")
+        for counter in counters
+    )
+
+
+def flatten(stats: dict, prefix="") -> dict:
+    flat = {}
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}_"))
+        else:
+            flat[re.sub(r"\W", "_", f"{prefix}{key}")] = value
+    return flat
+
+
+stats_collector = StatsCollector()
+
+
+def get_registry() -> CollectorRegistry:
+    if not MULTIPROCESS:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def metrics_endpoint(request: Request) -> Response:
+    stats_collector.publish()
+    return Response(
+        generate_latest(get_registry()), media_type=CONTENT_TYPE_LATEST
+    )
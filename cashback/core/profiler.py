@@ -0,0 +1,130 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import List, Tuple
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from cashback.core import config
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-sql-profile"
+PARAM_SUFFIX = re.compile(r"(%\(\w+?)_m?\d+(\)s)")
+PARAM_LISTS = re.compile(r"(%\(\w+\)s)(, %\(\w+\)s)+")
+ROW_LISTS = re.compile(r"(\((?:%\(\w+\)s|[^()])*\))(, \1)+")
+WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """
+    Statement with whitespace collapsed and numbered parameters folded,
+    so ``IN`` lists and multi-row VALUES of any length look the same.
+    """
+    shape = WHITESPACE.sub(" ", statement).strip()
+    shape = PARAM_SUFFIX.sub(r"\1_N\2", shape)
+    shape = PARAM_LISTS.sub(r"\1, ...", shape)
+    return ROW_LISTS.sub(r"\1, ...", shape)
+
+
+class SQLProfile:
+    "Statements run while serving one request"
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.total_time += seconds
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold=2) -> List[Tuple[str, int]]:
+        "Statement shapes run at least threshold times, most run first"
+        return [
+            (shape, count)
+            for shape, count in self.shapes.most_common()
+            if count >= threshold
+        ]
+
+
+sql_profile = ContextVar("sql_profile", default=None)
+
+
+def record_query(statement: str, seconds: float):
+    profile = sql_profile.get()
+    if profile is not None:
+        profile.record(statement, seconds)
+
+
+class SQLProfilerMiddleware:
+    """
+    Profiles the SQL of a request when ``SQL_PROFILE`` is set, or when
+    ``SQL_PROFILE_HEADER`` is set and the request sends ``X-SQL-Profile``.
+
+    The statement count, time and number of repeated statement shapes
+    are added as ``X-SQL-*`` response headers, and the repeated shapes,
+    the usual sign of an N+1 query, are logged.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    def is_enabled(self, scope: Scope) -> bool:
+        if config.SQL_PROFILE:
+            return True
+        if not config.SQL_PROFILE_HEADER:
+            return False
+        return Headers(scope=scope).get(PROFILE_HEADER, "") not in ("", "0")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.is_enabled(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = SQLProfile()
+        token = sql_profile.set(profile)
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                repeated = profile.repeated(
+                    config.SQL_PROFILE_REPEAT_THRESHOLD
+                )
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-sql-count", str(profile.count).encode()),
+                    (
+                        b"x-sql-time",
+                        f"{profile.total_time * 1000:.2f}ms".encode(),
+                    ),
+                    (b"x-sql-repeated", str(len(repeated)).encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sql_profile.reset(token)
+            self.log(scope, profile, time.perf_counter() - start)
+
+    def log(self, scope: Scope, profile: SQLProfile, elapsed: float):
+        repeated = profile.repeated(config.SQL_PROFILE_REPEAT_THRESHOLD)
+        logger.info(
+            f"SQL profile {scope['method']} {scope['path']}: "
+            f"{profile.count} queries in {profile.total_time * 1000:.2f}ms "
+            f"of {elapsed * 1000:.2f}ms, {len(repeated)} repeated",
+            extra={
+                "sql_count": profile.count,
+                "sql_time": profile.total_time,
+                "sql_repeated": [
+                    {"statement": shape, "count": count}
+                    for shape, count in repeated
+                ],
+            },
+        )
+        for shape, count in repeated:
+            logger.warning(f"Possible N+1: {count}x {shape}")
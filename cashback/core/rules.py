@@ -0,0 +1,209 @@
+import logging
+import time
+from bisect import bisect_right
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+from cashback.core import config
+
+logger = logging.getLogger(__name__)
+
+CENT = Decimal("0.01")
+
+Cashback = Tuple[Optional[Decimal], Optional[int]]
+
+
+class InvalidCashbackRules(ValueError):
+    pass
+
+
+class CashbackRules:
+    """
+    Cashback rules compiled into a sorted boundary array.
+
+    Rules are ``(percent, start value, end value)`` tuples with inclusive
+    bounds in cents, so each rule must start one cent after the previous
+    one ends. Values are rounded half up to cents, as PostgreSQL rounds
+    numeric columns, and looked up with bisect over the start values,
+    which keeps values such as 999.995 from falling between two rules.
+    Gaps and overlaps raise ``InvalidCashbackRules``.
+    """
+
+    def __init__(self, rules: Iterable[Tuple[int, Decimal, Decimal]]):
+        rules = sorted(
+            (
+                (percent, self.to_cents(start), self.to_cents(end))
+                for percent, start, end in rules
+            ),
+            key=lambda rule: rule[1],
+        )
+        if not rules:
+            raise InvalidCashbackRules("At least one rule is required")
+
+        for percent, start, end in rules:
+            if start > end:
+                raise InvalidCashbackRules(
+                    f"Rule {percent}% starts at {start} after its end {end}"
+                )
+        for previous, rule in zip(rules, rules[1:]):
+            if rule[1] <= previous[2]:
+                raise InvalidCashbackRules(
+                    f"Rules {previous[0]}% and {rule[0]}% overlap "
+                    f"between {rule[1]} and {previous[2]}"
+                )
+            if rule[1] != previous[2] + CENT:
+                raise InvalidCashbackRules(
+                    f"Gap between {previous[2]} and {rule[1]}"
+                )
+
+        self.starts = [start for _, start, _ in rules]
+        self.percentages = [percent for percent, _, _ in rules]
+        self.end = rules[-1][2]
+        self.start_cents = [int(start * 100) for start in self.starts]
+        self.end_cents = int(self.end * 100)
+
+    @staticmethod
+    def to_cents(value) -> Decimal:
+        return Decimal(value).quantize(CENT, rounding=ROUND_HALF_UP)
+
+    @staticmethod
+    def cashback(cents: Decimal, percent: int) -> Decimal:
+        "Cashback of a value already rounded to cents, rounded half up"
+        return (cents * percent / 100).quantize(CENT, rounding=ROUND_HALF_UP)
+
+    def percentage(self, value) -> Optional[int]:
+        "Percentage of the rule matching value, or None if out of range"
+        cents = self.to_cents(value)
+        if cents > self.end:
+            return None
+        index = bisect_right(self.starts, cents) - 1
+        if index < 0:
+            return None
+        return self.percentages[index]
+
+    def calculate(self, value) -> Cashback:
+        """
+        Return (cashback value, percentage) for one order value. The value
+        is rounded to cents first, so the result is the one computed from
+        the stored value.
+        """
+        cents = self.to_cents(value)
+        percent = self.percentage(cents)
+        if percent is None:
+            return None, None
+        return self.cashback(cents, percent), percent
+
+    def compute(self, values: Sequence) -> List[Cashback]:
+        "Return (cashback value, percentage) for many order values"
+        starts, percentages, end = self.starts, self.percentages, self.end
+        results = []
+        for value in values:
+            cents = self.to_cents(value)
+            index = bisect_right(starts, cents) - 1
+            if cents > end or index < 0:
+                results.append((None, None))
+            else:
+                percent = percentages[index]
+                results.append((self.cashback(cents, percent), percent))
+        return results
+
+    def compute_cents(
+        self, values: Sequence[int]
+    ) -> Tuple[List[Optional[int]], List[Optional[int]]]:
+        """
+        Return (percentages, cashback values) for values in integer cents.
+
+        Everything stays in integer arithmetic; cashback is rounded half
+        up to the cent, as PostgreSQL rounds numeric columns.
+        """
+        starts, percentages, end = (
+            self.start_cents,
+            self.percentages,
+            self.end_cents,
+        )
+        matched, cashbacks = [], []
+        for cents in values:
+            index = bisect_right(starts, cents) - 1
+            if cents > end or index < 0:
+                matched.append(None)
+                cashbacks.append(None)
+            else:
+                percent = percentages[index]
+                matched.append(percent)
+                cashbacks.append((cents * percent + 50) // 100)
+        return matched, cashbacks
+
+
+class RulesSnapshot:
+    """
+    One version of the cashback configuration, compiled for lookups: the
+    tiers as a ``CashbackRules`` boundary array and the auto approve CPFs,
+    already normalized, as a frozenset.
+    """
+
+    def __init__(self, version: int, rules, auto_approve_cpfs=()):
+        if not isinstance(rules, CashbackRules):
+            rules = CashbackRules(rules)
+        self.version = version
+        self.rules = rules
+        self.auto_approve_cpfs = frozenset(auto_approve_cpfs)
+
+    def is_auto_approve(self, cpf) -> bool:
+        return cpf in self.auto_approve_cpfs
+
+
+class RulesStore:
+    """
+    Holds the snapshot orders are computed with in this process.
+
+    ``refresh`` asks for the latest version, a single cheap query, and
+    only loads and compiles the rules when it moved. Callers run it every
+    ``interval`` seconds instead of once per order, so a new version
+    reaches every worker within ``interval`` seconds.
+    """
+
+    def __init__(
+        self, snapshot: RulesSnapshot, interval=30, timer=time.monotonic
+    ):
+        self.snapshot = snapshot
+        self.interval = interval
+        self.timer = timer
+        self.checked_at = None
+        self.reloads = 0
+
+    def is_due(self) -> bool:
+        return (
+            self.checked_at is None
+            or self.timer() - self.checked_at >= self.interval
+        )
+
+    def refresh(
+        self,
+        latest_version: Callable[[], Optional[int]],
+        load: Callable[[int], Optional[RulesSnapshot]],
+    ) -> bool:
+        "Swap in the latest snapshot, return whether it changed"
+        self.checked_at = self.timer()
+        version = latest_version()
+        if version is None or version == self.snapshot.version:
+            return False
+        snapshot = load(version)
+        if snapshot is None:
+            return False
+        self.snapshot = snapshot
+        self.reloads += 1
+        logger.info(f"Cashback rules version {version} loaded")
+        return True
+
+    def stats(self) -> dict:
+        return {"version": self.snapshot.version, "reloads": self.reloads}
+
+
+cashback_rules = CashbackRules(config.CASHBACK_RULES)
+
+# Version 0 is the configuration default, used until the database has
+# rules of its own.
+rules_store = RulesStore(
+    RulesSnapshot(0, cashback_rules, config.CPFS_WITH_AUTO_APPROVE),
+    interval=config.CASHBACK_RULES_REFRESH_INTERVAL,
+)
@@ -1,11 +1,160 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from cashback.core import config
+from cashback.core.breaker import LatencyTracker
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=config.PASSWORD_BCRYPT_ROUNDS,
+    bcrypt__min_rounds=config.PASSWORD_BCRYPT_ROUNDS,
+    bcrypt__max_rounds=config.PASSWORD_BCRYPT_ROUNDS,
+)
 
 
 def verify_password(plain_password: str, hashed_password: str):
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify the password and return a new hash for it when the stored one
+    was made with another cost factor or scheme.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def get_password_hash(password: str):
     return pwd_context.hash(password)
+
+
+def get_password_hashes(passwords: List[str]) -> List[str]:
+    "Hash a chunk of passwords in one pool task"
+    return [pwd_context.hash(password) for password in passwords]
+
+
+class PasswordQueueFull(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=429,
+            detail="Too many password requests, try again later",
+            headers={"Retry-After": "1"},
+        )
+
+
+class PasswordExecutor:
+    """
+    Runs bcrypt calls on a dedicated thread or process pool.
+
+    At most ``workers + queue_size`` calls are accepted at a time; the
+    next ones fail fast with ``PasswordQueueFull`` (429) instead of
+    waiting behind a login storm. Latency of accepted calls, queue wait
+    included, is kept for ``stats``.
+    """
+
+    def __init__(self, workers=1, queue_size=100, processes=False):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.processes = processes
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.latency = LatencyTracker(window=1000, percentile=99)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                executor_class = (
+                    ProcessPoolExecutor
+                    if self.processes
+                    else ThreadPoolExecutor
+                )
+                self._executor = executor_class(max_workers=self.workers)
+            return self._executor
+
+    def submit(self, func: Callable, *args) -> Future:
+        with self._lock:
+            if self.pending >= self.workers + self.queue_size:
+                self.rejected += 1
+                raise PasswordQueueFull()
+            self.pending += 1
+
+        started = time.perf_counter()
+
+        def done(_):
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+            self.latency.observe(time.perf_counter() - started)
+
+        try:
+            future = self.get_executor().submit(func, *args)
+        except Exception:
+            with self._lock:
+                self.pending -= 1
+            raise
+        future.add_done_callback(done)
+        return future
+
+    def run(self, func: Callable, *args):
+        "Run func on the pool and wait for it from a sync caller"
+        return self.submit(func, *args).result()
+
+    def map_chunks(
+        self, func: Callable, items: Sequence, chunk_size: int = 50
+    ) -> list:
+        """
+        Run ``func`` over chunks of ``items`` and concatenate the results.
+
+        Only ``workers`` chunks are queued at a time, so a large batch
+        uses every worker without taking the queue slots of logins.
+        """
+        results, pending = [], deque()
+        for start in range(0, len(items), chunk_size):
+            if len(pending) >= self.workers:
+                results.extend(pending.popleft().result())
+            pending.append(
+                self.submit(func, items[start : start + chunk_size])
+            )
+        while pending:
+            results.extend(pending.popleft().result())
+        return results
+
+    async def run_async(self, func: Callable, *args):
+        "Run func on the pool without blocking the event loop"
+        return await asyncio.wrap_future(self.submit(func, *args))
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "latency_p99": self.latency.latency(),
+        }
+
+
+password_executor = PasswordExecutor(
+    workers=config.PASSWORD_WORKERS,
+    queue_size=config.PASSWORD_QUEUE_SIZE,
+    processes=config.PASSWORD_EXECUTOR == "process",
+)
@@ -0,0 +1,44 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key.
+
+    While a call for ``key`` is in flight, later callers wait for it and
+    receive its result (or exception) instead of starting their own.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._flights = {}
+
+    def __len__(self):
+        return len(self._flights)
+
+    async def do(
+        self, key: Hashable, func: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        future = self._flights.get(key)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            self.calls += 1
+            future = asyncio.ensure_future(func())
+            self._flights[key] = future
+            future.add_done_callback(lambda _: self._forget(key, future))
+        # Shielded so one cancelled caller doesn't cancel the shared call.
+        return await asyncio.shield(future)
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._flights),
+        }
+
+    def _forget(self, key, future):
+        if self._flights.get(key) is future:
+            del self._flights[key]
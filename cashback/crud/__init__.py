@@ -1,3 +1,6 @@
 # pylint: disable=unused-import
+from cashback.crud.async_crud_order import order as async_order
+from cashback.crud.async_crud_user import user as async_user
 from cashback.crud.crud_order import order
+from cashback.crud.crud_rules import rules
 from cashback.crud.crud_user import user
@@ -0,0 +1,120 @@
+from typing import Generic, List, Optional, Type, TypeVar
+
+from databases import Database
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+from cashback.crud.utils import changed_values
+from cashback.db.base_class import Base
+
+ModelType = TypeVar("ModelType", bound=Base)
+CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
+UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
+
+
+# pylint: disable=redefined-builtin
+class AsyncCRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    def __init__(self, model: Type[ModelType]):
+        """
+        Async CRUD object with default methods to Create, Read, Update,
+        Delete (CRUD).
+
+        Queries run through ``databases`` on a non-blocking connection
+        pool. Rows are returned as transient model instances, so they can
+        be used like the ones returned by ``CRUDBase``, but ORM events
+        and lazy relationships are not available.
+        """
+        self.model = model
+        self.table = model.__table__
+
+    async def get(self, db: Database, id: int) -> Optional[ModelType]:
+        query = self.table.select().where(self.table.c.id == id)
+        return self.to_model(await db.fetch_one(query))
+
+    async def get_multi(
+        self, db: Database, *, skip=0, limit=100
+    ) -> List[ModelType]:
+        query = self.table.select().offset(skip).limit(limit)
+        return self.to_models(await db.fetch_all(query))
+
+    async def get_multi_after(
+        self, db: Database, *, after: int = None, limit=100, criteria=()
+    ) -> List[ModelType]:
+        "Keyset pagination, as ``CRUDBase.get_multi_after``"
+        query = self.table.select()
+        for criterion in criteria:
+            query = query.where(criterion)
+        if after is not None:
+            query = query.where(self.table.c.id > after)
+        query = query.order_by(self.table.c.id).limit(limit)
+        return self.to_models(await db.fetch_all(query))
+
+    async def create(
+        self, db: Database, *, obj_in: CreateSchemaType
+    ) -> ModelType:
+        obj_in_data = jsonable_encoder(obj_in)
+        return await self.insert(db, values=obj_in_data)
+
+    async def update(
+        self, db: Database, *, db_obj: ModelType, obj_in: UpdateSchemaType,
+    ) -> ModelType:
+        values = changed_values(
+            self.table, db_obj, obj_in.dict(skip_defaults=True)
+        )
+        if not values:
+            return db_obj
+        return await self.update_values(db, id=db_obj.id, values=values)
+
+    async def remove(self, db: Database, *, id: int) -> ModelType:
+        query = (
+            self.table.delete()
+            .where(self.table.c.id == id)
+            .returning(*self.table.c)
+        )
+        return self.to_model(await db.fetch_one(query))
+
+    async def insert(self, db: Database, *, values: dict) -> ModelType:
+        values = self.with_defaults(values)
+        query = self.table.insert().values(**values).returning(*self.table.c)
+        return self.to_model(await db.fetch_one(query))
+
+    async def update_values(
+        self, db: Database, *, id: int, values: dict
+    ) -> ModelType:
+        values = {
+            field: value
+            for field, value in values.items()
+            if field in self.table.c
+        }
+        values = self.with_defaults(values, attr="onupdate")
+        query = (
+            self.table.update()
+            .where(self.table.c.id == id)
+            .values(**values)
+            .returning(*self.table.c)
+        )
+        return self.to_model(await db.fetch_one(query))
+
+    def with_defaults(self, values: dict, attr="default") -> dict:
+        """
+        Fill in Python side column defaults, which are only applied by
+        SQLAlchemy's own execution context.
+        """
+        values = dict(values)
+        for column in self.table.columns:
+            default = getattr(column, attr)
+            if default is None or default.is_sequence or column.name in values:
+                continue
+            if default.is_scalar:
+                values[column.name] = default.arg
+            elif default.is_callable:
+                values[column.name] = default.arg(None)
+        return values
+
+    def to_model(self, row) -> Optional[ModelType]:
+        if row is None:
+            return None
+        return self.model(**dict(row))
+
+    def to_models(self, rows) -> List[ModelType]:
+        return [self.to_model(row) for row in rows]
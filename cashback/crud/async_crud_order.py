@@ -0,0 +1,102 @@
+import datetime
+import logging
+from decimal import Decimal
+from typing import List, Union
+
+from asyncpg.exceptions import IntegrityConstraintViolationError
+from databases import Database
+
+from cashback.crud.async_base import AsyncCRUDBase
+from cashback.crud.crud_order import (
+    build_summary,
+    order_conflict,
+    summary_query,
+)
+from cashback.crud.utils import normalize_cpf
+from cashback.models.order import Order, OrderStatus
+from cashback.models.order_event import ORDER_CREATED, OrderEvent
+from cashback.schemas.order import OrderCreate, OrderUpdate
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncCRUDOrder(AsyncCRUDBase[Order, OrderCreate, OrderUpdate]):
+    async def create_with_reseller(
+        self, db: Database, *, obj_in: OrderCreate
+    ) -> Order:
+        db_obj = Order(
+            code=obj_in.code,
+            value=Decimal(obj_in.value),
+            date=obj_in.date,
+            reseller_cpf=normalize_cpf(obj_in.reseller_cpf),
+            status=OrderStatus.IN_VALIDATION,
+        )
+        # Same work as the Order insert hooks, which only run inside an
+        # ORM flush.
+        db_obj.calculate_cashback_value()
+        values = {
+            "code": db_obj.code,
+            "value": db_obj.value,
+            "cashback_percentage": db_obj.cashback_percentage,
+            "cashback_value": db_obj.cashback_value,
+            "rules_version": db_obj.rules_version,
+            "status": db_obj.status,
+            "date": db_obj.date,
+            "reseller_cpf": db_obj.reseller_cpf,
+        }
+        try:
+            async with db.transaction():
+                order = await self.insert(db, values=values)
+                await db.execute(
+                    OrderEvent.__table__.insert().values(
+                        order_id=order.id,
+                        event=ORDER_CREATED,
+                        created_at=datetime.datetime.now(),
+                    )
+                )
+        except Exception as err:
+            logger.error(
+                f"DB error in AsyncCRUDOrder create_with_reseller: {err}"
+            )
+            raise
+        return order
+
+    async def create_or_conflict(
+        self, db: Database, *, obj_in: OrderCreate
+    ) -> Union[Order, str]:
+        "Create the order, or return why it conflicts"
+        try:
+            return await self.create_with_reseller(db, obj_in=obj_in)
+        except IntegrityConstraintViolationError as err:
+            reason = order_conflict(err)
+            if reason is None:
+                raise
+            return reason
+
+    async def get_multi_by_reseller(
+        self, db: Database, *, cpf: str, skip=0, limit=100
+    ) -> List[Order]:
+        query = (
+            self.table.select()
+            .where(Order.reseller_cpf == cpf)
+            .offset(skip)
+            .limit(limit)
+        )
+        return self.to_models(await db.fetch_all(query))
+
+    async def get_multi_by_reseller_after(
+        self, db: Database, *, cpf: str, after: int = None, limit=100
+    ) -> List[Order]:
+        return await self.get_multi_after(
+            db,
+            after=after,
+            limit=limit,
+            criteria=(Order.reseller_cpf == cpf,),
+        )
+
+    async def get_summary_by_reseller(self, db: Database, *, cpf: str) -> dict:
+        rows = await db.fetch_all(summary_query(cpf))
+        return build_summary(cpf, rows)
+
+
+order = AsyncCRUDOrder(Order)
@@ -0,0 +1,116 @@
+import logging
+from typing import Optional, Union
+
+from asyncpg.exceptions import IntegrityConstraintViolationError
+from databases import Database
+
+from cashback.core.auth_cache import auth_cache
+from cashback.core.security import (
+    get_password_hash,
+    password_executor,
+    verify_and_update_password,
+)
+from cashback.crud.async_base import AsyncCRUDBase
+from cashback.crud.crud_user import user_conflict
+from cashback.crud.utils import changed_values, normalize_cpf
+from cashback.models.user import User
+from cashback.schemas.user import UserCreate, UserUpdate
+
+logger = logging.getLogger(__name__)
+
+
+# pylint: disable=redefined-outer-name,redefined-builtin
+class AsyncCRUDUser(AsyncCRUDBase[User, UserCreate, UserUpdate]):
+    async def get_by_email(
+        self, db: Database, *, email: str
+    ) -> Optional[User]:
+        query = self.table.select().where(User.email == email)
+        return self.to_model(await db.fetch_one(query))
+
+    async def get_by_cpf(self, db: Database, *, cpf: str) -> Optional[User]:
+        cpf = normalize_cpf(cpf)
+        query = self.table.select().where(User.cpf == cpf)
+        return self.to_model(await db.fetch_one(query))
+
+    async def create(self, db: Database, *, obj_in: UserCreate) -> User:
+        hashed_password = await password_executor.run_async(
+            get_password_hash, obj_in.password
+        )
+        values = {
+            "email": obj_in.email,
+            "hashed_password": hashed_password,
+            "full_name": obj_in.full_name,
+            "cpf": normalize_cpf(obj_in.cpf),
+            "is_active": obj_in.is_active,
+            "is_superuser": obj_in.is_superuser,
+        }
+        try:
+            return await self.insert(db, values=values)
+        except Exception as err:
+            logger.error(f"DB error in AsyncCRUDUser create: {err}")
+            raise
+
+    async def create_or_conflict(
+        self, db: Database, *, obj_in: UserCreate
+    ) -> Union[User, str]:
+        "Create the user, or return why an existing one conflicts with it"
+        try:
+            return await self.create(db, obj_in=obj_in)
+        except IntegrityConstraintViolationError as err:
+            reason = user_conflict(err)
+            if reason is None:
+                raise
+            return reason
+
+    async def update(
+        self, db: Database, *, db_obj: User, obj_in: UserUpdate
+    ) -> User:
+        """
+        Write the changed columns only and drop the cached snapshot when
+        something was written. The password is hashed only when given.
+        """
+        update_data = obj_in.dict(skip_defaults=True)
+        password = update_data.pop("password", None)
+        values = changed_values(self.table, db_obj, update_data)
+        if password:
+            values["hashed_password"] = await password_executor.run_async(
+                get_password_hash, password
+            )
+        if not values:
+            return db_obj
+        user = await self.update_values(db, id=db_obj.id, values=values)
+        auth_cache.invalidate(db_obj.id)
+        return user
+
+    async def remove(self, db: Database, *, id: int) -> User:
+        user = await super().remove(db, id=id)
+        auth_cache.invalidate(id)
+        return user
+
+    async def authenticate(
+        self, db: Database, *, email: str, password: str
+    ) -> Optional[User]:
+        user = await self.get_by_email(db, email=email)
+        if not user:
+            return None
+        valid, new_hash = await password_executor.run_async(
+            verify_and_update_password, password, user.hashed_password
+        )
+        if not valid:
+            return None
+        if new_hash:
+            await self.update_values(
+                db, id=user.id, values={"hashed_password": new_hash}
+            )
+            user.hashed_password = new_hash
+            auth_cache.invalidate(user.id)
+        return user
+
+    def is_active(self, user: User) -> bool:
+        return user.is_active
+
+    def is_superuser(self, user: User) -> bool:
+        return user.is_superuser
+
+
+user = AsyncCRUDUser(User)
@@ -1,11 +1,17 @@
+import logging
 from typing import Generic, List, Optional, Type, TypeVar
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy.engine import RowProxy
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
 
+from cashback.crud.utils import changed_values
 from cashback.db.base_class import Base
 
+logger = logging.getLogger(__name__)
+
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
@@ -23,19 +29,47 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         return db_session.query(self.model).filter(self.model.id == id).first()
 
     def get_multi(
-        self, db_session: Session, *, skip=0, limit=100
+        self, db_session: Session, *, skip=0, limit=100, columns=()
+    ) -> List[ModelType]:
+        query = db_session.query(*columns or (self.model,))
+        return query.offset(skip).limit(limit).all()
+
+    def get_multi_after(
+        self,
+        db_session: Session,
+        *,
+        after: int = None,
+        limit=100,
+        criteria=(),
+        columns=(),
     ) -> List[ModelType]:
-        return db_session.query(self.model).offset(skip).limit(limit).all()
+        """
+        Keyset pagination: up to ``limit`` rows with id greater than
+        ``after``, ordered by id. Pass ``columns`` to get tuples of those
+        columns instead of model instances.
+        """
+        query = db_session.query(*columns or (self.model,)).filter(*criteria)
+        if after is not None:
+            query = query.filter(self.model.id > after)
+        return query.order_by(self.model.id).limit(limit).all()
 
     def create(
         self, db_session: Session, *, obj_in: CreateSchemaType
     ) -> ModelType:
         obj_in_data = jsonable_encoder(obj_in)
-        db_obj = self.model(**obj_in_data)
-        db_session.add(db_obj)
-        db_session.commit()
-        db_session.refresh(db_obj)
-        return db_obj
+        values = {
+            field: value
+            for field, value in obj_in_data.items()
+            if field in self.model.__table__.c
+        }
+        try:
+            row = self.insert(db_session, values=values)
+            db_session.commit()
+        except Exception as err:
+            logger.error(f"DB Rollback in CRUDBase create: {err}")
+            db_session.rollback()
+            raise
+        return self.attach(db_session, row)
 
     def update(
         self,
@@ -44,18 +78,73 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db_obj: ModelType,
         obj_in: UpdateSchemaType,
     ) -> ModelType:
-        obj_data = jsonable_encoder(db_obj)
-        update_data = obj_in.dict(skip_defaults=True)
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
-        db_session.add(db_obj)
-        db_session.commit()
-        db_session.refresh(db_obj)
-        return db_obj
+        values = changed_values(
+            self.model.__table__, db_obj, obj_in.dict(skip_defaults=True)
+        )
+        return self.save_changes(db_session, db_obj=db_obj, values=values)
+
+    def save_changes(
+        self, db_session: Session, *, db_obj: ModelType, values: dict
+    ) -> ModelType:
+        """
+        Write ``values`` to the row of db_obj with one UPDATE ... RETURNING
+        and load the result into it. Nothing is written when it is empty.
+        """
+        if not values:
+            return db_obj
+        try:
+            row = self.update_values(db_session, id=db_obj.id, values=values)
+            db_session.commit()
+        except Exception as err:
+            logger.error(f"DB Rollback in CRUDBase update: {err}")
+            db_session.rollback()
+            raise
+        return self.set_loaded(db_obj, row)
 
     def remove(self, db_session: Session, *, id: int) -> ModelType:
         obj = db_session.query(self.model).get(id)
         db_session.delete(obj)
         db_session.commit()
         return obj
+
+    def insert(self, db_session: Session, *, values: dict) -> RowProxy:
+        """
+        INSERT ... RETURNING the whole row, in the current transaction.
+        Column defaults and sequences are applied by SQLAlchemy Core.
+        """
+        table = self.model.__table__
+        query = table.insert().values(**values).returning(*table.c)
+        return db_session.execute(query).first()
+
+    def update_values(
+        self, db_session: Session, *, id: int, values: dict
+    ) -> Optional[RowProxy]:
+        "UPDATE ... RETURNING the whole row, for the given columns only"
+        table = self.model.__table__
+        values = {
+            field: value for field, value in values.items() if field in table.c
+        }
+        query = (
+            table.update()
+            .where(table.c.id == id)
+            .values(**values)
+            .returning(*table.c)
+        )
+        return db_session.execute(query).first()
+
+    def attach(self, db_session: Session, row: RowProxy) -> ModelType:
+        """
+        Model instance for a returned row, added to the session as if it
+        was loaded by a query, so reading it after the commit doesn't
+        refresh it.
+        """
+        db_obj = self.model(**dict(row))
+        make_transient_to_detached(db_obj)
+        db_session.add(db_obj)
+        return db_obj
+
+    def set_loaded(self, db_obj: ModelType, row: RowProxy) -> ModelType:
+        "Load a returned row into db_obj, expired by the commit"
+        for column, value in row.items():
+            set_committed_value(db_obj, column, value)
+        return db_obj
@@ -1,38 +1,285 @@
+import datetime
 import logging
 from decimal import Decimal
-from typing import List
+from itertools import islice
+from typing import Iterator, List, Optional, Union
 
+from sqlalchemy import func, literal_column, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
 
+from cashback.core import config
+from cashback.core.rules import rules_store
 from cashback.crud.base import CRUDBase
-from cashback.crud.utils import normalize_cpf
-from cashback.models.order import Order
+from cashback.crud.utils import (
+    FOREIGN_KEY_VIOLATION,
+    UNIQUE_VIOLATION,
+    integrity_violation,
+    normalize_cpf,
+)
+from cashback.models.order import Order, OrderStatus
+from cashback.models.order_event import ORDER_CREATED, OrderEvent
+from cashback.models.user import User
 from cashback.schemas.order import OrderCreate, OrderUpdate
 
 logger = logging.getLogger(__name__)
 
+RESELLER_NOT_FOUND = "The user with this cpf does not exist."
+DUPLICATED_ORDER = "An order with this code already exists for this reseller."
+
+
+def order_conflict(err: Exception) -> Optional[str]:
+    """
+    Reason of an integrity error on order: an unknown reseller breaks
+    the foreign key and a repeated code the unique constraint. None for
+    any other error.
+    """
+    code, _ = integrity_violation(err)
+    if code == FOREIGN_KEY_VIOLATION:
+        return RESELLER_NOT_FOUND
+    if code == UNIQUE_VIOLATION:
+        return DUPLICATED_ORDER
+    return None
+
+
+def summary_query(cpf: str) -> Select:
+    """
+    Order totals of one reseller: overall, by status and by month, in a
+    single GROUP BY GROUPING SETS query. ``grouping_set`` tells the sets
+    apart: 3 for the overall row, 1 for status rows and 2 for months.
+    """
+    month = func.date_trunc(literal_column("'month'"), Order.date)
+    return (
+        select(
+            [
+                func.grouping(Order.status, month).label("grouping_set"),
+                Order.status,
+                month.label("month"),
+                func.count(Order.id).label("orders"),
+                func.coalesce(func.sum(Order.value), 0).label("total_value"),
+                func.coalesce(func.sum(Order.cashback_value), 0).label(
+                    "total_cashback"
+                ),
+            ]
+        )
+        .where(Order.reseller_cpf == cpf)
+        .group_by(
+            func.grouping_sets(tuple_(), tuple_(Order.status), tuple_(month))
+        )
+    )
+
+
+def build_summary(cpf: str, rows: List[tuple]) -> dict:
+    "Shape ``summary_query`` rows as a ``CashbackSummary``"
+    summary = {
+        "cpf": cpf,
+        "orders": 0,
+        "total_value": 0,
+        "total_cashback": 0,
+        "by_status": [],
+        "by_month": [],
+    }
+    for row in rows:
+        totals = {
+            "orders": row["orders"],
+            "total_value": row["total_value"],
+            "total_cashback": row["total_cashback"],
+        }
+        if row["grouping_set"] == 3:
+            summary.update(totals)
+        elif row["grouping_set"] == 1:
+            status = row["status"]
+            totals["status"] = getattr(status, "name", status)
+            summary["by_status"].append(totals)
+        else:
+            month = row["month"]
+            totals["month"] = month.strftime("%Y-%m") if month else None
+            summary["by_month"].append(totals)
+    summary["by_status"].sort(key=lambda totals: totals["status"])
+    summary["by_month"].sort(key=lambda totals: totals["month"] or "")
+    return summary
+
 
 class CRUDOrder(CRUDBase[Order, OrderCreate, OrderUpdate]):
+    export_columns = (
+        Order.id,
+        Order.code,
+        Order.value,
+        Order.cashback_percentage,
+        Order.cashback_value,
+        Order.status,
+        Order.date,
+        Order.reseller_cpf,
+    )
+
     def create_with_reseller(
         self, db_session: Session, *, obj_in: OrderCreate
     ) -> Order:
+        """
+        Insert the order and its outbox event with two statements, the
+        order row comes back from the INSERT. The cashback is computed
+        here, as the Order insert hooks only run inside an ORM flush.
+        """
         db_obj = Order(
             code=obj_in.code,
             value=Decimal(obj_in.value),
             date=obj_in.date,
             reseller_cpf=normalize_cpf(obj_in.reseller_cpf),
+            status=OrderStatus.IN_VALIDATION,
         )
+        db_obj.calculate_cashback_value()
+        values = {
+            "code": db_obj.code,
+            "value": db_obj.value,
+            "cashback_percentage": db_obj.cashback_percentage,
+            "cashback_value": db_obj.cashback_value,
+            "rules_version": db_obj.rules_version,
+            "status": db_obj.status,
+            "date": db_obj.date,
+            "reseller_cpf": db_obj.reseller_cpf,
+        }
         try:
-            db_session.add(db_obj)
+            row = self.insert(db_session, values=values)
+            db_session.execute(
+                OrderEvent.__table__.insert().values(
+                    order_id=row.id, event=ORDER_CREATED
+                )
+            )
             db_session.commit()
-            db_session.refresh(db_obj)
-            return db_obj
         except Exception as err:
             logger.error(
                 f"DB Rollback in CRUDOrder create_with_reseller: {err}"
             )
             db_session.rollback()
             raise
+        return self.attach(db_session, row)
+
+    def create_or_conflict(
+        self, db_session: Session, *, obj_in: OrderCreate
+    ) -> Union[Order, str]:
+        """
+        Create the order, or return why it conflicts. The reseller is not
+        looked up first, the foreign key on reseller_cpf checks it.
+        """
+        try:
+            return self.create_with_reseller(db_session, obj_in=obj_in)
+        except IntegrityError as err:
+            reason = order_conflict(err)
+            if reason is None:
+                raise
+            return reason
+
+    def create_multi_with_reseller(
+        self, db_session: Session, *, objs_in: List[OrderCreate]
+    ) -> List[Union[Order, str]]:
+        """
+        Create many orders in one transaction.
+
+        Resellers are checked with a single query, cashback is computed
+        in Python and rows are written with multi-row INSERT statements,
+        so the per-row ORM hooks and refreshes are skipped; their outbox
+        events are written with one more INSERT per chunk. Orders whose
+        code the reseller already used are skipped with ON CONFLICT.
+        Returns one item per input: the created order, or the reason it
+        was not created.
+        """
+        if not objs_in:
+            return []
+        cpfs = {normalize_cpf(obj_in.reseller_cpf) for obj_in in objs_in}
+        resellers = {
+            cpf
+            for (cpf,) in db_session.query(User.cpf).filter(User.cpf.in_(cpfs))
+        }
+
+        now = datetime.datetime.now()
+        next_id = self.model.__table__.c.id.default.next_value()
+        results = [RESELLER_NOT_FOUND] * len(objs_in)
+        snapshot = rules_store.snapshot
+        cashbacks = snapshot.rules.compute(
+            [obj_in.value for obj_in in objs_in]
+        )
+        positions, rows = [], []
+        for position, (obj_in, cashback) in enumerate(zip(objs_in, cashbacks)):
+            db_obj = Order(
+                code=obj_in.code,
+                value=Decimal(obj_in.value),
+                date=obj_in.date,
+                reseller_cpf=normalize_cpf(obj_in.reseller_cpf),
+                status=OrderStatus.IN_VALIDATION,
+            )
+            if db_obj.reseller_cpf not in resellers:
+                continue
+            db_obj.cashback_value, db_obj.cashback_percentage = cashback
+            if db_obj.cashback_percentage is not None:
+                db_obj.rules_version = snapshot.version
+            positions.append(position)
+            rows.append(
+                {
+                    "id": next_id,
+                    "code": db_obj.code,
+                    "value": db_obj.value,
+                    "cashback_percentage": db_obj.cashback_percentage,
+                    "cashback_value": db_obj.cashback_value,
+                    "rules_version": db_obj.rules_version,
+                    "status": db_obj.status,
+                    "date": db_obj.date,
+                    "reseller_cpf": db_obj.reseller_cpf,
+                    "created_at": now,
+                }
+            )
+
+        table = self.model.__table__
+        chunk_size = config.ORDERS_BULK_CHUNK_SIZE
+        try:
+            for start in range(0, len(rows), chunk_size):
+                chunk = rows[start : start + chunk_size]
+                query = (
+                    insert(table)
+                    .values(chunk)
+                    .on_conflict_do_nothing(
+                        index_elements=["reseller_cpf", "code"]
+                    )
+                    .returning(*table.c)
+                )
+                created = {
+                    (row.reseller_cpf, row.code): row
+                    for row in db_session.execute(query)
+                }
+                if created:
+                    db_session.execute(
+                        insert(OrderEvent.__table__).values(
+                            [
+                                {
+                                    "order_id": row.id,
+                                    "event": ORDER_CREATED,
+                                    "created_at": now,
+                                }
+                                for row in created.values()
+                            ]
+                        )
+                    )
+                chunk_positions = positions[start : start + chunk_size]
+                for position, values in zip(chunk_positions, chunk):
+                    row = created.pop(
+                        (values["reseller_cpf"], values["code"]), None
+                    )
+                    if row is None:
+                        results[position] = DUPLICATED_ORDER
+                    else:
+                        results[position] = Order(**dict(row))
+            db_session.commit()
+        except Exception as err:
+            logger.error(
+                f"DB Rollback in CRUDOrder create_multi_with_reseller: {err}"
+            )
+            db_session.rollback()
+            raise
+
+        saved = sum(1 for result in results if isinstance(result, Order))
+        logger.info(f"Saved {saved} orders in bulk")
+        return results
 
     def get_multi_by_reseller(
         self, db_session: Session, *, cpf: int, skip=0, limit=100
@@ -45,5 +292,69 @@ class CRUDOrder(CRUDBase[Order, OrderCreate, OrderUpdate]):
             .all()
         )
 
+    def get_multi_by_reseller_after(
+        self,
+        db_session: Session,
+        *,
+        cpf: str,
+        after: int = None,
+        limit=100,
+        columns=(),
+    ) -> List[Order]:
+        return self.get_multi_after(
+            db_session,
+            after=after,
+            limit=limit,
+            criteria=(Order.reseller_cpf == cpf,),
+            columns=columns,
+        )
+
+    def get_summary_by_reseller(
+        self, db_session: Session, *, cpf: str
+    ) -> dict:
+        rows = db_session.execute(summary_query(cpf)).fetchall()
+        return build_summary(cpf, rows)
+
+    def iter_chunks(
+        self,
+        db_session: Session,
+        *,
+        cpf: str = None,
+        after: int = 0,
+        chunk_size=1000,
+        page_size=10000,
+    ) -> Iterator[List[tuple]]:
+        """
+        Yield orders with an id above ``after`` as tuples of
+        ``export_columns``, in chunks ordered by id.
+
+        Orders are read in pages that seek past the last id of the previous
+        one (keyset pagination), each in its own short transaction. Rows of
+        a page come through a server-side cursor (``yield_per``), so only
+        one chunk is held in memory. An interrupted export resumes from the
+        last id it got.
+        """
+        last_id = after
+        while True:
+            query = db_session.query(*self.export_columns).filter(
+                Order.id > last_id
+            )
+            if cpf:
+                query = query.filter(Order.reseller_cpf == cpf)
+            rows = iter(
+                query.order_by(Order.id).limit(page_size).yield_per(chunk_size)
+            )
+            read = 0
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+                read += len(chunk)
+                last_id = chunk[-1].id
+                yield chunk
+            db_session.commit()
+            if read < page_size:
+                return
+
 
 order = CRUDOrder(Order)
@@ -0,0 +1,116 @@
+import asyncio
+import logging
+from typing import Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from cashback.core.rules import RulesSnapshot, RulesStore, rules_store
+from cashback.crud.base import CRUDBase
+from cashback.crud.utils import normalize_cpf
+from cashback.models.rule_set import CashbackRuleSet
+from cashback.schemas.rules import CashbackRuleSetCreate
+
+logger = logging.getLogger(__name__)
+
+
+def to_snapshot(db_obj: CashbackRuleSet) -> RulesSnapshot:
+    return RulesSnapshot(
+        db_obj.version,
+        [
+            (rule["percentage"], rule["start"], rule["end"])
+            for rule in db_obj.rules
+        ],
+        db_obj.auto_approve_cpfs,
+    )
+
+
+class CRUDCashbackRules(
+    CRUDBase[CashbackRuleSet, CashbackRuleSetCreate, CashbackRuleSetCreate]
+):
+    def get_latest_version(self, db_session: Session) -> Optional[int]:
+        return db_session.query(func.max(CashbackRuleSet.version)).scalar()
+
+    def get_version(
+        self, db_session: Session, *, version: int
+    ) -> Optional[CashbackRuleSet]:
+        return (
+            db_session.query(CashbackRuleSet)
+            .filter(CashbackRuleSet.version == version)
+            .first()
+        )
+
+    def get_latest(self, db_session: Session) -> Optional[CashbackRuleSet]:
+        return (
+            db_session.query(CashbackRuleSet)
+            .order_by(CashbackRuleSet.version.desc())
+            .first()
+        )
+
+    def create_version(
+        self, db_session: Session, *, obj_in: CashbackRuleSetCreate
+    ) -> CashbackRuleSet:
+        """
+        Store the rules as the next version. They are compiled first, so
+        invalid rules raise ``InvalidCashbackRules`` and are not stored.
+        Two versions created at once conflict on the primary key.
+        """
+        db_obj = CashbackRuleSet(
+            version=(self.get_latest_version(db_session) or 0) + 1,
+            rules=[
+                {
+                    "percentage": rule.percentage,
+                    "start": str(rule.start),
+                    "end": str(rule.end),
+                }
+                for rule in obj_in.rules
+            ],
+            auto_approve_cpfs=sorted(
+                {normalize_cpf(cpf) for cpf in obj_in.auto_approve_cpfs}
+            ),
+        )
+        to_snapshot(db_obj)
+        try:
+            row = self.insert(
+                db_session,
+                values={
+                    "version": db_obj.version,
+                    "rules": db_obj.rules,
+                    "auto_approve_cpfs": db_obj.auto_approve_cpfs,
+                },
+            )
+            db_session.commit()
+        except Exception as err:
+            logger.error(f"DB Rollback in CRUDCashbackRules create: {err}")
+            db_session.rollback()
+            raise
+        db_obj = self.attach(db_session, row)
+        logger.info(f"Cashback rules version {db_obj.version} created")
+        return db_obj
+
+    def refresh(
+        self, db_session: Session, *, store: RulesStore = rules_store
+    ) -> bool:
+        "Load the latest rules into ``store`` if the version moved"
+
+        def load(version):
+            db_obj = self.get_version(db_session, version=version)
+            return to_snapshot(db_obj) if db_obj else None
+
+        return store.refresh(lambda: self.get_latest_version(db_session), load)
+
+    async def poll(self, session_factory, *, store: RulesStore = rules_store):
+        "Refresh ``store`` every ``store.interval`` seconds, forever"
+        while True:
+            db_session = session_factory()
+            try:
+                await run_in_threadpool(self.refresh, db_session, store=store)
+            except Exception as err:
+                logger.error(f"Error refreshing cashback rules: {err}")
+            finally:
+                db_session.close()
+            await asyncio.sleep(store.interval)
+
+
+rules = CRUDCashbackRules(CashbackRuleSet)
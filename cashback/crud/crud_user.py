@@ -1,19 +1,59 @@
+import datetime
 import logging
-from typing import Optional
+from typing import List, Optional, Union
 
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from cashback.core.security import get_password_hash, verify_password
+from cashback.core import config
+from cashback.core.auth_cache import auth_cache
+from cashback.core.security import (
+    PasswordExecutor,
+    get_password_hash,
+    get_password_hashes,
+    password_executor,
+    verify_and_update_password,
+)
 from cashback.crud.base import CRUDBase
-from cashback.crud.utils import normalize_cpf
+from cashback.crud.utils import (
+    UNIQUE_VIOLATION,
+    changed_values,
+    integrity_violation,
+    normalize_cpf,
+)
 from cashback.models.user import User
 from cashback.schemas.user import UserCreate, UserUpdate
 
 logger = logging.getLogger(__name__)
 
+EMAIL_EXISTS = "A user with this email already exists."
+CPF_EXISTS = "A user with this cpf already exists."
+DUPLICATED_EMAIL = "This email is repeated in the batch."
+DUPLICATED_CPF = "This cpf is repeated in the batch."
+USER_EXISTS = "A user with this email or cpf already exists."
+USER_CONFLICTS = {"ix_user_email": EMAIL_EXISTS, "ix_user_cpf": CPF_EXISTS}
 
-# pylint: disable=redefined-outer-name
+
+def user_conflict(err: Exception) -> Optional[str]:
+    "Reason of a unique violation on user, None for any other error"
+    code, constraint = integrity_violation(err)
+    if code != UNIQUE_VIOLATION:
+        return None
+    return USER_CONFLICTS.get(constraint, USER_EXISTS)
+
+
+# pylint: disable=redefined-outer-name,redefined-builtin
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
+    public_columns = (
+        User.id,
+        User.email,
+        User.is_active,
+        User.is_superuser,
+        User.full_name,
+        User.cpf,
+    )
+
     def get_by_email(
         self, db_session: Session, *, email: str
     ) -> Optional[User]:
@@ -24,23 +64,163 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         return db_session.query(User).filter(User.cpf == cpf).first()
 
     def create(self, db_session: Session, *, obj_in: UserCreate) -> User:
-        db_obj = User(
-            email=obj_in.email,
-            hashed_password=get_password_hash(obj_in.password),
-            full_name=obj_in.full_name,
-            cpf=normalize_cpf(obj_in.cpf),
-            is_active=obj_in.is_active,
-            is_superuser=obj_in.is_superuser,
-        )
+        values = {
+            "email": obj_in.email,
+            "hashed_password": password_executor.run(
+                get_password_hash, obj_in.password
+            ),
+            "full_name": obj_in.full_name,
+            "cpf": normalize_cpf(obj_in.cpf),
+            "is_active": obj_in.is_active,
+            "is_superuser": obj_in.is_superuser,
+        }
         try:
-            db_session.add(db_obj)
+            row = self.insert(db_session, values=values)
             db_session.commit()
-            db_session.refresh(db_obj)
-            return db_obj
         except Exception as err:
             logger.error(f"DB Rollback in CRUDUser create: {err}")
             db_session.rollback()
             raise
+        return self.attach(db_session, row)
+
+    def create_or_conflict(
+        self, db_session: Session, *, obj_in: UserCreate
+    ) -> Union[User, str]:
+        """
+        Create the user, or return why an existing one conflicts with it.
+        Nothing is looked up first, the unique indexes on email and cpf
+        make the check as part of the INSERT.
+        """
+        try:
+            return self.create(db_session, obj_in=obj_in)
+        except IntegrityError as err:
+            reason = user_conflict(err)
+            if reason is None:
+                raise
+            return reason
+
+    def create_multi(
+        self,
+        db_session: Session,
+        *,
+        objs_in: List[UserCreate],
+        executor: PasswordExecutor = password_executor,
+    ) -> List[Union[User, str]]:
+        """
+        Create many users in one transaction.
+
+        Emails and CPFs already taken are found with one IN query each and
+        repeats inside the batch in Python, before any password is hashed.
+        The remaining passwords are hashed in parallel on ``executor`` and
+        rows are written with multi-row INSERT statements; a row that
+        conflicts with a user created meanwhile is skipped with ON
+        CONFLICT. Returns one item per input: the created user, or the
+        reason it was not created.
+        """
+        if not objs_in:
+            return []
+        cpfs = [normalize_cpf(obj_in.cpf) for obj_in in objs_in]
+        taken_emails = {
+            email
+            for (email,) in db_session.query(User.email).filter(
+                User.email.in_({obj_in.email for obj_in in objs_in})
+            )
+        }
+        taken_cpfs = {
+            cpf
+            for (cpf,) in db_session.query(User.cpf).filter(
+                User.cpf.in_(set(cpfs))
+            )
+        }
+
+        results = [None] * len(objs_in)
+        positions, emails, seen_cpfs = [], set(), set()
+        for position, (obj_in, cpf) in enumerate(zip(objs_in, cpfs)):
+            if obj_in.email in taken_emails:
+                results[position] = EMAIL_EXISTS
+            elif cpf in taken_cpfs:
+                results[position] = CPF_EXISTS
+            elif obj_in.email in emails:
+                results[position] = DUPLICATED_EMAIL
+            elif cpf in seen_cpfs:
+                results[position] = DUPLICATED_CPF
+            else:
+                positions.append(position)
+                emails.add(obj_in.email)
+                seen_cpfs.add(cpf)
+
+        hashes = executor.map_chunks(
+            get_password_hashes,
+            [objs_in[position].password for position in positions],
+        )
+        now = datetime.datetime.now()
+        next_id = self.model.__table__.c.id.default.next_value()
+        rows = [
+            {
+                "id": next_id,
+                "email": objs_in[position].email,
+                "hashed_password": hashed_password,
+                "full_name": objs_in[position].full_name,
+                "cpf": cpfs[position],
+                "is_active": objs_in[position].is_active,
+                "is_superuser": objs_in[position].is_superuser,
+                "created_at": now,
+            }
+            for position, hashed_password in zip(positions, hashes)
+        ]
+
+        table = self.model.__table__
+        chunk_size = config.USERS_BULK_CHUNK_SIZE
+        try:
+            for start in range(0, len(rows), chunk_size):
+                chunk = rows[start : start + chunk_size]
+                query = (
+                    insert(table)
+                    .values(chunk)
+                    .on_conflict_do_nothing()
+                    .returning(*table.c)
+                )
+                created = {row.email: row for row in db_session.execute(query)}
+                chunk_positions = positions[start : start + chunk_size]
+                for position, values in zip(chunk_positions, chunk):
+                    row = created.get(values["email"])
+                    if row is None:
+                        results[position] = USER_EXISTS
+                    else:
+                        results[position] = User(**dict(row))
+            db_session.commit()
+        except Exception as err:
+            logger.error(f"DB Rollback in CRUDUser create_multi: {err}")
+            db_session.rollback()
+            raise
+
+        saved = sum(1 for result in results if isinstance(result, User))
+        logger.info(f"Saved {saved} users in bulk")
+        return results
+
+    def update(
+        self, db_session: Session, *, db_obj: User, obj_in: UserUpdate
+    ) -> User:
+        """
+        Write the changed columns only and drop the cached snapshot when
+        something was written. The password is hashed only when given.
+        """
+        update_data = obj_in.dict(skip_defaults=True)
+        password = update_data.pop("password", None)
+        values = changed_values(User.__table__, db_obj, update_data)
+        if password:
+            values["hashed_password"] = password_executor.run(
+                get_password_hash, password
+            )
+        user = self.save_changes(db_session, db_obj=db_obj, values=values)
+        if values:
+            auth_cache.invalidate(user.id)
+        return user
+
+    def remove(self, db_session: Session, *, id: int) -> User:
+        user = super().remove(db_session, id=id)
+        auth_cache.invalidate(id)
+        return user
 
     def authenticate(
         self, db_session: Session, *, email: str, password: str
@@ -48,10 +228,37 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         user = self.get_by_email(db_session, email=email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        valid, new_hash = password_executor.run(
+            verify_and_update_password, password, user.hashed_password
+        )
+        if not valid:
             return None
+        if new_hash:
+            self.update_password_hash(
+                db_session, user=user, hashed_password=new_hash
+            )
         return user
 
+    def update_password_hash(
+        self, db_session: Session, *, user: User, hashed_password: str
+    ) -> User:
+        "Store a hash made with the current cost factor"
+        try:
+            row = self.update_values(
+                db_session,
+                id=user.id,
+                values={"hashed_password": hashed_password},
+            )
+            db_session.commit()
+        except Exception as err:
+            logger.error(
+                f"DB Rollback in CRUDUser update_password_hash: {err}"
+            )
+            db_session.rollback()
+            raise
+        auth_cache.invalidate(user.id)
+        return self.set_loaded(user, row)
+
     def is_active(self, user: User) -> bool:
         return user.is_active
 
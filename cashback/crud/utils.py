@@ -1,4 +1,41 @@
+from typing import Optional, Tuple
+
+from sqlalchemy import Table
+
+UNIQUE_VIOLATION = "23505"
+FOREIGN_KEY_VIOLATION = "23503"
+
+
 def normalize_cpf(cpf):
     if cpf:
         cpf = cpf.replace(".", "").replace("-", "")
     return cpf
+
+
+def integrity_violation(err: Exception) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Return (SQLSTATE, constraint name) of a PostgreSQL integrity error,
+    raised by psycopg2 through SQLAlchemy or by asyncpg.
+    """
+    orig = getattr(err, "orig", err)
+    diag = getattr(orig, "diag", None)
+    if diag is not None:
+        return orig.pgcode, diag.constraint_name
+    return (
+        getattr(orig, "sqlstate", None),
+        getattr(orig, "constraint_name", None),
+    )
+
+
+def changed_values(table: Table, db_obj, values: dict) -> dict:
+    """
+    The columns of ``table`` in ``values`` whose value differs from the
+    one ``db_obj`` holds. The primary key is never changed.
+    """
+    return {
+        field: value
+        for field, value in values.items()
+        if field in table.c
+        and not table.c[field].primary_key
+        and getattr(db_obj, field) != value
+    }
@@ -3,5 +3,8 @@
 
 # pylint: disable=unused-import
 from cashback.db.base_class import Base  # noqa
+from cashback.models.cached_credit import CachedCredit  # noqa
 from cashback.models.order import Order  # noqa
+from cashback.models.order_event import OrderEvent  # noqa
+from cashback.models.rule_set import CashbackRuleSet  # noqa
 from cashback.models.user import User  # noqa
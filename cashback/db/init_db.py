@@ -1,5 +1,6 @@
 from cashback import crud
 from cashback.core import config
+from cashback.schemas.rules import CashbackRule, CashbackRuleSetCreate
 from cashback.schemas.user import UserAdminCreate
 
 
@@ -19,3 +20,13 @@ def init_db(db_session):
             is_superuser=True,
         )
         user = crud.user.create(db_session, obj_in=user_in)
+
+    if crud.rules.get_latest_version(db_session) is None:
+        rules_in = CashbackRuleSetCreate(
+            rules=[
+                CashbackRule(percentage=percentage, start=start, end=end)
+                for percentage, start, end in config.CASHBACK_RULES
+            ],
+            auto_approve_cpfs=config.CPFS_WITH_AUTO_APPROVE,
+        )
+        crud.rules.create_version(db_session, obj_in=rules_in)
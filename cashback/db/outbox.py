@@ -0,0 +1,114 @@
+import logging
+import time
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from cashback import crud
+from cashback.core.rules import rules_store
+from cashback.models.cached_credit import CachedCredit
+from cashback.models.order import Order, OrderStatus
+
+logger = logging.getLogger(__name__)
+
+CLAIM_EVENTS = """
+DELETE FROM order_event
+WHERE id IN (
+    SELECT id FROM order_event
+    ORDER BY id
+    LIMIT :batch_size
+    FOR UPDATE SKIP LOCKED
+)
+RETURNING order_id
+"""
+
+
+def process_events(db_session: Session, *, batch_size: int = 500) -> int:
+    """
+    Run the side effects of one batch of order events.
+
+    Events are claimed and deleted with one statement; ``SKIP LOCKED``
+    lets several workers drain the outbox without taking the same rows.
+    Orders of auto approved resellers are approved with one UPDATE, every
+    order is logged and the cached credits of their resellers are deleted
+    from the shared credit cache table, which the API workers read; their
+    local copies expire within ``CREDIT_CACHE_LOCAL_TTL``. Nothing is
+    committed until all of that is done, so a failed batch is processed
+    again. Returns the number of events processed.
+    """
+    try:
+        order_ids = [
+            row.order_id
+            for row in db_session.execute(
+                text(CLAIM_EVENTS), {"batch_size": batch_size}
+            )
+        ]
+        if not order_ids:
+            db_session.commit()
+            return 0
+
+        orders = [
+            Order(**row._asdict())
+            for row in db_session.query(
+                Order.id,
+                Order.code,
+                Order.value,
+                Order.cashback_value,
+                Order.status,
+                Order.reseller_cpf,
+            ).filter(Order.id.in_(order_ids))
+        ]
+        approved = [
+            order.id
+            for order in orders
+            if order.status == OrderStatus.IN_VALIDATION
+            and order.set_order_status() == OrderStatus.APPROVED
+        ]
+        if approved:
+            db_session.query(Order).filter(Order.id.in_(approved)).update(
+                {"status": OrderStatus.APPROVED}, synchronize_session=False
+            )
+
+        for order in orders:
+            order.set_saved_order_log()
+        db_session.query(CachedCredit).filter(
+            CachedCredit.cpf.in_({order.reseller_cpf for order in orders})
+        ).delete(synchronize_session=False)
+        db_session.commit()
+    except Exception as err:
+        logger.error(f"DB Rollback in process_events: {err}")
+        db_session.rollback()
+        raise
+
+    return len(order_ids)
+
+
+def drain_events(db_session: Session, *, batch_size: int = 500, **kwargs):
+    "Process batches until the outbox is empty, return the events processed"
+    processed = 0
+    while True:
+        batch = process_events(db_session, batch_size=batch_size, **kwargs)
+        processed += batch
+        if batch < batch_size:
+            return processed
+
+
+def run_worker(
+    db_session: Session,
+    *,
+    batch_size: int = 500,
+    poll_interval: float = 1.0,
+    sleep=time.sleep,
+):
+    """
+    Drain the outbox forever, sleeping ``poll_interval`` once it is empty.
+    The cashback rules are refreshed before draining, when due.
+    """
+    logger.info("Order outbox worker started")
+    while True:
+        if rules_store.is_due():
+            crud.rules.refresh(db_session)
+        processed = drain_events(db_session, batch_size=batch_size)
+        if processed:
+            logger.info(f"Processed {processed} order events")
+        sleep(poll_interval)
@@ -0,0 +1,150 @@
+import json
+import logging
+import os
+import time
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from cashback.core.rules import CashbackRules, RulesSnapshot, rules_store
+from cashback.models.order import Order, OrderStatus
+
+logger = logging.getLogger(__name__)
+
+UPDATE_CASHBACK = """
+UPDATE "order"
+SET cashback_percentage = v.percentage,
+    cashback_value = CAST(v.cashback AS numeric) / 100,
+    rules_version = :rules_version
+FROM (VALUES {values}) AS v(id, percentage, cashback)
+WHERE "order".id = v.id AND "order".status = :status
+"""
+VALUE_ROW = (
+    "(CAST(:id_{n} AS integer), CAST(:percentage_{n} AS integer), "
+    "CAST(:cashback_{n} AS bigint))"
+)
+
+
+def read_checkpoint(path: Optional[str]) -> int:
+    if not path or not os.path.exists(path):
+        return 0
+    with open(path) as checkpoint:
+        return json.load(checkpoint)["last_id"]
+
+
+def write_checkpoint(path: Optional[str], last_id: int):
+    if not path:
+        return
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as checkpoint:
+        json.dump({"last_id": last_id}, checkpoint)
+    os.replace(tmp_path, path)
+
+
+def fetch_chunk(
+    db_session: Session, *, after: int, chunk_size: int
+) -> List[tuple]:
+    return (
+        db_session.query(
+            Order.id,
+            Order.value,
+            Order.cashback_percentage,
+            Order.cashback_value,
+        )
+        .filter(Order.status == OrderStatus.IN_VALIDATION, Order.id > after)
+        .order_by(Order.id)
+        .limit(chunk_size)
+        .all()
+    )
+
+
+def changed_rows(rows: List[tuple], rules: CashbackRules) -> List[tuple]:
+    """
+    Return (id, percentage, cashback in cents) for the rows whose cashback
+    differs from the one the rules give now. Values are converted to
+    integer cents once and the whole chunk is computed in one call.
+    """
+    cents = [int(rules.to_cents(row.value) * 100) for row in rows]
+    percentages, cashbacks = rules.compute_cents(cents)
+    changed = []
+    for row, percentage, cashback in zip(rows, percentages, cashbacks):
+        if percentage is None:
+            continue
+        current = (
+            None
+            if row.cashback_value is None
+            else int(row.cashback_value * 100)
+        )
+        if (row.cashback_percentage, current) != (percentage, cashback):
+            changed.append((row.id, percentage, cashback))
+    return changed
+
+
+def update_rows(db_session: Session, rows: List[tuple], rules_version: int):
+    "Write all rows with one UPDATE ... FROM (VALUES ...) statement"
+    values = ", ".join(VALUE_ROW.format(n=n) for n in range(len(rows)))
+    params = {
+        "status": OrderStatus.IN_VALIDATION.name,
+        "rules_version": rules_version,
+    }
+    for n, (id_, percentage, cashback) in enumerate(rows):
+        params[f"id_{n}"] = id_
+        params[f"percentage_{n}"] = percentage
+        params[f"cashback_{n}"] = cashback
+    db_session.execute(text(UPDATE_CASHBACK.format(values=values)), params)
+
+
+def recompute_cashback(
+    db_session: Session,
+    *,
+    chunk_size: int = 1000,
+    checkpoint: str = None,
+    snapshot: RulesSnapshot = None,
+) -> Tuple[int, int]:
+    """
+    Recompute cashback of the orders still in validation, with
+    ``snapshot`` or the rules currently loaded in ``rules_store``.
+
+    Orders are read in id order, one chunk per transaction, and only the
+    rows whose cashback changed are written back, with the rules version.
+    The last id of every committed chunk is saved to ``checkpoint``, so
+    an interrupted run starts again after it. Returns (rows read, rows
+    updated).
+    """
+    snapshot = snapshot or rules_store.snapshot
+    last_id = read_checkpoint(checkpoint)
+    if last_id:
+        logger.info(f"Resuming cashback recompute after order {last_id}")
+
+    read = updated = 0
+    started = time.perf_counter()
+    while True:
+        rows = fetch_chunk(db_session, after=last_id, chunk_size=chunk_size)
+        if not rows:
+            break
+        changed = changed_rows(rows, snapshot.rules)
+        try:
+            if changed:
+                update_rows(db_session, changed, snapshot.version)
+            db_session.commit()
+        except Exception as err:
+            logger.error(f"DB Rollback in recompute_cashback: {err}")
+            db_session.rollback()
+            raise
+
+        last_id = rows[-1].id
+        write_checkpoint(checkpoint, last_id)
+        read += len(rows)
+        updated += len(changed)
+        elapsed = max(time.perf_counter() - started, 1e-6)
+        logger.info(
+            f"Recomputed {read} orders, updated {updated}, "
+            f"{read / elapsed:.0f} rows/s, last id {last_id}"
+        )
+        if len(rows) < chunk_size:
+            break
+
+    if checkpoint and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    return read, updated
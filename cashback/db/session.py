@@ -1,10 +1,55 @@
-from sqlalchemy import create_engine
+import time
+
+from databases import Database
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from cashback.core import config, metrics, profiler
+
+
+class TimedQueuePool(QueuePool):
+    "QueuePool that records how long each checkout waited"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.DB_POOL_WAIT.observe(time.perf_counter() - start)
+
+
+engine = create_engine(
+    config.SQLALCHEMY_DATABASE_URI,
+    poolclass=TimedQueuePool,
+    pool_size=config.DB_POOL_SIZE,
+    max_overflow=config.DB_MAX_OVERFLOW,
+    pool_timeout=config.DB_POOL_TIMEOUT,
+    pool_recycle=config.DB_POOL_RECYCLE,
+    pool_pre_ping=config.DB_POOL_PRE_PING,
+)
+
+
+# pylint: disable=unused-argument,too-many-arguments
+@event.listens_for(engine, "before_cursor_execute")
+def start_query_timer(conn, cursor, statement, params, context, executemany):
+    context.query_start = time.perf_counter()
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def record_query(conn, cursor, statement, params, context, executemany):
+    seconds = time.perf_counter() - context.query_start
+    metrics.observe_query(seconds)
+    profiler.record_query(statement, seconds)
 
-from cashback.core import config
 
-engine = create_engine(config.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
 db_session = scoped_session(
     sessionmaker(autocommit=False, autoflush=False, bind=engine)
 )
 Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+database = Database(
+    config.SQLALCHEMY_DATABASE_URI,
+    min_size=config.ASYNC_DB_MIN_SIZE,
+    max_size=config.ASYNC_DB_MAX_SIZE,
+)
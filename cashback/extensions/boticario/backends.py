@@ -1,9 +1,20 @@
+import asyncio
 import logging
+import time
 
+import httpx
 import requests
 from fastapi import HTTPException
 
-from cashback.core import config
+from cashback.core import config, metrics
+from cashback.core.breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    LatencyTracker,
+)
+from cashback.core.singleflight import SingleFlight
+from cashback.crud.utils import normalize_cpf
+from cashback.extensions.boticario.cache import credit_cache
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +31,9 @@ class BoticarioBackend:
         url = self.base_url + f"/v1/cashback?cpf={cpf}"
 
         try:
-            response = requests.get(url, headers=self.headers)
+            response = requests.get(
+                url, headers=self.headers, timeout=config.BOTICARIO_TIMEOUT
+            )
             if (response.status_code != 200) or (
                 response.json()["statusCode"] != 200
             ):
@@ -45,3 +58,152 @@ class BoticarioBackend:
     def get_total_cashback(self, cpf=None):
         response = self._request_cashback(cpf=cpf)
         return response.get("body").get("credit")
+
+
+class BoticarioUnavailable(HTTPException):
+    """
+    The Boticario API timed out, was unreachable or answered with a 5xx.
+    """
+
+
+class AsyncBoticarioBackend(BoticarioBackend):
+    """
+    Non-blocking Boticario backend.
+
+    All instances share one pooled HTTP client, so keep-alive connections
+    are reused between requests, and one semaphore that bounds how many
+    upstream calls a worker may have in flight. Credits are served from
+    ``cache`` when possible, and concurrent lookups of the same CPF share
+    one upstream call.
+
+    Upstream calls go through a circuit breaker and use a timeout derived
+    from the observed latency. While the API is unavailable the last
+    cached credit is returned, if there is one and
+    ``BOTICARIO_BREAKER_FALLBACK`` is enabled.
+    """
+
+    cache = credit_cache
+    flights = SingleFlight()
+    breaker = CircuitBreaker(
+        failure_threshold=config.BOTICARIO_BREAKER_FAILURE_THRESHOLD,
+        recovery_timeout=config.BOTICARIO_BREAKER_RECOVERY_TIMEOUT,
+        failure_exceptions=(BoticarioUnavailable,),
+    )
+    latency = LatencyTracker(
+        percentile=config.BOTICARIO_TIMEOUT_PERCENTILE,
+        multiplier=config.BOTICARIO_TIMEOUT_MULTIPLIER,
+        min_timeout=config.BOTICARIO_MIN_TIMEOUT,
+        max_timeout=config.BOTICARIO_TIMEOUT,
+    )
+    _client = None
+    _semaphore = None
+
+    @classmethod
+    def get_client(cls) -> httpx.AsyncClient:
+        if cls._client is None:
+            cls._client = httpx.AsyncClient(
+                headers=cls.headers,
+                timeout=httpx.Timeout(config.BOTICARIO_TIMEOUT),
+                pool_limits=httpx.PoolLimits(
+                    soft_limit=config.BOTICARIO_MAX_KEEPALIVE,
+                    hard_limit=config.BOTICARIO_MAX_CONNECTIONS,
+                ),
+            )
+        return cls._client
+
+    @classmethod
+    def get_semaphore(cls) -> asyncio.Semaphore:
+        if cls._semaphore is None:
+            cls._semaphore = asyncio.Semaphore(
+                config.BOTICARIO_MAX_CONCURRENCY
+            )
+        return cls._semaphore
+
+    @classmethod
+    async def close(cls):
+        if cls._client is not None:
+            await cls._client.aclose()
+        cls._client = None
+        cls._semaphore = None
+
+    async def _request_cashback(self, cpf=None):
+        url = self.base_url + f"/v1/cashback?cpf={cpf}"
+
+        try:
+            async with self.get_semaphore():
+                start = time.monotonic()
+                response = await self.get_client().get(
+                    url, timeout=self.latency.timeout()
+                )
+                elapsed = time.monotonic() - start
+                self.latency.observe(elapsed)
+                metrics.BOTICARIO_LATENCY.observe(elapsed)
+        except httpx.TimeoutException:
+            metrics.BOTICARIO_ERRORS.labels("timeout").inc()
+            msg = "Timeout error in Get total cash in Boticario API"
+            logger.error(msg)
+            raise BoticarioUnavailable(
+                status_code=500, detail=msg,
+            )
+        except httpx.HTTPError as err:
+            metrics.BOTICARIO_ERRORS.labels("http_error").inc()
+            msg = f"Error in Get total cashback in Boticario API: {err}"
+            logger.error(msg)
+            raise BoticarioUnavailable(
+                status_code=500, detail=msg,
+            )
+
+        if response.status_code >= 500:
+            metrics.BOTICARIO_ERRORS.labels("server_error").inc()
+            msg = (
+                f"Error {response.status_code} in Get "
+                "total cashback in Boticario API"
+            )
+            logger.error(msg)
+            raise BoticarioUnavailable(
+                status_code=500, detail=msg,
+            )
+
+        if (response.status_code != 200) or (
+            response.json()["statusCode"] != 200
+        ):
+            metrics.BOTICARIO_ERRORS.labels("bad_response").inc()
+            msg = (
+                f"Error {response.status_code} in Get "
+                "total cashback in Boticario API"
+            )
+            logger.error(msg)
+            raise HTTPException(
+                status_code=500, detail=msg,
+            )
+
+        return response.json()
+
+    async def _load_total_cashback(self, cpf=None):
+        response = await self.flights.do(
+            cpf,
+            lambda: self.breaker.call(lambda: self._request_cashback(cpf=cpf)),
+        )
+        return response.get("body").get("credit")
+
+    async def get_total_cashback(self, cpf=None):
+        cpf = normalize_cpf(cpf)
+        try:
+            return await self.cache.get_or_load(
+                cpf, lambda: self._load_total_cashback(cpf=cpf)
+            )
+        except (CircuitOpenError, BoticarioUnavailable) as err:
+            credit = None
+            if config.BOTICARIO_BREAKER_FALLBACK:
+                credit = await self.cache.get(cpf)
+            if credit is not None:
+                logger.warning(
+                    f"Boticario API unavailable, using cached credit "
+                    f"for {cpf}"
+                )
+                return credit
+            if isinstance(err, CircuitOpenError):
+                msg = "Boticario API unavailable, circuit breaker is open"
+                logger.error(msg)
+                raise HTTPException(status_code=503, detail=msg)
+            raise
@@ -0,0 +1,226 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Engine
+from starlette.concurrency import run_in_threadpool
+
+from cashback.core import config
+from cashback.core.cache import CacheEntry, LRUCache
+from cashback.crud.utils import normalize_cpf
+from cashback.db.session import engine
+from cashback.models.cached_credit import CachedCredit
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseCreditStore:
+    """
+    Shared tier of ``CreditCache`` in the ``cached_credit`` table, so a
+    credit loaded by one worker is served by every worker, and the outbox
+    worker can drop it in the transaction that changes it.
+
+    It has the ``get_entry``/``set``/``delete``/``clear`` interface of
+    ``LRUCache``. Calls block on the database, ``CreditCache`` runs them
+    in the threadpool.
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.table = CachedCredit.__table__
+
+    def get_entry(self, cpf) -> Optional[CacheEntry]:
+        query = select([self.table.c.credit, self.table.c.stored_at]).where(
+            self.table.c.cpf == cpf
+        )
+        with self.engine.connect() as conn:
+            row = conn.execute(query).first()
+        if row is None:
+            return None
+        return CacheEntry(row.credit, row.stored_at)
+
+    def set(self, cpf, value, stored_at: float = None):
+        query = insert(self.table).values(
+            cpf=cpf, credit=value, stored_at=stored_at
+        )
+        query = query.on_conflict_do_update(
+            index_elements=["cpf"],
+            set_={
+                "credit": query.excluded.credit,
+                "stored_at": query.excluded.stored_at,
+            },
+        )
+        with self.engine.connect() as conn:
+            conn.execute(query)
+
+    def delete(self, cpf):
+        with self.engine.connect() as conn:
+            conn.execute(self.table.delete().where(self.table.c.cpf == cpf))
+
+    def clear(self):
+        with self.engine.connect() as conn:
+            conn.execute(self.table.delete())
+
+
+class CreditCache:
+    """
+    Reseller credit cache keyed by normalized CPF.
+
+    Credits younger than ``ttl`` are fresh. Until ``ttl + stale_ttl`` they
+    are still served, but a background refresh is started
+    (stale-while-revalidate). Older credits are kept for another
+    ``fallback_ttl`` seconds only to be served by ``get`` when the upstream
+    is unavailable.
+
+    The local tier is an in-process LRU. With a ``shared`` tier, such as
+    ``DatabaseCreditStore``, every worker benefits from a lookup done by
+    another one; the local tier then keeps a credit for ``local_ttl``
+    seconds at most, so a credit dropped from the shared tier stops being
+    served soon. Errors of the shared tier are logged and count as misses.
+    Wall-clock timestamps are used so entries are comparable across workers.
+    """
+
+    def __init__(
+        self,
+        ttl=60,
+        stale_ttl=0,
+        fallback_ttl=0,
+        maxsize=1024,
+        shared=None,
+        local_ttl=None,
+        timer=time.time,
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.fallback_ttl = fallback_ttl
+        self.timer = timer
+        max_age = ttl + stale_ttl + fallback_ttl
+        if shared is not None and local_ttl is not None:
+            max_age = min(max_age, local_ttl)
+        # Local values are the entries, so an entry copied from the shared
+        # tier keeps the time it was loaded upstream.
+        self.local = LRUCache(maxsize=maxsize, max_age=max_age, timer=timer)
+        self.shared = shared
+        self.stale_hits = 0
+        self.refreshes = 0
+        self.shared_hits = 0
+        self.shared_errors = 0
+        self._refreshing = set()
+
+    async def get_entry(self, cpf) -> Optional[CacheEntry]:
+        cpf = normalize_cpf(cpf)
+        entry = self.local.get(cpf)
+        if entry is None and self.shared is not None:
+            entry = await self._call_shared(self.shared.get_entry, cpf)
+            if entry is not None:
+                self.shared_hits += 1
+                self.local.set(cpf, entry)
+        if entry is not None and self._is_expired(entry):
+            return None
+        return entry
+
+    async def get(self, cpf):
+        entry = await self.get_entry(cpf)
+        if entry is None:
+            return None
+        return entry.value
+
+    async def set(self, cpf, credit):
+        cpf = normalize_cpf(cpf)
+        entry = CacheEntry(credit, self.timer())
+        self.local.set(cpf, entry)
+        if self.shared is not None:
+            await self._call_shared(
+                self.shared.set, cpf, entry.value, entry.stored_at
+            )
+
+    async def delete(self, cpf):
+        cpf = normalize_cpf(cpf)
+        self.local.delete(cpf)
+        if self.shared is not None:
+            await self._call_shared(self.shared.delete, cpf)
+
+    def clear(self):
+        self.local.clear()
+        self._refreshing.clear()
+        if self.shared is not None:
+            try:
+                self.shared.clear()
+            except Exception as err:
+                self._shared_error(err)
+
+    async def get_or_load(self, cpf, loader):
+        """
+        Return the cached credit for ``cpf`` or await ``loader()`` for it.
+        """
+        cpf = normalize_cpf(cpf)
+        entry = await self.get_entry(cpf)
+        if entry is not None:
+            age = self.timer() - entry.stored_at
+            if age < self.ttl:
+                return entry.value
+
+            if age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._revalidate(cpf, loader)
+                return entry.value
+
+        credit = await loader()
+        await self.set(cpf, credit)
+        return credit
+
+    def stats(self) -> dict:
+        stats = self.local.stats()
+        stats.update(
+            {
+                "stale_hits": self.stale_hits,
+                "refreshes": self.refreshes,
+                "shared_hits": self.shared_hits,
+                "shared_errors": self.shared_errors,
+            }
+        )
+        return stats
+
+    async def _call_shared(self, func, *args):
+        try:
+            return await run_in_threadpool(func, *args)
+        except Exception as err:
+            self._shared_error(err)
+            return None
+
+    def _shared_error(self, err):
+        self.shared_errors += 1
+        logger.error(f"Error in the shared credit cache: {err}")
+
+    def _is_expired(self, entry) -> bool:
+        max_age = self.ttl + self.stale_ttl + self.fallback_ttl
+        return self.timer() - entry.stored_at >= max_age
+
+    def _revalidate(self, cpf, loader):
+        if cpf in self._refreshing:
+            return
+        self._refreshing.add(cpf)
+        asyncio.ensure_future(self._refresh(cpf, loader))
+
+    async def _refresh(self, cpf, loader):
+        try:
+            credit = await loader()
+            await self.set(cpf, credit)
+            self.refreshes += 1
+        except Exception as err:
+            logger.error(f"Error refreshing cached credit for {cpf}: {err}")
+        finally:
+            self._refreshing.discard(cpf)
+
+
+credit_cache = CreditCache(
+    ttl=config.CREDIT_CACHE_TTL,
+    stale_ttl=config.CREDIT_CACHE_STALE_TTL,
+    fallback_ttl=config.CREDIT_CACHE_FALLBACK_TTL,
+    maxsize=config.CREDIT_CACHE_MAXSIZE,
+    shared=DatabaseCreditStore(engine) if config.CREDIT_CACHE_SHARED else None,
+    local_ttl=config.CREDIT_CACHE_LOCAL_TTL,
+)
@@ -1,12 +1,19 @@
+import asyncio
 import logging
 
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
-from starlette.requests import Request
 
+from cashback import crud
 from cashback.api.routes import router as api_router
-from cashback.core import config
-from cashback.db.session import Session
+from cashback.core import config, metrics
+from cashback.core.auth_cache import auth_cache
+from cashback.core.profiler import SQLProfilerMiddleware
+from cashback.core.rules import rules_store
+from cashback.core.security import password_executor
+from cashback.db.session import Session, database
+from cashback.extensions.boticario.backends import AsyncBoticarioBackend
+from cashback.extensions.boticario.cache import credit_cache
 
 app = FastAPI(title=config.PROJECT_NAME)
 
@@ -17,6 +24,53 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(metrics.MetricsMiddleware)
+app.add_middleware(SQLProfilerMiddleware)
+app.add_route("/metrics", metrics.metrics_endpoint, include_in_schema=False)
+
+CACHE_COUNTERS = (
+    "hits",
+    "misses",
+    "evictions",
+    "stale_hits",
+    "refreshes",
+    "shared_hits",
+    "shared_errors",
+)
+metrics.stats_collector.register(
+    "credit_cache", credit_cache.stats, counters=CACHE_COUNTERS
+)
+metrics.stats_collector.register(
+    "boticario_breaker",
+    AsyncBoticarioBackend.breaker.stats,
+    counters=("rejected", "transitions"),
+    modes={"state_code": "max", "failures": "max"},
+)
+metrics.stats_collector.register(
+    "boticario_flights",
+    AsyncBoticarioBackend.flights.stats,
+    counters=("calls", "coalesced"),
+)
+metrics.stats_collector.register(
+    "boticario_latency",
+    AsyncBoticarioBackend.latency.stats,
+    modes={"latency": "max", "timeout": "max"},
+)
+metrics.stats_collector.register(
+    "auth_cache", auth_cache.stats, counters=CACHE_COUNTERS
+)
+metrics.stats_collector.register(
+    "password",
+    password_executor.stats,
+    counters=("completed", "rejected"),
+    modes={"latency_p99": "max"},
+)
+metrics.stats_collector.register(
+    "cashback_rules",
+    rules_store.stats,
+    counters=("reloads",),
+    modes={"version": "min"},
+)
 
 
 @app.on_event("startup")
@@ -24,12 +78,54 @@ def init_logging() -> None:
     logging.config.dictConfig(config.LOGGING)
 
 
-app.include_router(api_router)
+@app.on_event("startup")
+async def connect_database() -> None:
+    if config.ASYNC_ENDPOINTS:
+        await database.connect()
+
+
+@app.on_event("startup")
+async def watch_cashback_rules() -> None:
+    "Poll the stored cashback rules version in the background"
+    app.state.rules_poll = asyncio.ensure_future(crud.rules.poll(Session))
 
 
-@app.middleware("http")
-async def db_session_middleware(request: Request, call_next):
-    request.state.db = Session()
-    response = await call_next(request)
-    request.state.db.close()
-    return response
+@app.on_event("startup")
+async def publish_stats_metrics() -> None:
+    "Publish the stats of this worker, so every worker counts in /metrics"
+    app.state.stats_publisher = asyncio.ensure_future(
+        metrics.stats_collector.run(config.METRICS_PUBLISH_INTERVAL)
+    )
+
+
+@app.on_event("shutdown")
+async def stop_publishing_stats_metrics() -> None:
+    stats_publisher = getattr(app.state, "stats_publisher", None)
+    if stats_publisher is not None:
+        stats_publisher.cancel()
+
+
+@app.on_event("shutdown")
+async def stop_watching_cashback_rules() -> None:
+    rules_poll = getattr(app.state, "rules_poll", None)
+    if rules_poll is not None:
+        rules_poll.cancel()
+
+
+@app.on_event("shutdown")
+async def disconnect_database() -> None:
+    if database.is_connected:
+        await database.disconnect()
+
+
+@app.on_event("shutdown")
+async def close_boticario_client() -> None:
+    await AsyncBoticarioBackend.close()
+
+
+@app.on_event("shutdown")
+def shutdown_password_executor() -> None:
+    password_executor.shutdown()
+
+
+app.include_router(api_router)
@@ -0,0 +1,41 @@
+"""order reseller indexes
+
+Revision ID: 5b1f0e7c9d42
+Revises: a3c7d22e9e23
+Create Date: 2020-05-02 10:21:43.512093
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "5b1f0e7c9d42"
+down_revision = "a3c7d22e9e23"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Fails if a reseller already has duplicated order codes, those
+    # must be fixed before upgrading.
+    op.create_unique_constraint(
+        "uq_order_reseller_cpf_code", "order", ["reseller_cpf", "code"]
+    )
+    op.create_index(
+        "ix_order_reseller_cpf_id",
+        "order",
+        ["reseller_cpf", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_order_reseller_cpf_date",
+        "order",
+        ["reseller_cpf", "date"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index("ix_order_reseller_cpf_date", table_name="order")
+    op.drop_index("ix_order_reseller_cpf_id", table_name="order")
+    op.drop_constraint("uq_order_reseller_cpf_code", "order", type_="unique")
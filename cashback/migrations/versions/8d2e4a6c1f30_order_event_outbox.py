@@ -0,0 +1,34 @@
+"""order event outbox
+
+Revision ID: 8d2e4a6c1f30
+Revises: 5b1f0e7c9d42
+Create Date: 2020-05-09 16:02:11.804215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "8d2e4a6c1f30"
+down_revision = "5b1f0e7c9d42"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "order_event",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("order_id", sa.Integer(), nullable=False),
+        sa.Column("event", sa.String(length=50), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["order_id"], ["order.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade():
+    op.drop_table("order_event")
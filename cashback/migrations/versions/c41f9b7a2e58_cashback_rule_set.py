@@ -0,0 +1,39 @@
+"""cashback rule set
+
+Revision ID: c41f9b7a2e58
+Revises: 8d2e4a6c1f30
+Create Date: 2020-05-16 11:37:52.190443
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c41f9b7a2e58"
+down_revision = "8d2e4a6c1f30"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The first version is stored from the configured defaults by
+    # `make initial-data`.
+    op.create_table(
+        "cashback_rule_set",
+        sa.Column(
+            "version", sa.Integer(), autoincrement=False, nullable=False
+        ),
+        sa.Column("rules", sa.JSON(), nullable=False),
+        sa.Column("auto_approve_cpfs", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("version"),
+    )
+    op.add_column(
+        "order", sa.Column("rules_version", sa.Integer(), nullable=True)
+    )
+
+
+def downgrade():
+    op.drop_column("order", "rules_version")
+    op.drop_table("cashback_rule_set")
@@ -0,0 +1,31 @@
+"""cached credit
+
+Revision ID: e7a1c3d95b04
+Revises: c41f9b7a2e58
+Create Date: 2020-05-23 10:12:41.532817
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e7a1c3d95b04"
+down_revision = "c41f9b7a2e58"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "cached_credit",
+        sa.Column("cpf", sa.String(length=20), nullable=False),
+        sa.Column("credit", sa.JSON(), nullable=False),
+        sa.Column("stored_at", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("cpf"),
+        prefixes=["UNLOGGED"],
+    )
+
+
+def downgrade():
+    op.drop_table("cached_credit")
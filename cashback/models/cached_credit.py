@@ -0,0 +1,19 @@
+from sqlalchemy import JSON, Column, Float, String
+
+from cashback.db.base_class import Base
+
+
+class CachedCredit(Base):
+    """
+    Shared tier of the reseller credit cache, see
+    ``cashback.extensions.boticario.cache``. The table is unlogged, it is
+    only a cache and losing it on a crash just means more upstream calls.
+    """
+
+    __tablename__ = "cached_credit"
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+
+    cpf = Column(String(20), primary_key=True)
+    credit = Column(JSON, nullable=False)
+    # Wall-clock timestamp, comparable between workers
+    stored_at = Column(Float, nullable=False)
@@ -7,17 +7,20 @@ from sqlalchemy import (
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     Sequence,
     String,
+    UniqueConstraint,
     event,
 )
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 
-from cashback.core import config
+from cashback.core.rules import rules_store
 from cashback.db.base_class import Base
+from cashback.models.order_event import ORDER_CREATED, OrderEvent
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +31,14 @@ class OrderStatus(enum.Enum):
 
 
 class Order(Base):
+    __table_args__ = (
+        Index("ix_order_reseller_cpf_id", "reseller_cpf", "id"),
+        Index("ix_order_reseller_cpf_date", "reseller_cpf", "date"),
+        UniqueConstraint(
+            "reseller_cpf", "code", name="uq_order_reseller_cpf_code"
+        ),
+    )
+
     id = Column(
         Integer, Sequence("order_id_seq"), primary_key=True, index=True
     )
@@ -35,6 +46,8 @@ class Order(Base):
     value = Column(Numeric(10, 2))
     cashback_percentage = Column(Integer)
     cashback_value = Column(Numeric(10, 2))
+    # Cashback rules version the cashback was computed with
+    rules_version = Column(Integer)
     status = Column(
         Enum(OrderStatus), default=OrderStatus.IN_VALIDATION, nullable=False
     )
@@ -49,17 +62,19 @@ class Order(Base):
         return self.status.name
 
     def set_order_status(self):
-        "Set auto approve status if CPF number has in config"
-        if self.reseller_cpf in config.CPFS_WITH_AUTO_APPROVE:
+        "Set auto approve status if CPF number has in the cashback rules"
+        if rules_store.snapshot.is_auto_approve(self.reseller_cpf):
             self.status = OrderStatus.APPROVED
         return self.status
 
     def calculate_cashback_value(self):
         "Calcute cashback value"
-        for rule in config.CASHBACK_RULES:
-            if round(rule[1], 2) <= round(self.value, 2) <= round(rule[2], 2):
-                self.cashback_percentage = rule[0]
-                self.cashback_value = self.value * rule[0] / 100
+        snapshot = rules_store.snapshot
+        cashback_value, percentage = snapshot.rules.calculate(self.value)
+        if percentage is not None:
+            self.cashback_value = cashback_value
+            self.cashback_percentage = percentage
+            self.rules_version = snapshot.version
         return self.cashback_value, self.cashback_percentage
 
     def set_saved_order_log(self):
@@ -71,10 +86,16 @@ class Order(Base):
 
 @event.listens_for(Order, "before_insert")
 def order_before_insert(mapper, connect, target):
-    target.set_order_status()
     target.calculate_cashback_value()
 
 
 @event.listens_for(Order, "after_insert")
 def order_after_insert(mapper, connect, target):
-    target.set_saved_order_log()
+    "Queue the order side effects for the outbox worker"
+    connect.execute(
+        OrderEvent.__table__.insert().values(
+            order_id=target.id,
+            event=ORDER_CREATED,
+            created_at=datetime.datetime.now(),
+        )
+    )
@@ -0,0 +1,26 @@
+import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+
+from cashback.db.base_class import Base
+
+ORDER_CREATED = "order_created"
+
+
+class OrderEvent(Base):
+    """
+    Outbox of order side effects.
+
+    Rows are written in the same transaction as the order and removed by
+    the outbox worker once their side effects are done, see
+    ``cashback.db.outbox``.
+    """
+
+    __tablename__ = "order_event"
+
+    id = Column(Integer, primary_key=True)
+    order_id = Column(
+        Integer, ForeignKey("order.id", ondelete="CASCADE"), nullable=False
+    )
+    event = Column(String(50), default=ORDER_CREATED, nullable=False)
+    created_at = Column(DateTime, default=datetime.datetime.now)
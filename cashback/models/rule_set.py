@@ -0,0 +1,20 @@
+import datetime
+
+from sqlalchemy import JSON, Column, DateTime, Integer
+
+from cashback.db.base_class import Base
+
+
+class CashbackRuleSet(Base):
+    """
+    One version of the cashback rules. Versions are never updated, a
+    change is stored as a new version and the highest one is in effect.
+    """
+
+    __tablename__ = "cashback_rule_set"
+
+    version = Column(Integer, primary_key=True, autoincrement=False)
+    # [{"percentage": 10, "start": "0", "end": "999.99"}, ...]
+    rules = Column(JSON, nullable=False)
+    auto_approve_cpfs = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.datetime.now)
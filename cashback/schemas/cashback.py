@@ -1,6 +1,29 @@
+from typing import List, Optional
+
 from pydantic import BaseModel
 
 
 class Cashback(BaseModel):
     cpf: str
     credit: int = None
+
+
+class CashbackTotals(BaseModel):
+    orders: int
+    total_value: float
+    total_cashback: float
+
+
+class CashbackStatusSummary(CashbackTotals):
+    status: str
+
+
+class CashbackMonthSummary(CashbackTotals):
+    month: Optional[str]
+
+
+# Local order totals of a reseller
+class CashbackSummary(CashbackTotals):
+    cpf: str
+    by_status: List[CashbackStatusSummary]
+    by_month: List[CashbackMonthSummary]
@@ -1,4 +1,5 @@
 from datetime import date
+from typing import Optional
 
 from pydantic import BaseModel, Field
 
@@ -34,3 +35,11 @@ class OrderInDBBase(OrderBase):
 class Order(OrderInDBBase):
     cashback_percentage: int
     cashback_value: float
+
+
+# Per-row result of a bulk import
+class OrderBulkResult(BaseModel):
+    index: int
+    created: bool
+    order: Optional[Order] = None
+    detail: Optional[str] = None
@@ -0,0 +1,32 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import List
+
+from pydantic import BaseModel
+
+
+# One cashback tier, bounds in BRL and inclusive
+class CashbackRule(BaseModel):
+    percentage: int
+    start: Decimal
+    end: Decimal
+
+
+# Shared properties
+class CashbackRuleSetBase(BaseModel):
+    rules: List[CashbackRule]
+    auto_approve_cpfs: List[str] = []
+
+
+# Properties to receive on rules creation
+class CashbackRuleSetCreate(CashbackRuleSetBase):
+    pass
+
+
+# Properties to return to client
+class CashbackRuleSet(CashbackRuleSetBase):
+    version: int
+    created_at: datetime = None
+
+    class Config:
+        orm_mode = True
@@ -44,3 +44,11 @@ class UserUpdate(UserBaseInDB):
 # Additional properties to return via API
 class User(UserBaseInDB):
     pass
+
+
+# Per-row result of a bulk provisioning
+class UserBulkResult(BaseModel):
+    index: int
+    created: bool
+    user: Optional[User] = None
+    detail: Optional[str] = None
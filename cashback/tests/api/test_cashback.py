@@ -67,3 +67,30 @@ class TestAPICashback:
             f"/cashback/3435565776/", headers=normal_user_token_headers,
         )
         assert response.status_code == 403
+
+    def test_get_cashback_summary_with_normal_user(self, payload_new_order):
+        user, user_pass = create_random_user()
+        headers = user_authentication_headers(user.email, user_pass)
+        payload_new_order["cpf"] = user.cpf
+        client.post(f"/orders/", headers=headers, json=payload_new_order)
+
+        response = client.get(
+            f"/cashback/{user.cpf}/summary/", headers=headers
+        )
+        summary = response.json()
+
+        assert response.status_code == 200
+        assert summary["cpf"] == user.cpf
+        assert summary["orders"] == 1
+        assert summary["total_cashback"] == 10
+        assert summary["by_status"][0]["status"] == "IN_VALIDATION"
+        assert summary["by_month"][0]["month"] == "2020-04"
+
+    def test_get_cashback_summary_with_normal_user_and_divergent_cpf(
+        self, normal_user_token_headers
+    ):
+        response = client.get(
+            f"/cashback/3435565776/summary/",
+            headers=normal_user_token_headers,
+        )
+        assert response.status_code == 403
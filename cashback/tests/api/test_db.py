@@ -0,0 +1,25 @@
+from unittest import mock
+
+import pytest
+
+from cashback.api.utils import db as db_utils
+
+
+class TestGetDB:
+    def test_close_session_after_request(self):
+        with mock.patch.object(db_utils, "Session"):
+            dependency = db_utils.get_db()
+            db = next(dependency)
+            with pytest.raises(StopIteration):
+                next(dependency)
+
+        db.close.assert_called_once()
+
+    def test_close_session_when_endpoint_raises(self):
+        with mock.patch.object(db_utils, "Session"):
+            dependency = db_utils.get_db()
+            db = next(dependency)
+            with pytest.raises(ValueError):
+                dependency.throw(ValueError("endpoint error"))
+
+        db.close.assert_called_once()
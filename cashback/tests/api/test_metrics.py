@@ -0,0 +1,43 @@
+from starlette.testclient import TestClient
+
+from cashback.core import config
+from cashback.main import app
+
+client = TestClient(app)
+
+
+class TestAPIMetrics:
+    def test_metrics_by_route_template(self, superuser_token_headers):
+        client.get(f"/user/1/", headers=superuser_token_headers)
+
+        response = client.get(f"/metrics")
+
+        assert response.status_code == 200
+        assert (
+            'http_request_duration_seconds_count{method="GET",'
+            'route="/user/{user_id}/",status="200"}'
+        ) in response.text
+        assert 'db_queries_per_request_count{route="/user/{user_id}/"}' in (
+            response.text
+        )
+        assert "cashback_credit_cache_hits" in response.text
+
+    def test_sql_profile_headers(self, monkeypatch, superuser_token_headers):
+        monkeypatch.setattr(config, "SQL_PROFILE_HEADER", True)
+
+        response = client.get(
+            f"/users/",
+            headers=dict(superuser_token_headers, **{"X-SQL-Profile": "1"}),
+        )
+
+        assert response.status_code == 200
+        assert int(response.headers["X-SQL-Count"]) >= 1
+        assert response.headers["X-SQL-Time"].endswith("ms")
+        assert "X-SQL-Repeated" in response.headers
+
+    def test_sql_profile_disabled_by_default(self, superuser_token_headers):
+        response = client.get(
+            f"/users/",
+            headers=dict(superuser_token_headers, **{"X-SQL-Profile": "1"}),
+        )
+        assert "X-SQL-Count" not in response.headers
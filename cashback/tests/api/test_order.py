@@ -1,10 +1,18 @@
+import json
+
 from starlette.testclient import TestClient
 
+from cashback.crud.crud_order import DUPLICATED_ORDER, RESELLER_NOT_FOUND
 from cashback.main import app
 from cashback.tests.conftest import user_authentication_headers
-from cashback.tests.factories import create_random_user
+from cashback.tests.factories import (
+    create_random_user,
+    random_cpf,
+    random_lower_string,
+)
 
 client = TestClient(app)
+NDJSON = "application/x-ndjson"
 
 
 class TestAPIOrder:
@@ -36,6 +44,35 @@ class TestAPIOrder:
         )
 
         assert response.status_code == 409
+        assert response.json()["detail"] == RESELLER_NOT_FOUND
+
+    def test_error_create_order_with_duplicated_code(
+        self, payload_new_order, superuser_token_headers
+    ):
+        user, _ = create_random_user()
+        payload_new_order["cpf"] = user.cpf
+        client.post(
+            f"/orders/",
+            headers=superuser_token_headers,
+            json=payload_new_order,
+        )
+
+        response = client.post(
+            f"/orders/",
+            headers=superuser_token_headers,
+            json=payload_new_order,
+        )
+        assert response.status_code == 409
+        assert response.json()["detail"] == DUPLICATED_ORDER
+
+        response = client.post(
+            f"/orders/bulk/",
+            headers=superuser_token_headers,
+            json=[payload_new_order],
+        )
+        result = response.json()[0]
+        assert not result["created"]
+        assert "already exists" in result["detail"]
 
     def test_error_create_order_without_any_field(
         self, payload_new_order, normal_user_token_headers
@@ -144,3 +181,167 @@ class TestAPIOrder:
 
         assert len(orders) == 1
         assert orders[0]["reseller_cpf"] == "00145667833"
+
+    def test_create_orders_bulk(
+        self, payload_new_order, superuser_token_headers
+    ):
+        user, _ = create_random_user()
+        valid_order = dict(payload_new_order, cpf=user.cpf, value="1250")
+        unknown_cpf_order = dict(payload_new_order, cpf=random_cpf())
+        invalid_order = dict(payload_new_order, cpf=user.cpf)
+        invalid_order.pop("code")
+
+        response = client.post(
+            f"/orders/bulk/",
+            headers=superuser_token_headers,
+            json=[valid_order, unknown_cpf_order, invalid_order],
+        )
+        results = response.json()
+
+        assert response.status_code == 200
+        assert [result["created"] for result in results] == [
+            True,
+            False,
+            False,
+        ]
+        assert results[0]["order"]["cashback_percentage"] == 15
+        assert results[0]["order"]["order_status"] == "IN_VALIDATION"
+        assert results[1]["detail"] == "The user with this cpf does not exist."
+
+    def test_create_orders_bulk_with_ndjson(
+        self, payload_new_order, superuser_token_headers
+    ):
+        user, _ = create_random_user()
+        payload_new_order["cpf"] = user.cpf
+        lines = [
+            json.dumps(dict(payload_new_order, code=random_lower_string()))
+            for _ in range(3)
+        ]
+        body = "\n".join(lines + ["{invalid"])
+
+        response = client.post(
+            f"/orders/bulk/",
+            headers=dict(superuser_token_headers, **{"Content-Type": NDJSON}),
+            data=body,
+        )
+        results = response.json()
+
+        assert response.status_code == 200
+        assert len(results) == 4
+        assert all(result["created"] for result in results[:3])
+        assert not results[3]["created"]
+
+        orders = client.get(
+            f"/orders/?cpf={user.cpf}", headers=superuser_token_headers
+        ).json()
+        assert len(orders) == 3
+
+    def test_error_create_orders_bulk_with_invalid_payload(
+        self, superuser_token_headers
+    ):
+        response = client.post(
+            f"/orders/bulk/",
+            headers=superuser_token_headers,
+            json={"code": "not a list"},
+        )
+        assert response.status_code == 400
+
+    def test_export_orders_with_normal_user(self, payload_new_order):
+        user, user_pass = create_random_user()
+        headers = user_authentication_headers(user.email, user_pass)
+        payload_new_order["cpf"] = user.cpf
+        for _ in range(3):
+            payload_new_order["code"] = random_lower_string()
+            client.post(f"/orders/", headers=headers, json=payload_new_order)
+
+        response = client.get(f"/orders/export/", headers=headers)
+        orders = [json.loads(line) for line in response.text.splitlines()]
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith(NDJSON)
+        assert len(orders) == 3
+        assert orders[0]["id"] < orders[1]["id"] < orders[2]["id"]
+        assert {order["reseller_cpf"] for order in orders} == {user.cpf}
+
+    def test_export_orders_after_id(self, payload_new_order):
+        user, user_pass = create_random_user()
+        headers = user_authentication_headers(user.email, user_pass)
+        payload_new_order["cpf"] = user.cpf
+        for _ in range(3):
+            payload_new_order["code"] = random_lower_string()
+            client.post(f"/orders/", headers=headers, json=payload_new_order)
+        response = client.get(f"/orders/export/", headers=headers)
+        first_id = json.loads(response.text.splitlines()[0])["id"]
+
+        response = client.get(
+            f"/orders/export/?after={first_id}", headers=headers
+        )
+        orders = [json.loads(line) for line in response.text.splitlines()]
+
+        assert response.status_code == 200
+        assert len(orders) == 2
+        assert all(order["id"] > first_id for order in orders)
+
+    def test_export_orders_as_csv(
+        self, payload_new_order, superuser_token_headers
+    ):
+        user, _ = create_random_user()
+        payload_new_order["cpf"] = user.cpf
+        client.post(
+            f"/orders/",
+            headers=superuser_token_headers,
+            json=payload_new_order,
+        )
+
+        response = client.get(
+            f"/orders/export/?format=csv&cpf={user.cpf}",
+            headers=superuser_token_headers,
+        )
+        lines = response.text.splitlines()
+
+        assert response.status_code == 200
+        assert lines[0].startswith("id,code,value")
+        assert len(lines) == 2
+
+    def test_export_no_orders_as_csv(self):
+        user, user_pass = create_random_user()
+        headers = user_authentication_headers(user.email, user_pass)
+
+        response = client.get(f"/orders/export/?format=csv", headers=headers)
+
+        assert response.status_code == 200
+        assert response.text.splitlines() == [
+            "id,code,value,cashback_percentage,cashback_value,"
+            "order_status,date,reseller_cpf"
+        ]
+
+    def test_list_orders_with_cursor(self, payload_new_order):
+        user, user_pass = create_random_user()
+        headers = user_authentication_headers(user.email, user_pass)
+        payload_new_order["cpf"] = user.cpf
+        for _ in range(3):
+            payload_new_order["code"] = random_lower_string()
+            client.post(f"/orders/", headers=headers, json=payload_new_order)
+
+        response = client.get(f"/orders/?limit=2", headers=headers)
+        cursor = response.headers["X-Next-Cursor"]
+        assert len(response.json()) == 2
+
+        response = client.get(
+            f"/orders/?limit=2&after={cursor}", headers=headers
+        )
+        assert len(response.json()) == 1
+        assert "X-Next-Cursor" not in response.headers
+
+    def test_list_orders_matches_order_schema(self, payload_new_order):
+        user, user_pass = create_random_user()
+        headers = user_authentication_headers(user.email, user_pass)
+        payload_new_order["cpf"] = user.cpf
+        created = client.post(
+            f"/orders/", headers=headers, json=payload_new_order
+        ).json()
+
+        response = client.get(f"/orders/", headers=headers)
+
+        assert response.status_code == 200
+        assert response.json() == [created]
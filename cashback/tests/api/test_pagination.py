@@ -0,0 +1,30 @@
+import pytest
+from fastapi import HTTPException
+from starlette.responses import Response
+
+from cashback.api.utils.pagination import (
+    NEXT_CURSOR_HEADER,
+    decode_cursor,
+    encode_cursor,
+    set_next_cursor,
+)
+from cashback.models.user import User
+
+
+class TestPagination:
+    def test_encode_and_decode_cursor(self):
+        assert decode_cursor(encode_cursor(42)) == 42
+        assert decode_cursor(None) is None
+
+    def test_error_decode_invalid_cursor(self):
+        with pytest.raises(HTTPException) as err:
+            decode_cursor("not-a-cursor")
+        assert err.value.status_code == 400
+
+    def test_set_next_cursor_only_for_full_pages(self):
+        response = Response()
+        set_next_cursor(response, [User(id=1), User(id=2)], limit=3)
+        assert NEXT_CURSOR_HEADER not in response.headers
+
+        set_next_cursor(response, [User(id=1), User(id=2)], limit=2)
+        assert decode_cursor(response.headers[NEXT_CURSOR_HEADER]) == 2
@@ -0,0 +1,22 @@
+from cashback.api.routes import build_router
+
+
+def route_table(router):
+    return sorted(
+        (route.path, tuple(sorted(route.methods))) for route in router.routes
+    )
+
+
+class TestRoutes:
+    def test_async_endpoints_serve_the_same_routes(self):
+        assert route_table(build_router(async_endpoints=True)) == (
+            route_table(build_router(async_endpoints=False))
+        )
+
+    def test_batch_routes_in_both_modes(self):
+        for async_endpoints in (True, False):
+            routes = route_table(build_router(async_endpoints))
+
+            assert ("/orders/bulk/", ("POST",)) in routes
+            assert ("/orders/export/", ("GET",)) in routes
+            assert ("/users/bulk/", ("POST",)) in routes
@@ -0,0 +1,54 @@
+from starlette.testclient import TestClient
+
+from cashback.core import config
+from cashback.core.rules import rules_store
+from cashback.main import app
+
+client = TestClient(app)
+
+
+def default_rules():
+    return {
+        "rules": [
+            {"percentage": percentage, "start": str(start), "end": str(end)}
+            for percentage, start, end in config.CASHBACK_RULES
+        ],
+        "auto_approve_cpfs": config.CPFS_WITH_AUTO_APPROVE,
+    }
+
+
+class TestAPIRules:
+    def test_create_and_get_rules(self, superuser_token_headers):
+        response = client.post(
+            f"/rules/", headers=superuser_token_headers, json=default_rules()
+        )
+        created = response.json()
+
+        assert response.status_code == 201
+        assert created["auto_approve_cpfs"] == config.CPFS_WITH_AUTO_APPROVE
+        assert rules_store.snapshot.version == created["version"]
+
+        response = client.get(f"/rules/", headers=superuser_token_headers)
+
+        assert response.status_code == 200
+        assert response.json() == created
+
+    def test_error_create_rules_with_gap(self, superuser_token_headers):
+        payload = default_rules()
+        del payload["rules"][1]
+
+        response = client.post(
+            f"/rules/", headers=superuser_token_headers, json=payload
+        )
+
+        assert response.status_code == 400
+        assert "Gap between" in response.json()["detail"]
+
+    def test_error_create_rules_with_normal_user(
+        self, normal_user_token_headers
+    ):
+        response = client.post(
+            f"/rules/", headers=normal_user_token_headers, json=default_rules()
+        )
+
+        assert response.status_code == 403
@@ -1,8 +1,18 @@
+import json
+
 from starlette.testclient import TestClient
 
 from cashback import crud
+from cashback.crud.crud_user import CPF_EXISTS, EMAIL_EXISTS
 from cashback.db.session import db_session
 from cashback.main import app
+from cashback.tests.conftest import user_authentication_headers
+from cashback.tests.factories import (
+    create_random_user,
+    random_cpf,
+    random_email,
+    random_lower_string,
+)
 
 client = TestClient(app)
 
@@ -51,6 +61,7 @@ class TestAPIUser:
             f"/users/", headers=superuser_token_headers, json=data,
         )
         assert r.status_code == 409
+        assert r.json()["detail"] == EMAIL_EXISTS
 
     def test_error_in_create_user_with_existing_cpf(
         self, user_in, superuser_token_headers
@@ -68,6 +79,7 @@ class TestAPIUser:
             f"/users/", headers=superuser_token_headers, json=data,
         )
         assert r.status_code == 409
+        assert r.json()["detail"] == CPF_EXISTS
 
     def test_error_in_create_user_with_normal_user(
         self, payload_normal_user, normal_user_token_headers
@@ -177,3 +189,122 @@ class TestAPIUser:
         )
         api_user = response.json()
         assert api_user["full_name"] == "Caetano Veloso"
+
+    def test_update_user_by_id_inactived_drops_cached_user(
+        self, normal_user_token_headers, superuser_token_headers
+    ):
+        r = client.get(f"/user/profile/", headers=normal_user_token_headers)
+        api_user = r.json()
+
+        r = client.put(
+            f"/user/{api_user['id']}/",
+            headers=superuser_token_headers,
+            json={"is_active": False},
+        )
+        assert r.status_code == 200
+
+        response = client.get(
+            f"/user/profile/", headers=normal_user_token_headers
+        )
+        assert response.status_code == 401
+
+    def test_list_users_with_cursor(self, superuser_token_headers):
+        for _ in range(3):
+            create_random_user()
+
+        r = client.get(f"/users/?limit=2", headers=superuser_token_headers)
+        first_page = r.json()
+        cursor = r.headers["X-Next-Cursor"]
+
+        r = client.get(
+            f"/users/?limit=2&after={cursor}", headers=superuser_token_headers
+        )
+        second_page = r.json()
+
+        assert len(first_page) == 2
+        assert len(second_page) == 2
+        assert first_page[-1]["id"] < second_page[0]["id"]
+
+    def test_list_users_matches_user_schema(self, superuser_token_headers):
+        user, _ = create_random_user()
+        created = client.get(
+            f"/user/{user.id}/", headers=superuser_token_headers
+        ).json()
+
+        r = client.get(
+            f"/users/?skip=0&limit=1000", headers=superuser_token_headers
+        )
+        users = {api_user["id"]: api_user for api_user in r.json()}
+
+        assert users[user.id] == created
+
+    def test_create_users_bulk(self, superuser_token_headers):
+        existing, _ = create_random_user()
+        users = [
+            {
+                "email": random_email(),
+                "password": random_lower_string(),
+                "full_name": random_lower_string(),
+                "cpf": random_cpf(),
+            }
+            for _ in range(2)
+        ]
+        users.append(dict(users[0], email=existing.email))
+        users.append({"email": random_email()})
+
+        response = client.post(
+            f"/users/bulk/", headers=superuser_token_headers, json=users
+        )
+        results = response.json()
+
+        assert response.status_code == 200
+        assert [result["created"] for result in results] == [
+            True,
+            True,
+            False,
+            False,
+        ]
+        assert results[1]["user"]["email"] == users[1]["email"]
+        assert "already exists" in results[2]["detail"]
+        assert "password" in results[3]["detail"]
+
+    def test_create_users_bulk_with_ndjson(self, superuser_token_headers):
+        lines = [
+            json.dumps(
+                {
+                    "email": random_email(),
+                    "password": random_lower_string(),
+                    "full_name": random_lower_string(),
+                    "cpf": random_cpf(),
+                }
+            )
+            for _ in range(2)
+        ]
+        body = "\n".join(lines + ["{invalid"])
+
+        response = client.post(
+            f"/users/bulk/",
+            headers=dict(
+                superuser_token_headers,
+                **{"Content-Type": "application/x-ndjson"},
+            ),
+            data=body,
+        )
+        results = response.json()
+
+        assert response.status_code == 200
+        assert [result["created"] for result in results] == [
+            True,
+            True,
+            False,
+        ]
+
+    def test_error_create_users_bulk_with_normal_user(self):
+        user, password = create_random_user()
+        r = client.post(
+            f"/users/bulk/",
+            headers=user_authentication_headers(user.email, password),
+            json=[],
+        )
+
+        assert r.status_code == 403
@@ -7,6 +7,7 @@ from starlette.testclient import TestClient
 
 from cashback.core import config as settings
 from cashback.db.base import Base
+from cashback.db.session import database
 from cashback.main import app
 from cashback.schemas.user import UserCreate
 from cashback.tests.factories import (
@@ -153,3 +154,10 @@ def payload_new_order():
         "date": "2020-04-18",
         "cpf": random_cpf(),
     }
+
+
+@pytest.fixture
+async def async_db():
+    await database.connect()
+    yield database
+    await database.disconnect()
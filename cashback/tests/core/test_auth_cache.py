@@ -0,0 +1,49 @@
+from cashback.core.auth_cache import AuthCache
+from cashback.models.user import User
+from cashback.tests.utils import FakeTimer
+
+
+class TestAuthCache:
+    def setup(self):
+        self.timer = FakeTimer()
+        self.clock = FakeTimer(1000)
+        self.cache = AuthCache(
+            ttl=30, maxsize=10, timer=self.timer, clock=self.clock
+        )
+
+    def test_get_and_set_token(self):
+        self.cache.set_token("token", 1, expires_at=2000)
+
+        assert self.cache.get_user_id("token") == 1
+        assert self.cache.get_user_id("other") is None
+
+    def test_expire_token_by_ttl(self):
+        self.cache.set_token("token", 1, expires_at=2000)
+        self.timer.now += 30
+
+        assert self.cache.get_user_id("token") is None
+
+    def test_expire_token_by_jwt_expiration(self):
+        self.cache.set_token("token", 1, expires_at=1010)
+        self.clock.now += 10
+
+        assert self.cache.get_user_id("token") is None
+        assert "token" not in self.cache.tokens
+
+    def test_get_user_returns_a_new_snapshot(self):
+        user = User(id=1, email="a@b.com", cpf="1", is_active=True)
+        self.cache.set_user(user)
+
+        cached = self.cache.get_user(1)
+        assert cached is not user
+        assert (cached.id, cached.email, cached.is_active) == (
+            1,
+            "a@b.com",
+            True,
+        )
+
+    def test_invalidate_user(self):
+        self.cache.set_user(User(id=1, email="a@b.com"))
+        self.cache.invalidate(1)
+
+        assert self.cache.get_user(1) is None
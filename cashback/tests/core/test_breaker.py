@@ -0,0 +1,131 @@
+import asyncio
+
+import pytest
+
+from cashback.core.breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    LatencyTracker,
+)
+from cashback.tests.utils import FakeTimer
+
+
+class TestCircuitBreaker:
+    def setup(self):
+        self.timer = FakeTimer()
+        self.breaker = CircuitBreaker(
+            failure_threshold=2,
+            recovery_timeout=10,
+            failure_exceptions=(ValueError,),
+            timer=self.timer,
+        )
+
+    async def success(self):
+        return "ok"
+
+    async def failure(self):
+        raise ValueError("upstream error")
+
+    async def open_circuit(self):
+        for _ in range(self.breaker.failure_threshold):
+            with pytest.raises(ValueError):
+                await self.breaker.call(self.failure)
+
+    @pytest.mark.asyncio
+    async def test_open_after_failure_threshold(self):
+        await self.open_circuit()
+
+        assert self.breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            await self.breaker.call(self.success)
+        assert self.breaker.stats()["rejected"] == 1
+        assert self.breaker.stats()["state_code"] == 2
+
+    @pytest.mark.asyncio
+    async def test_ignore_other_exceptions(self):
+        async def not_found():
+            raise KeyError("not found")
+
+        for _ in range(3):
+            with pytest.raises(KeyError):
+                await self.breaker.call(not_found)
+
+        assert self.breaker.state == CircuitBreaker.CLOSED
+
+    @pytest.mark.asyncio
+    async def test_close_after_half_open_success(self):
+        await self.open_circuit()
+
+        self.timer.now = 10
+        assert self.breaker.state == CircuitBreaker.HALF_OPEN
+        assert await self.breaker.call(self.success) == "ok"
+        assert self.breaker.state == CircuitBreaker.CLOSED
+        assert self.breaker.stats()["transitions"] == {
+            "closed->open": 1,
+            "open->half_open": 1,
+            "half_open->closed": 1,
+        }
+
+    @pytest.mark.asyncio
+    async def test_reopen_after_half_open_failure(self):
+        await self.open_circuit()
+
+        self.timer.now = 10
+        with pytest.raises(ValueError):
+            await self.breaker.call(self.failure)
+        assert self.breaker.state == CircuitBreaker.OPEN
+
+    @pytest.mark.asyncio
+    async def test_close_after_half_open_other_exception(self):
+        async def rejected():
+            raise KeyError("rejected cpf")
+
+        await self.open_circuit()
+
+        self.timer.now = 10
+        with pytest.raises(KeyError):
+            await self.breaker.call(rejected)
+        assert self.breaker.state == CircuitBreaker.CLOSED
+        assert await self.breaker.call(self.success) == "ok"
+
+    @pytest.mark.asyncio
+    async def test_release_half_open_slot_on_cancel(self):
+        async def cancelled():
+            raise asyncio.CancelledError()
+
+        await self.open_circuit()
+
+        self.timer.now = 10
+        with pytest.raises(asyncio.CancelledError):
+            await self.breaker.call(cancelled)
+        assert self.breaker.state == CircuitBreaker.HALF_OPEN
+        assert await self.breaker.call(self.success) == "ok"
+        assert self.breaker.state == CircuitBreaker.CLOSED
+
+
+class TestLatencyTracker:
+    def test_use_max_timeout_without_samples(self):
+        tracker = LatencyTracker(max_timeout=5.0, min_samples=10)
+        tracker.observe(0.1)
+
+        assert tracker.timeout() == 5.0
+
+    def test_adaptive_timeout(self):
+        tracker = LatencyTracker(
+            percentile=90, multiplier=2, min_samples=10, min_timeout=0.1
+        )
+        for index in range(1, 11):
+            tracker.observe(index / 10)
+
+        assert tracker.latency() == 0.9
+        assert tracker.timeout() == 1.8
+
+    def test_limit_adaptive_timeout(self):
+        tracker = LatencyTracker(
+            min_timeout=0.5, max_timeout=1.0, min_samples=1
+        )
+        tracker.observe(0.01)
+        assert tracker.timeout() == 0.5
+
+        tracker.observe(10)
+        assert tracker.timeout() == 1.0
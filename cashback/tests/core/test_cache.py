@@ -0,0 +1,36 @@
+from cashback.core.cache import LRUCache
+from cashback.tests.utils import FakeTimer
+
+
+class TestLRUCache:
+    def test_get_and_set(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_evict_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert cache.evictions == 1
+
+    def test_expire_entries_by_max_age(self):
+        timer = FakeTimer()
+        cache = LRUCache(maxsize=2, max_age=10, timer=timer)
+        cache.set("a", 1)
+
+        timer.now = 9
+        assert cache.get("a") == 1
+
+        timer.now = 10
+        assert cache.get("a") is None
+        assert len(cache) == 0
@@ -0,0 +1,73 @@
+from prometheus_client import CollectorRegistry
+
+from cashback.core.metrics import (
+    RequestStats,
+    StatsCollector,
+    flatten,
+    is_counter,
+    observe_query,
+    request_stats,
+)
+
+
+class TestMetrics:
+    def test_observe_query_in_request(self):
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        try:
+            observe_query(0.25)
+            observe_query(0.5)
+        finally:
+            request_stats.reset(token)
+
+        assert stats.queries == 2
+        assert stats.query_time == 0.75
+
+    def test_observe_query_outside_request(self):
+        observe_query(0.1)
+        assert request_stats.get() is None
+
+    def test_flatten_stats(self):
+        stats = {"hits": 1, "transitions": {"closed->open": 2}}
+        assert flatten(stats) == {"hits": 1, "transitions_closed__open": 2}
+
+    def test_is_counter(self):
+        counters = ("hits", "transitions")
+
+        assert is_counter("hits", counters)
+        assert is_counter("tokens_hits", counters)
+        assert is_counter("transitions_closed__open", counters)
+        assert not is_counter("size", counters)
+
+    def test_publish_numeric_stats(self):
+        registry = CollectorRegistry()
+        collector = StatsCollector(registry)
+        stats = {"state": "open", "state_code": 2, "rejected": 3}
+        collector.register(
+            "breaker",
+            lambda: stats,
+            counters=("rejected",),
+            modes={"state_code": "max"},
+        )
+
+        collector.publish()
+        stats["rejected"] = 5
+        collector.publish()
+
+        assert registry.get_sample_value("cashback_breaker_state_code") == 2
+        assert (
+            registry.get_sample_value("cashback_breaker_rejected_total") == 5
+        )
+        assert registry.get_sample_value("cashback_breaker_state") is None
+
+    def test_publish_reset_counter(self):
+        registry = CollectorRegistry()
+        collector = StatsCollector(registry)
+        stats = {"hits": 4}
+        collector.register("cache", lambda: stats, counters=("hits",))
+
+        collector.publish()
+        stats["hits"] = 1
+        collector.publish()
+
+        assert registry.get_sample_value("cashback_cache_hits_total") == 5
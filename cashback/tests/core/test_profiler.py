@@ -0,0 +1,30 @@
+from cashback.core.profiler import SQLProfile, statement_shape
+
+
+class TestSQLProfiler:
+    def test_statement_shape_folds_parameter_lists(self):
+        statement = "SELECT * FROM u\n WHERE id IN (%(id_1)s, %(id_2)s)"
+        assert statement_shape(statement) == (
+            "SELECT * FROM u WHERE id IN (%(id_N)s, ...)"
+        )
+
+    def test_statement_shape_folds_multi_row_values(self):
+        statement = (
+            "INSERT INTO o (a, b) VALUES "
+            "(%(a_m0)s, %(b_m0)s), (%(a_m1)s, %(b_m1)s)"
+        )
+        assert statement_shape(statement) == (
+            "INSERT INTO o (a, b) VALUES (%(a_N)s, ...), ..."
+        )
+
+    def test_repeated_shapes(self):
+        profile = SQLProfile()
+        profile.record("SELECT * FROM u WHERE id = %(id_1)s", 0.1)
+        profile.record("SELECT * FROM u WHERE id = %(id_1)s", 0.2)
+        profile.record("SELECT * FROM o", 0.3)
+
+        assert profile.count == 3
+        assert round(profile.total_time, 2) == 0.6
+        assert profile.repeated() == [
+            ("SELECT * FROM u WHERE id = %(id_N)s", 2)
+        ]
@@ -0,0 +1,126 @@
+from decimal import Decimal
+
+import pytest
+
+from cashback.core.rules import (
+    CashbackRules,
+    InvalidCashbackRules,
+    RulesSnapshot,
+    RulesStore,
+)
+from cashback.tests.utils import FakeTimer
+
+RULES = (
+    (10, Decimal("0"), Decimal("999.99")),
+    (15, Decimal("1000"), Decimal("1499.99")),
+    (20, Decimal("1500"), Decimal("100000000")),
+)
+
+
+class TestCashbackRules:
+    def setup(self):
+        self.rules = CashbackRules(RULES)
+
+    def test_percentage_on_boundaries(self):
+        assert self.rules.percentage(Decimal("0")) == 10
+        assert self.rules.percentage(Decimal("999.99")) == 10
+        assert self.rules.percentage(Decimal("1000")) == 15
+        assert self.rules.percentage(Decimal("1499.99")) == 15
+        assert self.rules.percentage(Decimal("1500")) == 20
+        assert self.rules.percentage(Decimal("100000000")) == 20
+
+    def test_values_between_rules_are_rounded_to_cents(self):
+        assert self.rules.percentage(Decimal("999.994")) == 10
+        assert self.rules.percentage(Decimal("999.996")) == 15
+
+    def test_values_are_rounded_half_up_like_postgres(self):
+        assert CashbackRules.to_cents("500.005") == Decimal("500.01")
+        assert CashbackRules.to_cents("500.015") == Decimal("500.02")
+
+    def test_values_out_of_range(self):
+        assert self.rules.percentage(Decimal("-1")) is None
+        assert self.rules.percentage(Decimal("100000000.01")) is None
+        assert self.rules.calculate(Decimal("-1")) == (None, None)
+
+    def test_calculate(self):
+        assert self.rules.calculate(Decimal("1250")) == (Decimal("187.5"), 15)
+
+    def test_calculate_rounds_the_value_to_cents_first(self):
+        assert self.rules.calculate(577.65) == (Decimal("57.77"), 10)
+        assert self.rules.compute([577.65]) == [(Decimal("57.77"), 10)]
+
+    def test_compute_matches_calculate(self):
+        values = ["-1", "577.65", "999.995", "1250", "3482", "100000001"]
+        assert self.rules.compute(values) == [
+            self.rules.calculate(value) for value in values
+        ]
+
+    def test_rules_are_sorted_by_start(self):
+        rules = CashbackRules(reversed(RULES))
+        assert rules.starts == [Decimal("0"), Decimal("1000"), Decimal("1500")]
+
+    def test_error_with_gap_between_rules(self):
+        with pytest.raises(InvalidCashbackRules):
+            CashbackRules(
+                ((10, Decimal("0"), Decimal("999")), (15, 1000, 1499.99))
+            )
+
+    def test_error_with_overlapping_rules(self):
+        with pytest.raises(InvalidCashbackRules):
+            CashbackRules(
+                ((10, Decimal("0"), Decimal("1000")), (15, 1000, 1499.99))
+            )
+
+    def test_error_without_rules(self):
+        with pytest.raises(InvalidCashbackRules):
+            CashbackRules(())
+
+    def test_compute_cents(self):
+        percentages, cashbacks = self.rules.compute_cents(
+            [-100, 57765, 99999, 100000, 150000, 10000000001]
+        )
+        assert percentages == [None, 10, 10, 15, 20, None]
+        assert cashbacks == [None, 5777, 10000, 15000, 30000, None]
+
+
+class TestRulesStore:
+    def setup(self):
+        self.timer = FakeTimer()
+        self.store = RulesStore(
+            RulesSnapshot(1, RULES, ["15350946056"]),
+            interval=30,
+            timer=self.timer,
+        )
+        self.loaded = []
+
+    def load(self, version):
+        self.loaded.append(version)
+        return RulesSnapshot(version, RULES[:1], [])
+
+    def test_snapshot_auto_approve(self):
+        assert self.store.snapshot.is_auto_approve("15350946056")
+        assert not self.store.snapshot.is_auto_approve("12345678900")
+
+    def test_snapshot_compiles_rules(self):
+        with pytest.raises(InvalidCashbackRules):
+            RulesSnapshot(2, RULES[::2])
+
+    def test_refresh_loads_new_version_only(self):
+        assert not self.store.refresh(lambda: 1, self.load)
+        assert not self.store.refresh(lambda: None, self.load)
+        assert self.store.refresh(lambda: 2, self.load)
+
+        assert self.loaded == [2]
+        assert self.store.snapshot.version == 2
+        assert not self.store.snapshot.is_auto_approve("15350946056")
+        assert self.store.stats() == {"version": 2, "reloads": 1}
+
+    def test_refresh_is_due_every_interval(self):
+        assert self.store.is_due()
+
+        self.store.refresh(lambda: 1, self.load)
+        self.timer.now += 29
+        assert not self.store.is_due()
+
+        self.timer.now += 1
+        assert self.store.is_due()
@@ -0,0 +1,82 @@
+import threading
+
+import pytest
+from passlib.hash import bcrypt
+
+from cashback.core import config
+from cashback.core.security import (
+    PasswordExecutor,
+    PasswordQueueFull,
+    get_password_hash,
+    get_password_hashes,
+    verify_and_update_password,
+)
+
+
+class TestPasswordHashing:
+    def test_verify_password_with_current_cost(self):
+        hashed_password = get_password_hash("secret")
+
+        assert verify_and_update_password("secret", hashed_password) == (
+            True,
+            None,
+        )
+        assert verify_and_update_password("wrong", hashed_password) == (
+            False,
+            None,
+        )
+
+    def test_rehash_password_with_other_cost(self):
+        hashed_password = bcrypt.using(rounds=4).hash("secret")
+
+        valid, new_hash = verify_and_update_password("secret", hashed_password)
+
+        assert valid
+        assert new_hash.startswith(f"$2b${config.PASSWORD_BCRYPT_ROUNDS:02d}$")
+
+    def test_hash_passwords_in_chunks(self):
+        passwords = ["one", "two", "three"]
+
+        hashes = get_password_hashes(passwords)
+
+        assert [
+            verify_and_update_password(password, hashed_password)[0]
+            for password, hashed_password in zip(passwords, hashes)
+        ] == [True, True, True]
+
+
+class TestPasswordExecutor:
+    def setup(self):
+        self.executor = PasswordExecutor(workers=1, queue_size=1)
+
+    def teardown(self):
+        self.executor.shutdown()
+
+    def test_run(self):
+        assert self.executor.run(sum, [1, 2]) == 3
+        assert self.executor.stats()["completed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_run_async(self):
+        assert await self.executor.run_async(sum, [1, 2]) == 3
+
+    def test_reject_calls_when_queue_is_full(self):
+        release = threading.Event()
+        futures = [self.executor.submit(release.wait) for _ in range(2)]
+
+        with pytest.raises(PasswordQueueFull) as error:
+            self.executor.submit(release.wait)
+
+        release.set()
+        assert all(future.result() for future in futures)
+        assert error.value.status_code == 429
+        assert self.executor.stats()["rejected"] == 1
+
+    def test_map_chunks_keeps_order_within_queue_size(self):
+        items = list(range(10))
+
+        results = self.executor.map_chunks(list, items, chunk_size=3)
+
+        assert results == items
+        assert self.executor.stats()["completed"] == 4
+        assert self.executor.stats()["rejected"] == 0
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from cashback.core.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    def setup(self):
+        self.calls = 0
+
+    async def slow_call(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return self.calls
+
+    async def failing_call(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream error")
+
+    @pytest.mark.asyncio
+    async def test_coalesce_concurrent_calls(self):
+        flights = SingleFlight()
+
+        results = await asyncio.gather(
+            *[flights.do("cpf", self.slow_call) for _ in range(5)]
+        )
+
+        assert results == [1, 1, 1, 1, 1]
+        assert self.calls == 1
+        assert flights.stats()["coalesced"] == 4
+        assert len(flights) == 0
+
+    @pytest.mark.asyncio
+    async def test_do_not_coalesce_different_keys(self):
+        flights = SingleFlight()
+
+        await asyncio.gather(
+            flights.do("cpf_1", self.slow_call),
+            flights.do("cpf_2", self.slow_call),
+        )
+
+        assert self.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_share_exception_and_retry_after(self):
+        flights = SingleFlight()
+
+        results = await asyncio.gather(
+            flights.do("cpf", self.failing_call),
+            flights.do("cpf", self.failing_call),
+            return_exceptions=True,
+        )
+        assert all(isinstance(result, ValueError) for result in results)
+        assert self.calls == 1
+
+        assert await flights.do("cpf", self.slow_call) == 2
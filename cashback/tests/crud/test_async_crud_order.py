@@ -0,0 +1,93 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+from asyncpg.exceptions import ForeignKeyViolationError
+
+from cashback import crud
+from cashback.core import config
+from cashback.db.outbox import drain_events
+from cashback.db.session import db_session
+from cashback.schemas.order import OrderCreate
+from cashback.tests.factories import (
+    create_random_user,
+    random_cpf,
+    random_lower_string,
+)
+
+
+class TestAsyncCrudOrder:
+    @pytest.mark.asyncio
+    async def test_create_order_with_reseller(self, async_db, normal_user):
+        order_in = OrderCreate(
+            code=random_lower_string(),
+            date=datetime.date.today(),
+            value=1250,
+            cpf=normal_user.cpf,
+        )
+        order = await crud.async_order.create_with_reseller(
+            async_db, obj_in=order_in
+        )
+
+        assert order.id
+        assert order.reseller_cpf == normal_user.cpf
+        assert order.order_status == "IN_VALIDATION"
+        assert order.cashback_value == Decimal("187.50")
+        assert order.cashback_percentage == 15
+
+    @pytest.mark.asyncio
+    async def test_create_order_and_validate_status_with_approved(
+        self, async_db
+    ):
+        cpf = config.CPFS_WITH_AUTO_APPROVE[0]
+        user = await crud.async_user.get_by_cpf(async_db, cpf=cpf)
+        if not user:
+            create_random_user(cpf=cpf)
+
+        order_in = OrderCreate(
+            code=random_lower_string(),
+            date=datetime.date.today(),
+            value=254.65,
+            cpf=cpf,
+        )
+        order = await crud.async_order.create_with_reseller(
+            async_db, obj_in=order_in
+        )
+
+        assert order.order_status == "IN_VALIDATION"
+
+        drain_events(db_session)
+        order = await crud.async_order.get(async_db, id=order.id)
+
+        assert order.order_status == "APPROVED"
+
+    @pytest.mark.asyncio
+    async def test_error_create_order_without_reseller(self, async_db):
+        order_in = OrderCreate(
+            code=random_lower_string(),
+            date=datetime.date.today(),
+            value=343.11,
+            cpf=random_cpf(),
+        )
+        with pytest.raises(ForeignKeyViolationError):
+            await crud.async_order.create_with_reseller(
+                async_db, obj_in=order_in
+            )
+
+    @pytest.mark.asyncio
+    async def test_get_multi_by_reseller(self, async_db, normal_user):
+        for value in (100, 200):
+            order_in = OrderCreate(
+                code=random_lower_string(),
+                date=datetime.date.today(),
+                value=value,
+                cpf=normal_user.cpf,
+            )
+            await crud.async_order.create_with_reseller(
+                async_db, obj_in=order_in
+            )
+
+        orders = await crud.async_order.get_multi_by_reseller(
+            async_db, cpf=normal_user.cpf
+        )
+        assert len(orders) == 2
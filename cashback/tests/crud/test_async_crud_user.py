@@ -0,0 +1,80 @@
+import pytest
+
+from cashback import crud
+from cashback.models.user import User
+from cashback.schemas.user import UserCreate, UserUpdate
+from cashback.tests.factories import (
+    random_cpf,
+    random_email,
+    random_lower_string,
+)
+
+
+class TestAsyncCrudUser:
+    @pytest.mark.asyncio
+    async def test_create_user(self, async_db):
+        email = random_email()
+        password = random_lower_string()
+        full_name = random_lower_string()
+        cpf = random_cpf()
+
+        user_in = UserCreate(
+            email=email, password=password, full_name=full_name, cpf=cpf
+        )
+        user = await crud.async_user.create(async_db, obj_in=user_in)
+        assert isinstance(user, User)
+        assert user.email == email
+        assert user.is_active
+        assert not user.is_superuser
+        assert user.created_at
+
+    @pytest.mark.asyncio
+    async def test_authenticate_user(self, async_db, user_in):
+        user = await crud.async_user.create(async_db, obj_in=user_in)
+        authenticated_user = await crud.async_user.authenticate(
+            async_db, email=user_in.email, password=user_in.password
+        )
+        assert authenticated_user
+        assert user.id == authenticated_user.id
+
+    @pytest.mark.asyncio
+    async def test_not_authenticate_user(self, async_db):
+        user = await crud.async_user.authenticate(
+            async_db, email=random_email(), password=random_lower_string()
+        )
+        assert user is None
+
+    @pytest.mark.asyncio
+    async def test_get_user_by_email_and_cpf(self, async_db, user_in):
+        user = await crud.async_user.create(async_db, obj_in=user_in)
+
+        user_by_email = await crud.async_user.get_by_email(
+            async_db, email=user.email
+        )
+        user_by_cpf = await crud.async_user.get_by_cpf(
+            async_db, cpf=user_in.cpf
+        )
+        assert user.id == user_by_email.id == user_by_cpf.id
+
+    @pytest.mark.asyncio
+    async def test_update_user(self, async_db, user_in):
+        user = await crud.async_user.create(async_db, obj_in=user_in)
+        password = random_lower_string()
+
+        user_update = UserUpdate(full_name="Gal Costa", password=password)
+        user = await crud.async_user.update(
+            async_db, db_obj=user, obj_in=user_update
+        )
+        authenticated_user = await crud.async_user.authenticate(
+            async_db, email=user.email, password=password
+        )
+
+        assert user.full_name == "Gal Costa"
+        assert authenticated_user.id == user.id
+
+    def test_fill_column_defaults(self):
+        values = crud.async_user.with_defaults({"email": random_email()})
+
+        assert values["is_active"] is True
+        assert values["is_superuser"] is False
+        assert "created_at" in values
@@ -1,4 +1,5 @@
 import datetime
+import warnings
 from decimal import Decimal
 
 import pytest
@@ -6,7 +7,9 @@ from sqlalchemy.exc import DataError, IntegrityError
 
 from cashback import crud
 from cashback.core import config
+from cashback.crud.crud_order import DUPLICATED_ORDER, RESELLER_NOT_FOUND
 from cashback.crud.utils import normalize_cpf
+from cashback.db.outbox import drain_events
 from cashback.db.session import db_session
 from cashback.schemas.order import OrderCreate
 from cashback.tests.factories import (
@@ -90,6 +93,11 @@ class TestCrudOrder:
         order = crud.order.create_with_reseller(db_session, obj_in=order_in)
 
         assert user.cpf == order.reseller_cpf
+        assert order.status.name == "IN_VALIDATION"
+
+        drain_events(db_session)
+        db_session.refresh(order)
+
         assert order.status.name == "APPROVED"
 
     def test_calculate_cashbach_value_with_10_percent(self, normal_user):
@@ -102,7 +110,10 @@ class TestCrudOrder:
             code=code, date=date, value=value_1, cpf=normal_user.cpf
         )
         order_in_2 = OrderCreate(
-            code=code, date=date, value=value_2, cpf=normal_user.cpf
+            code=random_lower_string(),
+            date=date,
+            value=value_2,
+            cpf=normal_user.cpf,
         )
         order_1 = crud.order.create_with_reseller(
             db_session, obj_in=order_in_1
@@ -111,7 +122,7 @@ class TestCrudOrder:
             db_session, obj_in=order_in_2
         )
 
-        assert order_1.cashback_value == Decimal("57.76")
+        assert order_1.cashback_value == Decimal("57.77")
         assert order_2.cashback_value == Decimal("100.00")
         assert order_1.cashback_percentage == 10
         assert order_2.cashback_percentage == 10
@@ -126,7 +137,10 @@ class TestCrudOrder:
             code=code, date=date, value=value_1, cpf=normal_user.cpf
         )
         order_in_2 = OrderCreate(
-            code=code, date=date, value=value_2, cpf=normal_user.cpf
+            code=random_lower_string(),
+            date=date,
+            value=value_2,
+            cpf=normal_user.cpf,
         )
         order_1 = crud.order.create_with_reseller(
             db_session, obj_in=order_in_1
@@ -150,7 +164,10 @@ class TestCrudOrder:
             code=code, date=date, value=value_1, cpf=normal_user.cpf
         )
         order_in_2 = OrderCreate(
-            code=code, date=date, value=value_2, cpf=normal_user.cpf
+            code=random_lower_string(),
+            date=date,
+            value=value_2,
+            cpf=normal_user.cpf,
         )
         order_1 = crud.order.create_with_reseller(
             db_session, obj_in=order_in_1
@@ -175,3 +192,141 @@ class TestCrudOrder:
 
         with pytest.raises(DataError):
             crud.order.create_with_reseller(db_session, obj_in=order_in)
+
+    def test_create_multi_orders_without_rows(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            orders = crud.order.create_multi_with_reseller(
+                db_session, objs_in=[]
+            )
+
+        assert orders == []
+
+    def test_create_multi_orders_in_bulk(self, normal_user):
+        date = datetime.date.today()
+        orders_in = [
+            OrderCreate(
+                code="1", date=date, value=577.65, cpf=normal_user.cpf
+            ),
+            OrderCreate(code="2", date=date, value=1250, cpf=random_cpf()),
+            OrderCreate(code="3", date=date, value=3482, cpf=normal_user.cpf),
+        ]
+
+        orders = crud.order.create_multi_with_reseller(
+            db_session, objs_in=orders_in
+        )
+
+        assert orders[1] == "The user with this cpf does not exist."
+        assert orders[0].cashback_value == Decimal("57.77")
+        assert orders[2].cashback_value == Decimal("696.40")
+        assert orders[2].cashback_percentage == 20
+        assert orders[0].id < orders[2].id
+        assert crud.order.get(db_session, id=orders[2].id).code == "3"
+
+    def test_iter_orders_in_chunks(self, normal_user):
+        date = datetime.date.today()
+        for code in range(5):
+            order_in = OrderCreate(
+                code=str(code), date=date, value=100, cpf=normal_user.cpf
+            )
+            crud.order.create_with_reseller(db_session, obj_in=order_in)
+
+        chunks = list(
+            crud.order.iter_chunks(
+                db_session, cpf=normal_user.cpf, chunk_size=2
+            )
+        )
+
+        assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+        codes = [row.code for chunk in chunks for row in chunk]
+        assert codes == ["0", "1", "2", "3", "4"]
+
+    def test_iter_orders_in_pages_after_id(self, normal_user):
+        date = datetime.date.today()
+        orders = []
+        for code in range(6):
+            order_in = OrderCreate(
+                code=str(code), date=date, value=100, cpf=normal_user.cpf
+            )
+            orders.append(
+                crud.order.create_with_reseller(db_session, obj_in=order_in)
+            )
+
+        chunks = list(
+            crud.order.iter_chunks(
+                db_session,
+                cpf=normal_user.cpf,
+                after=orders[0].id,
+                chunk_size=2,
+                page_size=3,
+            )
+        )
+
+        assert [len(chunk) for chunk in chunks] == [2, 1, 2]
+        codes = [row.code for chunk in chunks for row in chunk]
+        assert codes == ["1", "2", "3", "4", "5"]
+
+    def test_get_summary_by_reseller(self, normal_user):
+        for value, date in (
+            (100, datetime.date(2020, 3, 10)),
+            (1250, datetime.date(2020, 4, 1)),
+            (2000, datetime.date(2020, 4, 18)),
+        ):
+            order_in = OrderCreate(
+                code=random_lower_string(),
+                date=date,
+                value=value,
+                cpf=normal_user.cpf,
+            )
+            crud.order.create_with_reseller(db_session, obj_in=order_in)
+
+        summary = crud.order.get_summary_by_reseller(
+            db_session, cpf=normal_user.cpf
+        )
+
+        assert summary["orders"] == 3
+        assert summary["total_value"] == Decimal("3350")
+        assert summary["total_cashback"] == Decimal("597.50")
+        assert summary["by_status"] == [
+            {
+                "status": "IN_VALIDATION",
+                "orders": 3,
+                "total_value": Decimal("3350"),
+                "total_cashback": Decimal("597.50"),
+            }
+        ]
+        assert [month["month"] for month in summary["by_month"]] == [
+            "2020-03",
+            "2020-04",
+        ]
+        assert summary["by_month"][1]["orders"] == 2
+
+    def test_get_summary_by_reseller_without_orders(self, normal_user):
+        summary = crud.order.get_summary_by_reseller(
+            db_session, cpf=normal_user.cpf
+        )
+
+        assert summary["orders"] == 0
+        assert summary["by_status"] == []
+        assert summary["by_month"] == []
+
+    def test_create_or_conflict(self, normal_user):
+        order_in = OrderCreate(
+            code=random_lower_string(),
+            date=datetime.date.today(),
+            value=100,
+            cpf=normal_user.cpf,
+        )
+        unknown_reseller = order_in.copy(update={"reseller_cpf": random_cpf()})
+
+        order = crud.order.create_or_conflict(db_session, obj_in=order_in)
+
+        assert order.id
+        assert (
+            crud.order.create_or_conflict(db_session, obj_in=order_in)
+            == DUPLICATED_ORDER
+        )
+        assert (
+            crud.order.create_or_conflict(db_session, obj_in=unknown_reseller)
+            == RESELLER_NOT_FOUND
+        )
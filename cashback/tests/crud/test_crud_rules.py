@@ -0,0 +1,90 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+
+from cashback import crud
+from cashback.core.rules import (
+    InvalidCashbackRules,
+    RulesSnapshot,
+    RulesStore,
+    cashback_rules,
+    rules_store,
+)
+from cashback.db.session import db_session
+from cashback.schemas.order import OrderCreate
+from cashback.schemas.rules import CashbackRule, CashbackRuleSetCreate
+from cashback.tests.factories import random_lower_string
+
+
+def rules_in(*rules, auto_approve_cpfs=()):
+    return CashbackRuleSetCreate(
+        rules=[
+            CashbackRule(percentage=percentage, start=start, end=end)
+            for percentage, start, end in rules
+        ],
+        auto_approve_cpfs=list(auto_approve_cpfs),
+    )
+
+
+class TestCrudRules:
+    def test_create_version(self):
+        latest = crud.rules.get_latest_version(db_session) or 0
+
+        rule_set = crud.rules.create_version(
+            db_session,
+            obj_in=rules_in(
+                (10, "0", "999.99"),
+                (25, "1000", "100000000"),
+                auto_approve_cpfs=["153.509.460-56"],
+            ),
+        )
+
+        assert rule_set.version == latest + 1
+        assert crud.rules.get_latest(db_session).version == rule_set.version
+        assert rule_set.auto_approve_cpfs == ["15350946056"]
+        assert rule_set.rules[1] == {
+            "percentage": 25,
+            "start": "1000",
+            "end": "100000000",
+        }
+
+    def test_error_create_version_with_invalid_rules(self):
+        latest = crud.rules.get_latest_version(db_session)
+
+        with pytest.raises(InvalidCashbackRules):
+            crud.rules.create_version(
+                db_session,
+                obj_in=rules_in((10, "0", "999.99"), (25, "1500", "2000")),
+            )
+
+        assert crud.rules.get_latest_version(db_session) == latest
+
+    def test_refresh_loads_latest_version(self):
+        rule_set = crud.rules.create_version(
+            db_session,
+            obj_in=rules_in((5, "0", "100000000"), auto_approve_cpfs=["1"]),
+        )
+        store = RulesStore(RulesSnapshot(0, cashback_rules))
+
+        assert crud.rules.refresh(db_session, store=store)
+        assert not crud.rules.refresh(db_session, store=store)
+        assert store.snapshot.version == rule_set.version
+        assert store.snapshot.rules.percentage(Decimal("1250")) == 5
+        assert store.snapshot.is_auto_approve("1")
+
+    def test_order_records_rules_version(self, normal_user, monkeypatch):
+        monkeypatch.setattr(
+            rules_store, "snapshot", RulesSnapshot(42, cashback_rules)
+        )
+        order_in = OrderCreate(
+            code=random_lower_string(),
+            date=datetime.date.today(),
+            value=1250,
+            cpf=normal_user.cpf,
+        )
+
+        order = crud.order.create_with_reseller(db_session, obj_in=order_in)
+
+        assert order.rules_version == 42
+        assert order.cashback_percentage == 15
@@ -1,7 +1,20 @@
+import warnings
+
+from passlib.hash import bcrypt
+
 from cashback import crud
+from cashback.core import config
+from cashback.core.security import verify_and_update_password
+from cashback.crud.crud_user import (
+    CPF_EXISTS,
+    DUPLICATED_CPF,
+    DUPLICATED_EMAIL,
+    EMAIL_EXISTS,
+)
 from cashback.db.session import db_session
-from cashback.schemas.user import UserCreate
+from cashback.schemas.user import UserCreate, UserUpdate
 from cashback.tests.factories import (
+    create_random_user,
     random_cpf,
     random_email,
     random_lower_string,
@@ -38,6 +51,61 @@ class TestCrudUser:
         assert authenticated_user
         assert user.id == authenticated_user.id
 
+    def test_update_user_writes_changed_columns(self, user_in):
+        user = crud.user.create(db_session, obj_in=user_in)
+        hashed_password = user.hashed_password
+
+        user = crud.user.update(
+            db_session,
+            db_obj=user,
+            obj_in=UserUpdate(full_name="Gal Costa", email=user_in.email),
+        )
+
+        assert user.full_name == "Gal Costa"
+        assert user.updated_at
+        assert user.hashed_password == hashed_password
+
+    def test_update_user_without_changes_skips_the_write(self, user_in):
+        user = crud.user.create(db_session, obj_in=user_in)
+
+        user = crud.user.update(
+            db_session,
+            db_obj=user,
+            obj_in=UserUpdate(full_name=user_in.full_name),
+        )
+
+        assert user.updated_at is None
+
+    def test_update_user_hashes_new_password(self, user_in):
+        user = crud.user.create(db_session, obj_in=user_in)
+        password = random_lower_string()
+
+        crud.user.update(
+            db_session, db_obj=user, obj_in=UserUpdate(password=password)
+        )
+
+        assert crud.user.authenticate(
+            db_session, email=user_in.email, password=password
+        )
+
+    def test_authenticate_user_rehashes_password_with_other_cost(
+        self, user_in
+    ):
+        user = crud.user.create(db_session, obj_in=user_in)
+        user.hashed_password = bcrypt.using(rounds=4).hash(user_in.password)
+        db_session.commit()
+
+        authenticated_user = crud.user.authenticate(
+            db_session, email=user_in.email, password=user_in.password
+        )
+
+        assert authenticated_user.hashed_password.startswith(
+            f"$2b${config.PASSWORD_BCRYPT_ROUNDS:02d}$"
+        )
+        assert crud.user.authenticate(
+            db_session, email=user_in.email, password=user_in.password
+        )
+
     def test_not_authenticate_user(self):
         email = random_email()
         password = random_lower_string()
@@ -112,3 +180,76 @@ class TestCrudUser:
         user = crud.user.create(db_session, obj_in=user_in)
         user_2 = crud.user.get_by_cpf(db_session, cpf=user.cpf)
         assert user.id == user_2.id
+
+    def test_create_multi_users(self):
+        users_in = [
+            UserCreate(
+                email=random_email(),
+                password=random_lower_string(),
+                full_name=random_lower_string(),
+                cpf=random_cpf(),
+            )
+            for _ in range(3)
+        ]
+
+        users = crud.user.create_multi(db_session, objs_in=users_in)
+
+        assert [user.email for user in users] == [
+            user_in.email for user_in in users_in
+        ]
+        assert all(user.id for user in users)
+        assert verify_and_update_password(
+            users_in[2].password, users[2].hashed_password
+        ) == (True, None)
+        assert crud.user.get_by_cpf(db_session, cpf=users_in[1].cpf)
+
+    def test_create_multi_users_without_rows(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            users = crud.user.create_multi(db_session, objs_in=[])
+
+        assert users == []
+
+    def test_create_multi_users_reports_duplicates(self):
+        existing, _ = create_random_user()
+
+        def user_in(email=None, cpf=None):
+            return UserCreate(
+                email=email or random_email(),
+                password=random_lower_string(),
+                full_name=random_lower_string(),
+                cpf=cpf or random_cpf(),
+            )
+
+        email, cpf = random_email(), random_cpf()
+        users_in = [
+            user_in(email=existing.email),
+            user_in(cpf=existing.cpf),
+            user_in(email=email, cpf=cpf),
+            user_in(email=email),
+            user_in(cpf=cpf),
+        ]
+
+        results = crud.user.create_multi(db_session, objs_in=users_in)
+
+        assert results[0] == EMAIL_EXISTS
+        assert results[1] == CPF_EXISTS
+        assert results[2].email == email
+        assert results[3] == DUPLICATED_EMAIL
+        assert results[4] == DUPLICATED_CPF
+
+    def test_create_or_conflict(self, user_in):
+        user = crud.user.create_or_conflict(db_session, obj_in=user_in)
+        assert user.email == user_in.email
+
+        same_email = user_in.copy(update={"cpf": random_cpf()})
+        same_cpf = user_in.copy(update={"email": random_email()})
+
+        assert (
+            crud.user.create_or_conflict(db_session, obj_in=same_email)
+            == EMAIL_EXISTS
+        )
+        assert (
+            crud.user.create_or_conflict(db_session, obj_in=same_cpf)
+            == CPF_EXISTS
+        )
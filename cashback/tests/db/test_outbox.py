@@ -0,0 +1,151 @@
+import datetime
+import logging
+
+import pytest
+from sqlalchemy import text
+
+from cashback import crud
+from cashback.core import config
+from cashback.db.outbox import CLAIM_EVENTS, drain_events, process_events
+from cashback.db.session import Session, db_session, engine
+from cashback.extensions.boticario.cache import DatabaseCreditStore
+from cashback.models.order import Order, OrderStatus
+from cashback.models.order_event import ORDER_CREATED, OrderEvent
+from cashback.schemas.order import OrderCreate
+from cashback.tests.factories import create_random_user, random_lower_string
+
+
+def create_order(cpf):
+    order_in = OrderCreate(
+        code=random_lower_string(),
+        date=datetime.date.today(),
+        value=254.65,
+        cpf=cpf,
+    )
+    return crud.order.create_with_reseller(db_session, obj_in=order_in)
+
+
+def auto_approve_reseller():
+    cpf = config.CPFS_WITH_AUTO_APPROVE[0]
+    user = crud.user.get_by_cpf(db_session, cpf=cpf)
+    if not user:
+        user, _ = create_random_user(cpf=cpf)
+    return user
+
+
+def pending_events(order_ids):
+    return (
+        db_session.query(OrderEvent)
+        .filter(OrderEvent.order_id.in_(order_ids))
+        .all()
+    )
+
+
+class TestOrderOutbox:
+    def setup(self):
+        drain_events(db_session)
+        self.credits = DatabaseCreditStore(engine)
+
+    def test_create_order_writes_event(self, normal_user):
+        order = create_order(normal_user.cpf)
+
+        events = pending_events([order.id])
+
+        assert [event.event for event in events] == [ORDER_CREATED]
+
+    def test_create_orders_in_bulk_writes_events(self, normal_user):
+        objs_in = [
+            OrderCreate(
+                code=random_lower_string(),
+                date=datetime.date.today(),
+                value=value,
+                cpf=normal_user.cpf,
+            )
+            for value in (100, 200)
+        ]
+        orders = crud.order.create_multi_with_reseller(
+            db_session, objs_in=objs_in
+        )
+
+        assert len(pending_events([order.id for order in orders])) == 2
+
+    def test_process_events_approves_and_invalidates_credit(self, normal_user):
+        reseller = auto_approve_reseller()
+        approved = create_order(reseller.cpf)
+        in_validation = create_order(normal_user.cpf)
+        self.credits.set(reseller.cpf, 10, stored_at=0)
+        self.credits.set(normal_user.cpf, 20, stored_at=0)
+
+        processed = process_events(db_session)
+        db_session.expire_all()
+
+        assert processed == 2
+        assert pending_events([approved.id, in_validation.id]) == []
+        assert db_session.query(Order).get(approved.id).status == (
+            OrderStatus.APPROVED
+        )
+        assert db_session.query(Order).get(in_validation.id).status == (
+            OrderStatus.IN_VALIDATION
+        )
+        assert self.credits.get_entry(reseller.cpf) is None
+        assert self.credits.get_entry(normal_user.cpf) is None
+
+    def test_process_events_logs_saved_orders(self, normal_user, caplog):
+        order = create_order(normal_user.cpf)
+
+        with caplog.at_level(logging.INFO, logger="cashback.models.order"):
+            process_events(db_session)
+
+        assert f"code: {order.code}," in caplog.text
+
+    def test_drain_events_in_batches(self, normal_user):
+        orders = [create_order(normal_user.cpf) for _ in range(5)]
+
+        processed = drain_events(db_session, batch_size=2)
+
+        assert processed == 5
+        assert pending_events([order.id for order in orders]) == []
+
+    def test_failed_batch_is_processed_again(self, monkeypatch):
+        def fail(order):
+            raise RuntimeError("log unavailable")
+
+        reseller = auto_approve_reseller()
+        order = create_order(reseller.cpf)
+        self.credits.set(reseller.cpf, 10, stored_at=0)
+
+        with monkeypatch.context() as patch:
+            patch.setattr(Order, "set_saved_order_log", fail)
+            with pytest.raises(RuntimeError):
+                process_events(db_session)
+
+        assert len(pending_events([order.id])) == 1
+        assert self.credits.get_entry(reseller.cpf)
+        assert db_session.query(Order).get(order.id).status == (
+            OrderStatus.IN_VALIDATION
+        )
+
+        assert process_events(db_session) == 1
+        db_session.expire_all()
+        assert db_session.query(Order).get(order.id).status == (
+            OrderStatus.APPROVED
+        )
+
+    def test_workers_skip_events_claimed_by_another(self, normal_user):
+        orders = [create_order(normal_user.cpf) for _ in range(2)]
+        first, second = Session(), Session()
+        try:
+            claimed = first.execute(text(CLAIM_EVENTS), {"batch_size": 1})
+            first_ids = [row.order_id for row in claimed]
+            claimed = second.execute(text(CLAIM_EVENTS), {"batch_size": 10})
+            second_ids = [row.order_id for row in claimed]
+
+            assert first_ids == [orders[0].id]
+            assert second_ids == [orders[1].id]
+        finally:
+            first.rollback()
+            second.rollback()
+            first.close()
+            second.close()
+
+        assert len(pending_events([order.id for order in orders])) == 2
@@ -0,0 +1,95 @@
+import datetime
+from collections import namedtuple
+from decimal import Decimal
+
+from cashback import crud
+from cashback.core.rules import cashback_rules
+from cashback.db.recompute import (
+    changed_rows,
+    read_checkpoint,
+    recompute_cashback,
+    write_checkpoint,
+)
+from cashback.db.session import db_session
+from cashback.models.order import Order
+from cashback.schemas.order import OrderCreate
+from cashback.tests.factories import random_lower_string
+
+Row = namedtuple("Row", "id value cashback_percentage cashback_value")
+
+
+class TestRecomputeCashback:
+    def test_changed_rows_skips_up_to_date_orders(self):
+        rows = [
+            Row(1, Decimal("577.65"), 10, Decimal("57.77")),
+            Row(2, Decimal("1250.00"), 10, Decimal("125.00")),
+            Row(3, Decimal("-1.00"), None, None),
+        ]
+        assert changed_rows(rows, cashback_rules) == [(2, 15, 18750)]
+
+    def test_changed_rows_skips_orders_written_by_the_api(self, normal_user):
+        order = crud.order.create_with_reseller(
+            db_session,
+            obj_in=OrderCreate(
+                code=random_lower_string(),
+                date=datetime.date.today(),
+                value=577.65,
+                cpf=normal_user.cpf,
+            ),
+        )
+        rows = (
+            db_session.query(
+                Order.id,
+                Order.value,
+                Order.cashback_percentage,
+                Order.cashback_value,
+            )
+            .filter(Order.id == order.id)
+            .all()
+        )
+
+        assert rows[0].cashback_value == Decimal("57.77")
+        assert changed_rows(rows, cashback_rules) == []
+
+    def test_checkpoint(self, tmp_path):
+        path = str(tmp_path / "checkpoint")
+        assert read_checkpoint(path) == 0
+
+        write_checkpoint(path, 42)
+        assert read_checkpoint(path) == 42
+
+    def test_recompute_orders_in_validation(self, normal_user, tmp_path):
+        orders = [
+            crud.order.create_with_reseller(
+                db_session,
+                obj_in=OrderCreate(
+                    code=random_lower_string(),
+                    date=datetime.date.today(),
+                    value=value,
+                    cpf=normal_user.cpf,
+                ),
+            )
+            for value in ("577.65", "1250")
+        ]
+        ids = [order.id for order in orders]
+        db_session.query(Order).filter(Order.id.in_(ids)).update(
+            {"cashback_percentage": 0, "cashback_value": 0},
+            synchronize_session=False,
+        )
+        db_session.commit()
+        checkpoint = tmp_path / "checkpoint"
+
+        read, updated = recompute_cashback(
+            db_session, chunk_size=1, checkpoint=str(checkpoint)
+        )
+        db_session.expire_all()
+
+        assert updated >= 2
+        assert read >= updated
+        assert not checkpoint.exists()
+        assert [
+            (order.cashback_percentage, order.cashback_value)
+            for order in db_session.query(Order)
+            .filter(Order.id.in_(ids))
+            .order_by(Order.id)
+        ] == [(10, Decimal("57.77")), (15, Decimal("187.50"))]
@@ -0,0 +1,51 @@
+import asyncio
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+
+from cashback.extensions.boticario.backends import AsyncBoticarioBackend
+
+boticario_app = Starlette()
+boticario_app.state.calls = 0
+boticario_app.state.unavailable = False
+
+
+@boticario_app.route("/v1/cashback")
+async def cashback(request):
+    """
+    Local stand-in for the Boticario cashback API.
+    """
+    boticario_app.state.calls += 1
+    if boticario_app.state.unavailable:
+        return JSONResponse({"message": "Service Unavailable"}, 503)
+
+    cpf = request.query_params["cpf"]
+    if not cpf.isdigit():
+        return JSONResponse(
+            {"statusCode": 400, "body": {"message": "Invalid CPF"}}
+        )
+
+    await asyncio.sleep(0.01)
+    return JSONResponse({"statusCode": 200, "body": {"credit": 1578}})
+
+
+def reset_async_backend():
+    AsyncBoticarioBackend._client = None
+    AsyncBoticarioBackend._semaphore = None
+    AsyncBoticarioBackend.cache.clear()
+    AsyncBoticarioBackend.breaker.reset()
+    AsyncBoticarioBackend.latency.clear()
+
+
+@pytest.fixture
+def boticario_mock():
+    boticario_app.state.calls = 0
+    boticario_app.state.unavailable = False
+    reset_async_backend()
+    AsyncBoticarioBackend._client = httpx.AsyncClient(
+        app=boticario_app, headers=AsyncBoticarioBackend.headers
+    )
+    yield boticario_app
+    reset_async_backend()
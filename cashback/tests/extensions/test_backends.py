@@ -1,8 +1,14 @@
+import asyncio
+import time
+
 import pytest
 from fastapi import HTTPException
 from starlette.testclient import TestClient
 
-from cashback.extensions.boticario.backends import BoticarioBackend
+from cashback.extensions.boticario.backends import (
+    AsyncBoticarioBackend,
+    BoticarioBackend,
+)
 from cashback.main import app
 
 client = TestClient(app)
@@ -25,3 +31,90 @@ class TestExtensionsBackends:
 
         with pytest.raises(HTTPException):
             self.backend.get_total_cashback(cpf=cpf)
+
+
+class TestExtensionsAsyncBackends:
+    def setup(self):
+        self.backend = AsyncBoticarioBackend()
+
+    @pytest.mark.asyncio
+    async def test_get_total_cashback(self, boticario_mock):
+        cpf = "12345667899"
+
+        total_cashback = await self.backend.get_total_cashback(cpf=cpf)
+        assert total_cashback == 1578
+
+    @pytest.mark.asyncio
+    async def test_error_get_total_cashback_with_invalid_cpf(
+        self, boticario_mock
+    ):
+        cpf = "123.456.678-9X"
+
+        with pytest.raises(HTTPException):
+            await self.backend.get_total_cashback(cpf=cpf)
+
+    @pytest.mark.asyncio
+    async def test_reuse_client_between_requests(self, boticario_mock):
+        client = AsyncBoticarioBackend.get_client()
+
+        await self.backend.get_total_cashback(cpf="12345667899")
+        await AsyncBoticarioBackend().get_total_cashback(cpf="98765432100")
+
+        assert AsyncBoticarioBackend.get_client() is client
+        assert boticario_mock.state.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_get_total_cashback_from_cache(self, boticario_mock):
+        await self.backend.get_total_cashback(cpf="123.456.678-99")
+        total_cashback = await self.backend.get_total_cashback(
+            cpf="12345667899"
+        )
+
+        assert total_cashback == 1578
+        assert boticario_mock.state.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_coalesce_concurrent_requests(self, boticario_mock):
+        credits = await asyncio.gather(
+            *[
+                self.backend.get_total_cashback(cpf="12345667899")
+                for _ in range(10)
+            ]
+        )
+
+        assert credits == [1578] * 10
+        assert boticario_mock.state.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_breaker_when_unavailable(self, boticario_mock):
+        boticario_mock.state.unavailable = True
+        threshold = AsyncBoticarioBackend.breaker.failure_threshold
+
+        for _ in range(threshold):
+            with pytest.raises(HTTPException) as err:
+                await self.backend.get_total_cashback(cpf="12345667899")
+            assert err.value.status_code == 500
+
+        with pytest.raises(HTTPException) as err:
+            await self.backend.get_total_cashback(cpf="12345667899")
+
+        assert err.value.status_code == 503
+        assert boticario_mock.state.calls == threshold
+        assert AsyncBoticarioBackend.breaker.state == "open"
+
+    @pytest.mark.asyncio
+    async def test_fallback_to_cached_credit(
+        self, boticario_mock, monkeypatch
+    ):
+        cpf = "12345667899"
+        cache = AsyncBoticarioBackend.cache
+        expired_at = time.time() - cache.ttl - cache.stale_ttl - 1
+        with monkeypatch.context() as patch:
+            patch.setattr(cache, "timer", lambda: expired_at)
+            await cache.set(cpf, 1234)
+        boticario_mock.state.unavailable = True
+
+        total_cashback = await self.backend.get_total_cashback(cpf=cpf)
+
+        assert total_cashback == 1234
+        assert boticario_mock.state.calls == 1
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from cashback.core.cache import LRUCache
+from cashback.extensions.boticario.cache import CreditCache
+from cashback.tests.utils import FakeTimer
+
+
+class TestCreditCache:
+    def setup(self):
+        self.timer = FakeTimer()
+        self.calls = 0
+
+    async def loader(self):
+        self.calls += 1
+        return 100 * self.calls
+
+    @pytest.mark.asyncio
+    async def test_get_or_load_with_normalized_cpf(self):
+        cache = CreditCache(ttl=10, timer=self.timer)
+
+        assert await cache.get_or_load("123.456.678-99", self.loader) == 100
+        assert await cache.get_or_load("12345667899", self.loader) == 100
+        assert self.calls == 1
+        assert cache.stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_reload_after_ttl(self):
+        cache = CreditCache(ttl=10, timer=self.timer)
+        await cache.get_or_load("12345667899", self.loader)
+
+        self.timer.now = 10
+        assert await cache.get_or_load("12345667899", self.loader) == 200
+
+    @pytest.mark.asyncio
+    async def test_stale_while_revalidate(self):
+        cache = CreditCache(ttl=10, stale_ttl=20, timer=self.timer)
+        await cache.get_or_load("12345667899", self.loader)
+
+        self.timer.now = 15
+        assert await cache.get_or_load("12345667899", self.loader) == 100
+        await asyncio.sleep(0)
+
+        assert await cache.get("12345667899") == 200
+        assert cache.stats()["stale_hits"] == 1
+        assert cache.stats()["refreshes"] == 1
+
+    @pytest.mark.asyncio
+    async def test_shared_tier(self):
+        shared = LRUCache(timer=self.timer)
+        cache_1 = CreditCache(ttl=10, shared=shared, timer=self.timer)
+        cache_2 = CreditCache(ttl=10, shared=shared, timer=self.timer)
+
+        await cache_1.get_or_load("12345667899", self.loader)
+        assert await cache_2.get_or_load("12345667899", self.loader) == 100
+        assert self.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_shared_tier_deletes_reach_other_workers(self):
+        shared = LRUCache(timer=self.timer)
+        cache_1 = CreditCache(ttl=60, shared=shared, timer=self.timer)
+        cache_2 = CreditCache(
+            ttl=60, shared=shared, local_ttl=5, timer=self.timer
+        )
+        await cache_1.get_or_load("12345667899", self.loader)
+        assert await cache_2.get("12345667899") == 100
+
+        shared.delete("12345667899")
+        self.timer.now = 5
+
+        assert await cache_2.get_or_load("12345667899", self.loader) == 200
+        assert cache_2.stats()["shared_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_shared_tier_errors_are_misses(self):
+        class BrokenStore:
+            def get_entry(self, cpf):
+                raise ConnectionError("database is down")
+
+            def set(self, cpf, value, stored_at=None):
+                raise ConnectionError("database is down")
+
+        cache = CreditCache(ttl=10, shared=BrokenStore(), timer=self.timer)
+
+        assert await cache.get_or_load("12345667899", self.loader) == 100
+        assert await cache.get_or_load("12345667899", self.loader) == 100
+        assert self.calls == 1
+        assert cache.stats()["shared_errors"] == 2
@@ -0,0 +1,10 @@
+class FakeTimer:
+    """
+    Controllable clock for caches, breakers and other time based objects.
+    """
+
+    def __init__(self, now=0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
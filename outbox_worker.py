@@ -0,0 +1,51 @@
+import argparse
+import logging
+import logging.config
+
+from cashback import crud
+from cashback.core import config
+from cashback.db.outbox import drain_events, run_worker
+from cashback.db.session import db_session
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    logging.config.dictConfig(config.LOGGING)
+    parser = argparse.ArgumentParser(
+        description="Run the side effects of new orders from the outbox"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=config.OUTBOX_BATCH_SIZE
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=config.OUTBOX_POLL_INTERVAL,
+        help="Seconds to wait for new events once the outbox is empty",
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Drain the outbox and exit instead of polling for new events",
+    )
+    args = parser.parse_args()
+
+    if args.once:
+        crud.rules.refresh(db_session)
+        processed = drain_events(db_session, batch_size=args.batch_size)
+        logger.info(f"Outbox drained: {processed} order events processed")
+        return
+
+    try:
+        run_worker(
+            db_session,
+            batch_size=args.batch_size,
+            poll_interval=args.poll_interval,
+        )
+    except KeyboardInterrupt:
+        logger.info("Order outbox worker stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+
+from pydantic import ValidationError
+
+from cashback import crud
+from cashback.core import config
+from cashback.core.security import PasswordExecutor
+from cashback.db.session import db_session
+from cashback.schemas.user import UserCreate
+
+logger = logging.getLogger(__name__)
+
+
+def read_users(path: str) -> list:
+    "Rows of a CSV file with a header, a JSON array or NDJSON"
+    with open(path) as users_file:
+        if path.endswith(".csv"):
+            return list(csv.DictReader(users_file))
+        content = users_file.read()
+    if content.lstrip().startswith("["):
+        return json.loads(content)
+    return [json.loads(line) for line in content.splitlines() if line.strip()]
+
+
+def provision(items: list, executor: PasswordExecutor, batch_size: int):
+    "Yield one report row per item, creating users batch by batch"
+    for start in range(0, len(items), batch_size):
+        results, indexes, users_in = [], [], []
+        for index, item in enumerate(items[start : start + batch_size], start):
+            try:
+                users_in.append(UserCreate.parse_obj(item))
+                indexes.append(index)
+            except ValidationError as err:
+                results.append(
+                    {"index": index, "created": False, "detail": str(err)}
+                )
+
+        users = crud.user.create_multi(
+            db_session, objs_in=users_in, executor=executor
+        )
+        for index, user in zip(indexes, users):
+            if isinstance(user, str):
+                results.append(
+                    {"index": index, "created": False, "detail": user}
+                )
+            else:
+                results.append(
+                    {"index": index, "created": True, "id": user.id}
+                )
+        yield from sorted(results, key=lambda result: result["index"])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Create users from a CSV, JSON or NDJSON file"
+    )
+    parser.add_argument("path", help="Users with email, password, cpf...")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=config.USERS_BULK_MAX_SIZE,
+        help="Users created per transaction",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Processes hashing passwords",
+    )
+    parser.add_argument(
+        "--report",
+        type=argparse.FileType("w"),
+        default=sys.stdout,
+        help="NDJSON file for the result of every row (default: stdout)",
+    )
+    args = parser.parse_args()
+
+    items = read_users(args.path)
+    executor = PasswordExecutor(
+        workers=args.workers, queue_size=args.workers, processes=True
+    )
+    logger.info(f"Provisioning {len(items)} users")
+    created = 0
+    try:
+        for result in provision(items, executor, args.batch_size):
+            created += result["created"]
+            args.report.write(json.dumps(result) + "\n")
+    finally:
+        executor.shutdown()
+    logger.info(f"Users provisioned: {created} of {len(items)} created")
+
+
+if __name__ == "__main__":
+    main()
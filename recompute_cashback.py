@@ -0,0 +1,41 @@
+import argparse
+import logging
+import logging.config
+
+from cashback import crud
+from cashback.core import config
+from cashback.core.rules import rules_store
+from cashback.db.recompute import recompute_cashback
+from cashback.db.session import db_session
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    logging.config.dictConfig(config.LOGGING)
+    parser = argparse.ArgumentParser(
+        description="Recompute cashback of the orders in validation"
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=config.ORDERS_BULK_CHUNK_SIZE
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default="recompute_cashback.checkpoint",
+        help="File with the last recomputed order id, to resume from",
+    )
+    args = parser.parse_args()
+
+    crud.rules.refresh(db_session)
+    logger.info(
+        f"Recomputing cashback with rules version "
+        f"{rules_store.snapshot.version}"
+    )
+    read, updated = recompute_cashback(
+        db_session, chunk_size=args.chunk_size, checkpoint=args.checkpoint
+    )
+    logger.info(f"Cashback recomputed: {read} orders read, {updated} updated")
+
+
+if __name__ == "__main__":
+    main()